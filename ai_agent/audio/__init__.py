@@ -0,0 +1 @@
+"""Pluggable audio input/output for the AI Agent application."""
@@ -0,0 +1,472 @@
+"""
+Audio segment store for the AI Agent application.
+
+Every captured customer utterance and every reply played by TTS can be
+appended to a per-day segment file, with a fixed-size index record per
+segment (session, turn, source, audio format, offset and length):
+
+    {root}/20261019.seg    compressed audio, segments back to back
+    {root}/20261019.idx    one INDEX_RECORD per segment
+
+SegmentRecorder.record() only queues the PCM; a writer thread compresses it
+(zlib, or FLAC when soundfile is installed) and appends it, so a call never
+waits for compression or disk. When the queue is full new segments are
+dropped and counted rather than slowing the call down. Session and turn are
+taken from the tracing context of the calling thread.
+
+SegmentReader maps both files with mmap: the index is decoded with
+struct.iter_unpack and a segment is a memoryview slice of the mapping, so
+batch analytics can seek to any utterance without reading the file.
+
+    python -m ai_agent.audio.recording recordings/
+    python -m ai_agent.audio.recording recordings/ --day 20261019 --session call-3 --extract out/
+"""
+
+import argparse
+import datetime
+import io
+import logging
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import wave
+import zlib
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+from ..config.settings import RECORDING_CODEC, RECORDING_QUEUE_SIZE
+from ..metrics import QUEUE_DEPTH, RECORDED_SEGMENTS, RECORDING_BYTES, RECORDING_DROPPED
+from ..tracing import current_turn
+from .sources import AudioClip
+
+logger = logging.getLogger("ai_agent.recording")
+
+# Who produced a segment
+CALLER = 0
+AGENT = 1
+SOURCES = ("caller", "agent")
+
+# How a segment is stored
+CODEC_PCM = 0
+CODEC_ZLIB = 1
+CODEC_FLAC = 2
+CODECS = ("pcm", "zlib", "flac")
+
+# session, turn, source, codec, channels, sample width, sample rate,
+# offset, stored length, PCM length, timestamp
+INDEX_RECORD = struct.Struct("<32sIBBBBIQIId")
+SESSION_BYTES = 32
+NO_TURN = 0xFFFFFFFF
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+class SegmentEntry(NamedTuple):
+    """Index record of one stored segment."""
+
+    session: str
+    turn: Optional[int]
+    source: str
+    codec: str
+    channels: int
+    sample_width: int
+    sample_rate: int
+    offset: int
+    length: int
+    pcm_length: int
+    timestamp: float
+
+    @property
+    def duration(self) -> float:
+        """Length of the audio in seconds."""
+        frame_size = self.sample_width * self.channels
+        return self.pcm_length / frame_size / self.sample_rate if frame_size else 0.0
+
+
+def day_stem(timestamp: float, tag: Optional[str] = None) -> str:
+    """File name, without suffix, of the segment files for a day."""
+    stem = datetime.datetime.fromtimestamp(timestamp).strftime("%Y%m%d")
+    return f"{stem}-{tag}" if tag else stem
+
+
+def segment_stems(root: str) -> List[str]:
+    """Stems of the segment file pairs in root, oldest first."""
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-len(INDEX_SUFFIX)] for name in names if name.endswith(INDEX_SUFFIX))
+
+
+def _flac_modules():
+    """soundfile and numpy, which FLAC encoding needs."""
+    try:
+        import numpy
+        import soundfile
+    except ImportError:
+        raise RuntimeError("flac recording requires the 'soundfile' and 'numpy' packages")
+    return soundfile, numpy
+
+
+def encode(pcm: bytes, codec: int, sample_rate: int, sample_width: int, channels: int,
+           level: int = 6):
+    """
+    Compress PCM for storage.
+
+    Returns:
+        (codec actually used, stored bytes); FLAC falls back to zlib for
+        sample widths other than 16 bits
+    """
+    if codec == CODEC_FLAC and sample_width == 2:
+        soundfile, numpy = _flac_modules()
+        frames = numpy.frombuffer(pcm, dtype='<i2').reshape(-1, channels)
+        buffer = io.BytesIO()
+        soundfile.write(buffer, frames, sample_rate, format='FLAC', subtype='PCM_16')
+        return CODEC_FLAC, buffer.getvalue()
+    if codec == CODEC_PCM:
+        return CODEC_PCM, pcm
+    return CODEC_ZLIB, zlib.compress(pcm, level)
+
+
+def decode(data, codec: int) -> bytes:
+    """PCM of a stored segment."""
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_FLAC:
+        soundfile, _ = _flac_modules()
+        frames, _ = soundfile.read(io.BytesIO(data), dtype='int16')
+        return frames.tobytes()
+    return bytes(data)
+
+
+class SegmentRecorder:
+    """Appends audio segments to per-day files from a writer thread."""
+
+    def __init__(self, root: str, codec: str = RECORDING_CODEC, level: int = 6,
+                 queue_size: int = RECORDING_QUEUE_SIZE, tag: Optional[str] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            root: Directory of the segment files, created if missing
+            codec: 'zlib', 'flac' (needs soundfile) or 'pcm'
+            level: zlib compression level
+            queue_size: Segments waiting for the writer before new ones are dropped
+            tag: Added to the file names; processes sharing root need distinct tags
+        """
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec '{codec}', expected one of {', '.join(CODECS)}")
+        self.codec = CODECS.index(codec)
+        if self.codec == CODEC_FLAC:
+            _flac_modules()
+        self.root = root
+        self.level = level
+        self.tag = tag
+        self.segments = 0
+        self.pcm_bytes = 0
+        self.stored_bytes = 0
+        self.dropped = 0
+        os.makedirs(root, exist_ok=True)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stem: Optional[str] = None
+        self._segment_file = None
+        self._index_file = None
+        self._thread = threading.Thread(target=self._run, name="audio-recorder")
+        self._thread.daemon = True
+        self._thread.start()
+        QUEUE_DEPTH.labels("recording").set_function(self._queue.qsize)
+
+    def record(self, pcm: bytes, sample_rate: int, sample_width: int = 2, channels: int = 1,
+               source: int = CALLER, session: Optional[str] = None,
+               turn: Optional[int] = None) -> bool:
+        """
+        Queue a segment for storage.
+
+        Args:
+            pcm: Little-endian PCM frames
+            sample_rate: Frames per second
+            sample_width: Bytes per sample
+            channels: Interleaved channels
+            source: CALLER or AGENT
+            session: Call the audio belongs to; the current turn's call if None
+            turn: Turn number; the current turn's if None
+
+        Returns:
+            False if the segment was dropped because the writer is behind
+        """
+        if not pcm:
+            return True
+        if session is None or turn is None:
+            trace = current_turn()
+            if trace is not None:
+                session = trace.call_id if session is None else session
+                turn = trace.turn if turn is None else turn
+        item = (time.time(), "" if session is None else str(session), turn, source,
+                pcm, sample_rate, sample_width, channels)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            RECORDING_DROPPED.inc()
+            return False
+        return True
+
+    def record_clip(self, clip: AudioClip, source: int = CALLER) -> bool:
+        """Queue an AudioClip for storage."""
+        return self.record(clip.pcm, clip.sample_rate, clip.sample_width, clip.channels, source)
+
+    def record_wav(self, filename: str, source: int = AGENT) -> bool:
+        """Queue the audio of a WAV file for storage."""
+        try:
+            clip = AudioClip.from_wav(filename, transcript="")
+        except (OSError, EOFError, wave.Error) as e:
+            logger.warning("Cannot record %s: %s", filename, e)
+            return False
+        return self.record_clip(clip, source)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            try:
+                self._write(*item)
+            except Exception:
+                logger.exception("Failed to store audio segment")
+            finally:
+                self._queue.task_done()
+        self._close_files()
+
+    def _open(self, stem: str):
+        """Switch to the files of another day."""
+        self._close_files()
+        base = os.path.join(self.root, stem)
+        self._index_file = open(base + INDEX_SUFFIX, 'ab')
+        # A record torn by a crash would shift every later one
+        size = self._index_file.tell()
+        if size % INDEX_RECORD.size:
+            self._index_file.truncate(size - size % INDEX_RECORD.size)
+            self._index_file.seek(0, os.SEEK_END)
+        # Bytes without an index record from a crash stay unreferenced
+        self._segment_file = open(base + SEGMENT_SUFFIX, 'ab')
+        self._stem = stem
+
+    def _write(self, timestamp: float, session: str, turn: Optional[int], source: int,
+               pcm: bytes, sample_rate: int, sample_width: int, channels: int):
+        """Compress and append one segment, then its index record."""
+        codec, data = encode(pcm, self.codec, sample_rate, sample_width, channels, self.level)
+        stem = day_stem(timestamp, self.tag)
+        if stem != self._stem:
+            self._open(stem)
+        offset = self._segment_file.tell()
+        self._segment_file.write(data)
+        # The audio is on disk before the index points at it
+        self._segment_file.flush()
+        self._index_file.write(INDEX_RECORD.pack(
+            session.encode('utf-8')[:SESSION_BYTES], NO_TURN if turn is None else turn,
+            source, codec, channels, sample_width, sample_rate,
+            offset, len(data), len(pcm), timestamp
+        ))
+        self._index_file.flush()
+        self.segments += 1
+        self.pcm_bytes += len(pcm)
+        self.stored_bytes += len(data)
+        RECORDED_SEGMENTS.labels(SOURCES[source]).inc()
+        RECORDING_BYTES.inc(len(data))
+
+    def _close_files(self):
+        for f in (self._segment_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._segment_file = self._index_file = None
+        self._stem = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued segment is stored.
+
+        Returns:
+            False if the queue did not drain within timeout
+        """
+        done = self._queue.all_tasks_done
+        with done:
+            return done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Store the queued segments and close the files."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Segments stored, bytes before and after compression and drops."""
+        return {
+            'segments': self.segments,
+            'pcm_bytes': self.pcm_bytes,
+            'stored_bytes': self.stored_bytes,
+            'ratio': self.stored_bytes / self.pcm_bytes if self.pcm_bytes else 0.0,
+            'dropped': self.dropped,
+            'pending': self._queue.qsize()
+        }
+
+
+def _map(filename: str):
+    """Read-only mapping of a file; None if it is empty."""
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class SegmentReader:
+    """Random access to one segment file pair through mmap."""
+
+    def __init__(self, root: str, stem: str):
+        """
+        Open a day's files.
+
+        Args:
+            root: Directory of the segment files
+            stem: File name without suffix, see segment_stems()
+        """
+        self.base = os.path.join(root, stem)
+        self._index = None
+        self._segments = None
+        self.refresh()
+
+    def refresh(self):
+        """Remap the files to see segments appended since they were opened."""
+        self.close()
+        self._index = _map(self.base + INDEX_SUFFIX)
+        self._segments = _map(self.base + SEGMENT_SUFFIX)
+
+    def __len__(self) -> int:
+        return len(self._index) // INDEX_RECORD.size if self._index is not None else 0
+
+    def __getitem__(self, position: int) -> SegmentEntry:
+        count = len(self)
+        if position < 0:
+            position += count
+        if not 0 <= position < count:
+            raise IndexError("segment index out of range")
+        return self._entry(INDEX_RECORD.unpack_from(self._index, position * INDEX_RECORD.size))
+
+    def __iter__(self) -> Iterator[SegmentEntry]:
+        return self.entries()
+
+    @staticmethod
+    def _entry(record) -> SegmentEntry:
+        session, turn, source, codec, channels, width, rate, offset, length, pcm_length, ts = record
+        return SegmentEntry(session.rstrip(b"\0").decode('utf-8', 'replace'),
+                            None if turn == NO_TURN else turn, SOURCES[source], CODECS[codec],
+                            channels, width, rate, offset, length, pcm_length, ts)
+
+    def entries(self) -> Iterator[SegmentEntry]:
+        """Every index record, in the order the segments were stored."""
+        if self._index is None:
+            return
+        # Ignore a record that is still being written
+        end = len(self) * INDEX_RECORD.size
+        for record in INDEX_RECORD.iter_unpack(memoryview(self._index)[:end]):
+            yield self._entry(record)
+
+    def find(self, session: Optional[str] = None, turn: Optional[int] = None,
+             source: Optional[str] = None) -> List[SegmentEntry]:
+        """Index records matching every given field."""
+        return [
+            entry for entry in self.entries()
+            if (session is None or entry.session == session)
+            and (turn is None or entry.turn == turn)
+            and (source is None or entry.source == source)
+        ]
+
+    def read_raw(self, entry: SegmentEntry) -> memoryview:
+        """
+        Stored bytes of a segment, without copying.
+
+        The view must be released before the reader is closed or refreshed.
+        """
+        if self._segments is None or entry.offset + entry.length > len(self._segments):
+            raise ValueError("segment is not in the segment file")
+        return memoryview(self._segments)[entry.offset:entry.offset + entry.length]
+
+    def read(self, entry: SegmentEntry) -> AudioClip:
+        """Decoded audio of a segment."""
+        with self.read_raw(entry) as data:
+            pcm = decode(data, CODECS.index(entry.codec))
+        return AudioClip(pcm, entry.sample_rate, entry.sample_width, entry.channels)
+
+    def close(self):
+        """Unmap the files."""
+        for name in ('_index', '_segments'):
+            mapping = getattr(self, name)
+            setattr(self, name, None)
+            if mapping is not None:
+                try:
+                    mapping.close()
+                except BufferError:
+                    # A read_raw() view is still alive; the mapping closes with it
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def write_wav(clip: AudioClip, filename: str):
+    """Write a clip as a WAV file."""
+    with wave.open(filename, 'wb') as wav:
+        wav.setnchannels(clip.channels)
+        wav.setsampwidth(clip.sample_width)
+        wav.setframerate(clip.sample_rate)
+        wav.writeframes(clip.pcm)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="List and extract recorded audio segments")
+    parser.add_argument('root', help="recording directory")
+    parser.add_argument('--day', help="segment file stem (e.g. 20261019); all if omitted")
+    parser.add_argument('--session', help="only segments of this call")
+    parser.add_argument('--turn', type=int, help="only segments of this turn")
+    parser.add_argument('--source', choices=SOURCES, help="only caller or agent audio")
+    parser.add_argument('--extract', metavar='DIR', help="write the matching segments as WAV files to DIR")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """List or extract segments from the command line."""
+    args = parse_args(argv)
+    stems = [args.day] if args.day else segment_stems(args.root)
+    if not stems:
+        print(f"No segment files in {args.root}")
+        return 1
+    if args.extract:
+        os.makedirs(args.extract, exist_ok=True)
+    for stem in stems:
+        with SegmentReader(args.root, stem) as reader:
+            entries = reader.find(args.session, args.turn, args.source)
+            stored = sum(e.length for e in entries)
+            pcm = sum(e.pcm_length for e in entries)
+            print(f"{stem}: {len(entries)} segments, {sum(e.duration for e in entries):.1f} s, "
+                  f"{stored / 1024:.1f} KiB stored ({stored / pcm if pcm else 0:.2f} of PCM)")
+            for position, entry in enumerate(entries):
+                turn = '-' if entry.turn is None else entry.turn
+                print(f"  {entry.session or '-':<16} turn {turn:<4} {entry.source:<6} "
+                      f"{entry.duration:6.2f} s  {entry.codec:<4} {entry.length:>8} B")
+                if args.extract:
+                    name = f"{stem}_{position:05d}_{entry.session or 'none'}_{turn}_{entry.source}.wav"
+                    write_wav(reader.read(entry), os.path.join(args.extract, name))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,530 @@
+"""
+Audio capture in a separate process for the AI Agent application.
+
+In-process capture competes for the GIL with recognition, DSP and every
+other call, and when the capture thread is scheduled too late the sound
+card's buffer overruns and frames are lost. CaptureProcess moves capture to
+its own process, which writes PCM chunks into a SharedRingBuffer, a ring of
+records in multiprocessing.shared_memory:
+
+    header   write position | overruns | chunks | device overruns | read position per reader
+    records  [length, capture time, PCM padded to 16 bytes] ...
+
+Positions count bytes since the start and each is written by one side only
+(the writer its write position, each reader its own read position), so
+neither side takes a lock. A record never wraps around the end of the ring,
+so a reader gets every chunk as one memoryview of the shared memory, with
+no copy; several readers (recognition, DSP) can follow the same stream. A
+full ring drops the new chunk and counts an overrun instead of blocking
+capture. A position is stored after the data it covers; this relies on
+aligned 8-byte stores becoming visible in program order, as they do on
+x86-64.
+
+SharedMemorySource endpoints the stream by energy like speech_recognition
+and hands utterances to SourceRecognizer, so `python main.py
+--capture-process` runs recognition on top of it. benchmarks/bench_capture.py
+compares overruns and latency with in-process capture.
+"""
+
+import collections
+import functools
+import logging
+import math
+import multiprocessing
+import operator
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Deque, Iterator, Optional, Tuple
+from ..config.settings import (
+    CAPTURE_SAMPLE_RATE, CAPTURE_CHUNK_FRAMES, CAPTURE_RING_SECONDS, CAPTURE_DEVICE_CHUNKS,
+    ENERGY_THRESHOLD
+)
+from ..metrics import CAPTURE_OVERRUNS
+from .sources import AudioClip, AudioSource
+
+logger = logging.getLogger("ai_agent.capture")
+
+_LINE = 8  # 64-byte cache line in 8-byte header slots
+_WRITE = 0
+_OVERRUNS = 1 * _LINE
+_CHUNKS = 2 * _LINE
+_DEVICE_OVERRUNS = 3 * _LINE
+_READERS = 4 * _LINE
+
+# Read position of a reader slot nobody has attached to; the writer ignores it
+DETACHED = 0xFFFFFFFFFFFFFFFF
+
+_RECORD = struct.Struct("<Qd")  # payload length, capture time (perf_counter)
+_ALIGN = 16
+_WRAP = 0xFFFFFFFFFFFFFFFF  # record length marking the unused end of the ring
+
+# Seconds a reader sleeps when the ring is empty
+POLL_INTERVAL = 0.002
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class SharedRingBuffer:
+    """Single-writer, multi-reader ring of PCM chunks in shared memory."""
+
+    def __init__(self, capacity: int = 0, readers: int = 1, name: Optional[str] = None):
+        """
+        Create a ring, or attach to an existing one if name is given.
+
+        Args:
+            capacity: Bytes of chunk records, rounded up to 16
+            readers: Reader slots; every attached reader must keep up
+            name: Shared memory block to attach to
+        """
+        if name is None:
+            capacity = _aligned(capacity)
+            if capacity <= 0:
+                raise ValueError("capacity must be positive")
+            header = (_LINE + _READERS + readers * _LINE) * 8
+            self._shm = shared_memory.SharedMemory(create=True, size=header + capacity)
+            self._owner = True
+            layout = self._shm.buf[:16].cast('Q')
+            layout[0] = readers
+            layout[1] = capacity
+            layout.release()
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+            layout = self._shm.buf[:16].cast('Q')
+            readers, capacity = layout[0], layout[1]
+            layout.release()
+        self.readers = readers
+        self.capacity = capacity
+        # The layout words have the first cache line to themselves
+        base = _LINE * 8
+        header_size = (_READERS + readers * _LINE) * 8
+        self._header = self._shm.buf[base:base + header_size].cast('Q')
+        self._data = self._shm.buf[base + header_size:base + header_size + capacity]
+        if self._owner:
+            for slot in range(readers):
+                self._header[_READERS + slot * _LINE] = DETACHED
+
+    @property
+    def name(self) -> str:
+        """Shared memory name, for attaching from another process."""
+        return self._shm.name
+
+    @classmethod
+    def for_audio(cls, seconds: float = CAPTURE_RING_SECONDS, sample_rate: int = CAPTURE_SAMPLE_RATE,
+                  chunk_frames: int = CAPTURE_CHUNK_FRAMES, sample_width: int = 2,
+                  readers: int = 1) -> "SharedRingBuffer":
+        """Ring holding about seconds of chunked mono audio."""
+        chunk = _RECORD.size + _aligned(chunk_frames * sample_width)
+        chunks = max(2, int(seconds * sample_rate / chunk_frames))
+        return cls(chunks * chunk, readers)
+
+    def write(self, data, timestamp: Optional[float] = None) -> bool:
+        """
+        Append a chunk; only one process may write.
+
+        Args:
+            data: PCM bytes or any buffer
+            timestamp: Capture time as time.perf_counter(); now if None
+
+        Returns:
+            False if the chunk was dropped because a reader is a full ring behind
+        """
+        length = len(data)
+        need = _RECORD.size + _aligned(length)
+        capacity = self.capacity
+        if need > capacity:
+            raise ValueError(f"chunk of {length} bytes does not fit a {capacity} byte ring")
+        header = self._header
+        position = header[_WRITE]
+        offset = position % capacity
+        tail = capacity - offset
+        skip = tail if tail < need else 0
+
+        oldest = position
+        for slot in range(self.readers):
+            read = header[_READERS + slot * _LINE]
+            if read != DETACHED and read < oldest:
+                oldest = read
+        if position + skip + need - oldest > capacity:
+            header[_OVERRUNS] += 1
+            return False
+
+        if skip:
+            _RECORD.pack_into(self._data, offset, _WRAP, 0.0)
+            offset = 0
+        _RECORD.pack_into(self._data, offset, length,
+                          time.perf_counter() if timestamp is None else timestamp)
+        start = offset + _RECORD.size
+        self._data[start:start + length] = data
+        # Publish after the record is complete
+        header[_CHUNKS] += 1
+        header[_WRITE] = position + skip + need
+        return True
+
+    def count_device_overruns(self, chunks: int):
+        """Add chunks the capture device lost before they reached the ring."""
+        self._header[_DEVICE_OVERRUNS] += chunks
+
+    def reader(self, slot: int = 0) -> "RingReader":
+        """Attach a reader to a slot, starting at the newest chunk."""
+        return RingReader(self, slot)
+
+    @property
+    def written(self) -> int:
+        """Chunks written."""
+        return self._header[_CHUNKS]
+
+    @property
+    def overruns(self) -> int:
+        """Chunks dropped because a reader fell a full ring behind."""
+        return self._header[_OVERRUNS]
+
+    @property
+    def device_overruns(self) -> int:
+        """Chunks the capture device lost because the writer was late."""
+        return self._header[_DEVICE_OVERRUNS]
+
+    def stats(self):
+        """Ring figures."""
+        return {
+            'capacity': self.capacity,
+            'chunks': self.written,
+            'overruns': self.overruns,
+            'device_overruns': self.device_overruns
+        }
+
+    def close(self):
+        """Detach from the shared memory; the creator also frees it."""
+        if self._header is None:
+            return
+        self._header.release()
+        self._data.release()
+        self._header = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class RingReader:
+    """One reader's position in a SharedRingBuffer."""
+
+    def __init__(self, ring: SharedRingBuffer, slot: int = 0):
+        """
+        Attach to a reader slot.
+
+        Args:
+            ring: Ring to read
+            slot: Reader slot, 0 <= slot < ring.readers; one reader per slot
+        """
+        if not 0 <= slot < ring.readers:
+            raise ValueError(f"reader slot {slot} out of range")
+        self.ring = ring
+        self._index = _READERS + slot * _LINE
+        self._position = ring._header[_WRITE]
+        self._next: Optional[int] = None
+        ring._header[self._index] = self._position
+
+    def peek(self) -> Optional[Tuple[float, memoryview]]:
+        """
+        Next chunk without consuming it.
+
+        Returns:
+            (capture time, PCM view into the shared memory) or None if the
+            ring is empty; the view is valid until advance()
+        """
+        ring = self.ring
+        header = ring._header
+        position = self._position
+        if position == header[_WRITE]:
+            return None
+        capacity = ring.capacity
+        offset = position % capacity
+        length, timestamp = _RECORD.unpack_from(ring._data, offset)
+        if length == _WRAP:
+            position += capacity - offset
+            offset = 0
+            length, timestamp = _RECORD.unpack_from(ring._data, 0)
+        start = offset + _RECORD.size
+        self._next = position + _RECORD.size + _aligned(length)
+        return timestamp, ring._data[start:start + length]
+
+    def advance(self):
+        """Release the chunk returned by peek() to the writer."""
+        if self._next is not None:
+            self._position = self._next
+            self._next = None
+            self.ring._header[self._index] = self._position
+
+    def chunks(self, stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[float, memoryview]]:
+        """
+        Yield chunks as they arrive, polling while the ring is empty.
+
+        Each view must not be used after the next chunk is requested.
+        """
+        while stop is None or not stop():
+            chunk = self.peek()
+            if chunk is None:
+                time.sleep(POLL_INTERVAL)
+                continue
+            try:
+                yield chunk
+            finally:
+                chunk[1].release()
+                self.advance()
+
+    @property
+    def behind(self) -> int:
+        """Bytes written but not yet read."""
+        return self.ring._header[_WRITE] - self._position
+
+    def close(self):
+        """Give the slot back; the writer stops waiting for this reader."""
+        if self.ring._header is not None:
+            self.ring._header[self._index] = DETACHED
+
+
+def rms(pcm: memoryview) -> float:
+    """Root mean square of 16-bit PCM, read in place."""
+    samples = pcm.cast('h')
+    try:
+        count = len(samples)
+        return math.sqrt(sum(map(operator.mul, samples, samples)) / count) if count else 0.0
+    finally:
+        samples.release()
+
+
+class PacedCapture:
+    """
+    Timing of a capture device: a chunk is due every chunk_frames / rate
+    seconds and the device buffers device_chunks of them; chunks still
+    unread when the buffer is full are lost.
+    """
+
+    def __init__(self, sample_rate: int, chunk_frames: int, device_chunks: int = CAPTURE_DEVICE_CHUNKS):
+        self.period = chunk_frames / sample_rate
+        self.device_chunks = device_chunks
+        self.started = time.perf_counter()
+        self.next_chunk = 0
+
+    def wait(self) -> Tuple[int, int]:
+        """
+        Sleep until the next chunk is due.
+
+        Returns:
+            (chunks lost since the last call, index of the next chunk)
+        """
+        due = self.started + (self.next_chunk + 1) * self.period
+        now = time.perf_counter()
+        if now < due:
+            time.sleep(due - now)
+            now = time.perf_counter()
+        ready = int((now - self.started) / self.period)
+        lost = max(0, ready - self.next_chunk - self.device_chunks)
+        self.next_chunk += lost
+        chunk = self.next_chunk
+        self.next_chunk += 1
+        return lost, chunk
+
+
+@functools.lru_cache(maxsize=8)
+def _test_chunks(chunk_frames: int, sample_rate: int) -> Tuple[bytes, bytes]:
+    """(440 Hz tone, silence) chunks of the test signal."""
+    step = 2 * math.pi * 440 / sample_rate
+    tone = struct.pack(f"<{chunk_frames}h",
+                       *(int(6000 * math.sin(step * i)) for i in range(chunk_frames)))
+    return tone, bytes(chunk_frames * 2)
+
+
+def synthetic_chunk(index: int, chunk_frames: int, sample_rate: int,
+                    pattern: Tuple[float, float] = (1.5, 1.0)) -> bytes:
+    """
+    Chunk of a test signal: a 440 Hz tone for pattern[0] seconds, then
+    silence for pattern[1] seconds, repeated.
+    """
+    speech, pause = pattern
+    tone, silence = _test_chunks(chunk_frames, sample_rate)
+    t = index * chunk_frames / sample_rate
+    return silence if t % (speech + pause) >= speech else tone
+
+
+def capture_main(ring_name: str, stop_event, sample_rate: int = CAPTURE_SAMPLE_RATE,
+                 chunk_frames: int = CAPTURE_CHUNK_FRAMES, device_index: Optional[int] = None,
+                 synthetic: bool = False, device_chunks: int = CAPTURE_DEVICE_CHUNKS):
+    """
+    Entry point of the capture process: read chunks until stop_event is set.
+
+    Args:
+        ring_name: Shared memory name of the SharedRingBuffer
+        stop_event: multiprocessing.Event ending capture
+        sample_rate: Frames per second
+        chunk_frames: Frames per chunk
+        device_index: PyAudio input device, default device if None
+        synthetic: Generate a paced tone/silence test signal instead of
+                   opening a microphone
+        device_chunks: Chunks the simulated device buffers (synthetic only)
+    """
+    ring = SharedRingBuffer(name=ring_name)
+    try:
+        if synthetic:
+            clock = PacedCapture(sample_rate, chunk_frames, device_chunks)
+            while not stop_event.is_set():
+                lost, index = clock.wait()
+                if lost:
+                    ring.count_device_overruns(lost)
+                ring.write(synthetic_chunk(index, chunk_frames, sample_rate))
+            return
+
+        import pyaudio
+        audio = pyaudio.PyAudio()
+        stream = audio.open(format=pyaudio.paInt16, channels=1, rate=sample_rate, input=True,
+                            frames_per_buffer=chunk_frames, input_device_index=device_index)
+        try:
+            while not stop_event.is_set():
+                # A late read shows up as fewer frames available than buffered
+                data = stream.read(chunk_frames, exception_on_overflow=False)
+                ring.write(data)
+        finally:
+            stream.stop_stream()
+            stream.close()
+            audio.terminate()
+    finally:
+        ring.close()
+
+
+class CaptureProcess:
+    """Runs capture_main in a child process feeding a SharedRingBuffer."""
+
+    def __init__(self, sample_rate: int = CAPTURE_SAMPLE_RATE, chunk_frames: int = CAPTURE_CHUNK_FRAMES,
+                 ring_seconds: float = CAPTURE_RING_SECONDS, readers: int = 1,
+                 device_index: Optional[int] = None, synthetic: bool = False):
+        """
+        Initialize the capture process.
+
+        Args:
+            sample_rate: Frames per second
+            chunk_frames: Frames per chunk
+            ring_seconds: Audio the ring holds before overruns
+            readers: Reader slots, e.g. recognition and a DSP worker
+            device_index: Microphone device, default device if None
+            synthetic: Capture a generated test signal instead of the microphone
+        """
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_frames
+        self.ring = SharedRingBuffer.for_audio(ring_seconds, sample_rate, chunk_frames, readers=readers)
+        # A fresh interpreter: the parent has threads and an open audio library
+        context = multiprocessing.get_context("spawn")
+        self._stop_event = context.Event()
+        self._process = context.Process(
+            target=capture_main, name="audio-capture",
+            args=(self.ring.name, self._stop_event, sample_rate, chunk_frames, device_index, synthetic)
+        )
+        self._process.daemon = True
+        self._stopped = False
+        CAPTURE_OVERRUNS.labels("device").set_function(lambda: self.ring.device_overruns)
+        CAPTURE_OVERRUNS.labels("ring").set_function(lambda: self.ring.overruns)
+
+    def start(self) -> "CaptureProcess":
+        """Start capturing."""
+        self._process.start()
+        return self
+
+    def is_alive(self) -> bool:
+        """Whether the capture process is running."""
+        return self._process.is_alive()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop capturing and free the ring."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._stop_event.set()
+        if self._process.pid is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                logger.warning("Capture process did not stop, terminating it")
+                self._process.terminate()
+        # Keep the final counts once the ring is gone
+        for stage, count in (("device", self.ring.device_overruns), ("ring", self.ring.overruns)):
+            CAPTURE_OVERRUNS.labels(stage).set_function(None)
+            CAPTURE_OVERRUNS.labels(stage).set(count)
+        self.ring.close()
+
+
+class SharedMemorySource(AudioSource):
+    """Utterances endpointed from a SharedRingBuffer by signal energy."""
+
+    live = True
+
+    def __init__(self, ring: SharedRingBuffer, slot: int = 0, sample_rate: int = CAPTURE_SAMPLE_RATE,
+                 energy_threshold: float = ENERGY_THRESHOLD, pause_threshold: float = 0.8,
+                 preroll: float = 0.5, on_close: Optional[Callable[[], None]] = None):
+        """
+        Initialize the source.
+
+        Args:
+            ring: Ring the capture process writes 16-bit mono PCM to
+            slot: Reader slot of the ring to use
+            sample_rate: Frames per second of the captured audio
+            energy_threshold: RMS above which a chunk counts as speech
+            pause_threshold: Seconds of silence that end an utterance
+            preroll: Seconds of audio before speech onset kept in the utterance
+            on_close: Called by close(), e.g. to stop the capture process
+        """
+        self.reader = ring.reader(slot)
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.pause_threshold = pause_threshold
+        self.preroll = preroll
+        self.on_close = on_close
+        self.last_latency = 0.0
+
+    def read_utterance(self, timeout: Optional[float] = None,
+                       phrase_time_limit: Optional[float] = None) -> Optional[AudioClip]:
+        """Wait for speech, then collect chunks until pause_threshold of silence."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        frame_bytes = 2 * self.sample_rate
+        before: Deque[bytes] = collections.deque()
+        before_bytes = 0
+        utterance: Optional[bytearray] = None
+        spoken = silence = 0.0
+        while True:
+            chunk = self.reader.peek()
+            if chunk is None:
+                if utterance is None and deadline is not None and time.perf_counter() > deadline:
+                    return None
+                time.sleep(POLL_INTERVAL)
+                continue
+            captured, pcm = chunk
+            try:
+                seconds = len(pcm) / frame_bytes
+                loud = rms(pcm) > self.energy_threshold
+                if utterance is None:
+                    if not loud:
+                        # Keep a little audio before the onset; the only copy of quiet chunks
+                        before.append(bytes(pcm))
+                        before_bytes += len(pcm)
+                        while before_bytes - len(before[0]) >= self.preroll * frame_bytes:
+                            before_bytes -= len(before.popleft())
+                        if deadline is not None and time.perf_counter() > deadline:
+                            return None
+                        continue
+                    utterance = bytearray(b"".join(before))
+                utterance += pcm
+                spoken += seconds
+                silence = 0.0 if loud else silence + seconds
+            finally:
+                pcm.release()
+                self.reader.advance()
+            if silence >= self.pause_threshold or (phrase_time_limit and spoken >= phrase_time_limit):
+                self.last_latency = time.perf_counter() - captured
+                self.last_trailing_silence = silence + self.last_latency
+                return AudioClip(bytes(utterance), self.sample_rate, 2, 1)
+
+    def close(self):
+        """Release the reader slot."""
+        self.reader.close()
+        if self.on_close:
+            self.on_close()
@@ -0,0 +1,87 @@
+"""
+Audio output sinks for the AI Agent application.
+
+NullSink replaces TTSEngine where no speaker exists: it takes as long as the
+reply would take to speak (optionally sped up) without producing sound. A
+recorder set on it stores silence of the reply's speaking length, so talk
+time shows up in the segment store as it would for real TTS.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+from ..config.settings import DEFAULT_VOICE_RATE
+from ..events import EventBus
+from ..tracing import get_tracer, PLAYBACK_START
+from .recording import AGENT
+
+# Sample rate of the silence recorded for a reply
+SILENCE_SAMPLE_RATE = 8000
+
+
+class NullSink:
+    """Silent stand-in for TTSEngine with realistic speaking time."""
+
+    def __init__(self, speed: float = 0.0, chars_per_second: Optional[float] = None):
+        """
+        Initialize the sink.
+
+        Args:
+            speed: Playback speed relative to real time; 0 returns immediately
+            chars_per_second: Speaking rate; derived from DEFAULT_VOICE_RATE if None
+        """
+        self.speed = speed
+        # Japanese TTS reads roughly one character per "word" of the rate setting
+        self.chars_per_second = chars_per_second or DEFAULT_VOICE_RATE / 60 * 3
+        self.spoken_seconds = 0.0
+        self.utterances = 0
+        self.voice_callback: Optional[Callable] = None
+        self.event_bus: Optional[EventBus] = None
+        self.recorder = None
+        self._stop_event = threading.Event()
+
+    def set_voice_callback(self, callback: Callable):
+        """Accepted for TTSEngine compatibility; no visualization is produced."""
+        self.voice_callback = callback
+
+    def set_event_bus(self, event_bus: EventBus):
+        """Accepted for TTSEngine compatibility."""
+        self.event_bus = event_bus
+
+    def set_recorder(self, recorder):
+        """Store the (silent) replies in a SegmentRecorder."""
+        self.recorder = recorder
+
+    def set_volume(self, volume: float):
+        """Accepted for TTSEngine compatibility."""
+
+    def speech_duration(self, text: str) -> float:
+        """Seconds it would take to speak text."""
+        return len(text) / self.chars_per_second
+
+    def speak(self, text: str, blocking: bool = True, prepared_audio: Optional[str] = None):
+        """Spend the (scaled) speaking time of text."""
+        duration = self.speech_duration(text)
+        self.spoken_seconds += duration
+        self.utterances += 1
+        tracer = get_tracer()
+        now = time.perf_counter()
+        tracer.record(PLAYBACK_START, now, now)
+        tracer.first_audio(now)
+        if self.recorder:
+            self.recorder.record(bytes(int(duration * SILENCE_SAMPLE_RATE) * 2), SILENCE_SAMPLE_RATE,
+                                 source=AGENT)
+        if self.speed > 0 and blocking:
+            self._stop_event.clear()
+            self._stop_event.wait(duration / self.speed)
+
+    def synthesize_to_file(self, text: str, filename: str, preemptible: bool = False) -> bool:
+        """Nothing is synthesized."""
+        return False
+
+    def stop(self):
+        """Cut the current utterance short."""
+        self._stop_event.set()
+
+    def cleanup(self):
+        """Nothing to release."""
@@ -0,0 +1,196 @@
+"""
+Audio sources for the AI Agent application.
+
+An audio source hands out one customer utterance at a time as an AudioClip.
+Besides the microphone, sources can replay WAV files or scripted text turns,
+so calls can be driven on machines without sound hardware.
+"""
+
+import os
+import time
+import wave
+from typing import Iterable, List, Optional, Sequence
+
+
+class AudioClip:
+    """One captured utterance as raw PCM."""
+
+    __slots__ = ('pcm', 'sample_rate', 'sample_width', 'channels', 'transcript')
+
+    def __init__(self, pcm: bytes, sample_rate: int = 16000, sample_width: int = 2,
+                 channels: int = 1, transcript: Optional[str] = None):
+        """
+        Initialize the clip.
+
+        Args:
+            pcm: Little-endian PCM frames
+            sample_rate: Frames per second
+            sample_width: Bytes per sample
+            channels: Number of interleaved channels
+            transcript: Known text of the utterance, used by stand-in recognizers
+        """
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.transcript = transcript
+
+    @property
+    def duration(self) -> float:
+        """Length of the clip in seconds."""
+        frame_size = self.sample_width * self.channels
+        return len(self.pcm) / frame_size / self.sample_rate if frame_size else 0.0
+
+    @classmethod
+    def from_wav(cls, filename: str, transcript: Optional[str] = None) -> "AudioClip":
+        """Load a WAV file; a sidecar .txt file provides the transcript if present."""
+        with wave.open(filename, 'rb') as wav:
+            pcm = wav.readframes(wav.getnframes())
+            clip = cls(pcm, wav.getframerate(), wav.getsampwidth(), wav.getnchannels())
+        if transcript is None:
+            sidecar = os.path.splitext(filename)[0] + ".txt"
+            if os.path.exists(sidecar):
+                with open(sidecar, encoding='utf-8') as f:
+                    transcript = f.read().strip()
+        clip.transcript = transcript
+        return clip
+
+    @classmethod
+    def from_text(cls, text: str, chars_per_second: float = 8.0,
+                  sample_rate: int = 16000) -> "AudioClip":
+        """Silent clip as long as speaking text would take, carrying text as transcript."""
+        frames = int(len(text) / chars_per_second * sample_rate)
+        return cls(bytes(frames * 2), sample_rate, 2, 1, transcript=text)
+
+
+class AudioSource:
+    """Base class of utterance sources."""
+
+    exhausted = False
+    # Wall-clock seconds of trailing silence the last utterance waited for
+    # before it was considered finished (endpointing)
+    last_trailing_silence = 0.0
+    # Whether utterances arrive in the caller's real time, so the gap between
+    # them is the caller's (scripted sources replay at any speed)
+    live = False
+
+    def read_utterance(self, timeout: Optional[float] = None,
+                       phrase_time_limit: Optional[float] = None) -> Optional[AudioClip]:
+        """
+        Wait for the next utterance.
+
+        Returns:
+            The utterance, or None if nothing was said within timeout
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the source."""
+
+
+class ScriptedSource(AudioSource):
+    """Plays back a fixed list of clips, pacing them like a live caller."""
+
+    def __init__(self, clips: Iterable[AudioClip], speed: float = 0.0,
+                 pause_threshold: float = 0.0):
+        """
+        Initialize the source.
+
+        Args:
+            clips: Utterances in order
+            speed: Playback speed relative to real time; 0 returns clips
+                   immediately, 1.0 waits each clip's duration
+            pause_threshold: Silence after each clip before it counts as
+                             finished, like speech_recognition's endpointing
+        """
+        self._clips: List[AudioClip] = list(clips)
+        self._position = 0
+        self.speed = speed
+        self.pause_threshold = pause_threshold
+
+    @property
+    def total_duration(self) -> float:
+        """Audio seconds of all clips, including endpointing silence."""
+        return sum(clip.duration + self.pause_threshold for clip in self._clips)
+
+    def read_utterance(self, timeout: Optional[float] = None,
+                       phrase_time_limit: Optional[float] = None) -> Optional[AudioClip]:
+        """Return the next clip after its (scaled) speaking time."""
+        if self._position >= len(self._clips):
+            self.exhausted = True
+            return None
+        clip = self._clips[self._position]
+        self._position += 1
+        if self.speed > 0:
+            self.last_trailing_silence = self.pause_threshold / self.speed
+            time.sleep((clip.duration + self.pause_threshold) / self.speed)
+        return clip
+
+
+class WavFileSource(ScriptedSource):
+    """Utterances read from WAV files."""
+
+    def __init__(self, filenames: Sequence[str], speed: float = 0.0,
+                 pause_threshold: float = 0.0):
+        """
+        Initialize the source.
+
+        Args:
+            filenames: WAV files in call order, each with an optional .txt transcript
+            speed: Playback speed relative to real time (0 = no waiting)
+            pause_threshold: Endpointing silence after each clip
+        """
+        super().__init__((AudioClip.from_wav(f) for f in filenames), speed, pause_threshold)
+
+
+class TextTurnSource(ScriptedSource):
+    """Utterances synthesized as silence of a realistic length from text turns."""
+
+    def __init__(self, turns: Sequence[str], speed: float = 0.0,
+                 chars_per_second: float = 8.0, sample_rate: int = 16000,
+                 pause_threshold: float = 0.0):
+        """
+        Initialize the source.
+
+        Args:
+            turns: Customer utterances in call order
+            speed: Playback speed relative to real time (0 = no waiting)
+            chars_per_second: Speaking rate used to size each clip
+            sample_rate: Sample rate of the generated PCM
+            pause_threshold: Endpointing silence after each clip
+        """
+        super().__init__(
+            (AudioClip.from_text(text, chars_per_second, sample_rate) for text in turns),
+            speed, pause_threshold
+        )
+
+
+class MicrophoneSource(AudioSource):
+    """Live microphone input through speech_recognition."""
+
+    live = True
+
+    def __init__(self, recognizer=None, device_index: Optional[int] = None):
+        """
+        Initialize the source.
+
+        Args:
+            recognizer: speech_recognition.Recognizer used for endpointing
+            device_index: Microphone device, default device if None
+        """
+        import speech_recognition as sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.microphone = sr.Microphone(device_index=device_index)
+
+    def read_utterance(self, timeout: Optional[float] = None,
+                       phrase_time_limit: Optional[float] = None) -> Optional[AudioClip]:
+        """Listen for one phrase on the microphone."""
+        import speech_recognition as sr
+        try:
+            with self.microphone as source:
+                audio = self.recognizer.listen(source, timeout=timeout,
+                                               phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            return None
+        self.last_trailing_silence = self.recognizer.pause_threshold
+        return AudioClip(audio.get_raw_data(), audio.sample_rate, audio.sample_width)
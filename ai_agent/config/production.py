@@ -12,10 +12,15 @@ LOG_LEVEL = "INFO"
 # File paths for production
 LOG_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "logs", "ai_agent.log")
 CONVERSATION_LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "logs", "conversations")
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+
+
+def ensure_log_directories():
+    """Create the log directories; importing this module has no side effects."""
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    os.makedirs(CONVERSATION_LOG_DIR, exist_ok=True)
 
-# Create logs directory if it doesn't exist
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-os.makedirs(CONVERSATION_LOG_DIR, exist_ok=True)
 
 # Production speech settings
 DEFAULT_VOLUME = float(os.getenv('DEFAULT_VOLUME', '0.8'))
@@ -35,4 +40,4 @@ ENABLE_CONVERSATION_LOGGING = True
 # Performance settings
 ENABLE_AUDIO_BUFFERING = True
 AUDIO_BUFFER_SIZE = 1024
-MAX_CONCURRENT_THREADS = 4
+IO_POOL_WORKERS = int(os.getenv('IO_POOL_WORKERS', os.getenv('MAX_CONCURRENT_THREADS', '4')))  # I/O pool size
@@ -20,11 +20,76 @@ BG_COLOR = '#f0f0f0'
 TITLE_FONT = ('Arial', 16, 'bold')
 STATUS_FONT = ('Arial', 10, 'italic')
 INPUT_FONT = ('Arial', 10)
+UI_REFRESH_RATE_HZ = 30  # cross-thread UI updates are applied at this rate
+HISTORY_VIEW_MAX_ENTRIES = 200  # entries kept in the history widget
+HISTORY_LOAD_BATCH = 50  # older entries loaded per request
 
 # Conversation settings
-MAX_CONVERSATION_HISTORY = 1000
+MAX_CONVERSATION_HISTORY = 1000  # newest entries kept in memory per conversation
+HISTORY_SPILL_DIR = None  # older entries go to a temporary file here; system temp dir if None
 RESPONSE_DELAY = 0.5
 
+# Speculative response preparation
+ENABLE_SPECULATION = True
+SPECULATION_MAX_CANDIDATES = 3  # replies pre-synthesized per turn
+
+# Worker pools shared by background tasks
+IO_POOL_WORKERS = 8  # blocking audio, network and file work, exports
+CPU_POOL_WORKERS = 2  # synthesis and pause analysis
+TURN_POOL_WORKERS = 4  # conversation turns of all calls
+WORKER_QUEUE_LIMIT = 32  # tasks waiting per pool before submitters block
+WORKER_SUBMIT_TIMEOUT = 10.0  # seconds a submitter waits on a saturated pool
+
+# Latency tracing
+ENABLE_TRACING = True
+TRACE_BUFFER_SPANS = 20000  # spans kept for trace export
+TRACE_HISTOGRAM_WINDOW = 1000  # recent durations per stage for percentiles
+
+# Memory diagnostics
+MEMORY_SNAPSHOT_INTERVAL = 300  # seconds between tracemalloc snapshots
+MEMORY_SOAK_MAX_KB_PER_SESSION = 8.0  # allowed resident memory growth per call
+MEMORY_SOAK_MIN_ROUNDS = 8  # measured rounds needed for a verdict
+MEMORY_SOAK_MIN_WARMUP_ROUNDS = 3  # rounds run before measuring, for a verdict
+MEMORY_SOAK_MIN_SESSIONS = 2000  # measured calls needed for a verdict
+
+# Adaptive endpointing: the silence that ends an utterance follows the
+# caller's own pauses within a call. Off by default: offline it only shortens
+# fast callers' waits (about 50 ms) and does not help slow callers
+ADAPTIVE_ENDPOINTING = False
+ENDPOINT_PAUSE_THRESHOLD = 0.8  # seconds; speech_recognition's default, used until adapted
+ENDPOINT_MIN_PAUSE = 0.5
+ENDPOINT_MAX_PAUSE = 0.8  # above the fixed threshold the mean delay grows (see endpointing.py)
+ENDPOINT_PAUSE_QUANTILE = 1.0  # share of the caller's pauses the threshold exceeds (1.0: the longest)
+ENDPOINT_MARGIN = 2.5  # applied to that quantile
+ENDPOINT_MIN_SAMPLES = 3  # pauses seen before adapting
+ENDPOINT_WINDOW = 50  # most recent pauses considered
+ENDPOINT_RESUME_WINDOW = 1.0  # seconds after an endpoint within which speech means a truncation
+
+# Audio capture in a separate process (shared-memory ring buffer)
+CAPTURE_PROCESS = False
+CAPTURE_SAMPLE_RATE = 16000
+CAPTURE_CHUNK_FRAMES = 1024  # frames per chunk, as speech_recognition reads them
+CAPTURE_RING_SECONDS = 10  # audio the ring holds before capture drops chunks
+CAPTURE_DEVICE_CHUNKS = 4  # chunks the sound card buffers for a late reader
+ENERGY_THRESHOLD = 300  # RMS above which captured audio counts as speech
+
+# Audio recording; off unless a directory is given
+RECORDING_DIR = None
+RECORDING_CODEC = 'zlib'  # 'zlib', 'flac' (needs soundfile) or 'pcm'
+RECORDING_QUEUE_SIZE = 256  # segments waiting for the writer before new ones are dropped
+
+# Metrics export
+METRICS_HOST = "127.0.0.1"  # the metrics listener is local only
+METRICS_TEXTFILE_INTERVAL = 15  # seconds between textfile writes
+
+# Conversation script file (JSON); the settings below are used if unset
+SCRIPT_FILE = None
+SCRIPT_RELOAD_INTERVAL = 2.0  # seconds between checks of the script file
+
+# Export settings
+EXPORT_FORMAT = 'text'  # 'text' or 'jsonl'
+EXPORT_PROGRESS_INTERVAL = 500  # entries between progress updates
+
 # Predefined questions for the rice sales conversation
 PREDEFINED_QUESTIONS = [
     "こんにちは。私、X商事の高木と申します。突然のお電話失礼いたします。弊社では、主に弁当店様向けにお米の販売を行っておりまして、今日はその中でもおすすめの商品をご紹介させていただければと思い、ご連絡いたしました。",
@@ -64,3 +129,32 @@ KEYWORD_MAPPINGS = {
     "price": ["値段", "価格", "いくら", "安い", "高い", "コスト"],
     "quality": ["米", "ご飯", "品質", "味", "おいしい", "粒"]
 }
+
+# Conversation flow. Each state asks a scripted question (index into
+# PREDEFINED_QUESTIONS) or answers from a RESPONSE_TEMPLATES category, and
+# "on" maps the customer's intent (a KEYWORD_MAPPINGS category) to the next
+# state; "default" covers every intent that is not listed.
+_FOLLOW_UP = {
+    "interest": "interest",
+    "busy": "busy",
+    "price": "price",
+    "quality": "quality",
+    "default": "default"
+}
+
+CONVERSATION_START_STATE = "greeting"
+CONVERSATION_FLOW = {
+    "greeting": {"question": 0, "on": {"busy": "busy_greeting", "default": "product"}},
+    "busy_greeting": {"template": "busy", "on": {"default": "product"}},
+    "product": {"question": 1, "on": {"busy": "busy_product", "price": "price_product", "default": "feature"}},
+    "busy_product": {"template": "busy", "on": {"default": "feature"}},
+    "price_product": {"template": "price", "on": {"default": "feature"}},
+    "feature": {"question": 2, "on": {"price": "price_feature", "default": "sample_offer"}},
+    "price_feature": {"template": "price", "on": {"default": "sample_offer"}},
+    "sample_offer": {"question": 3, "on": _FOLLOW_UP},
+    "interest": {"template": "interest", "on": _FOLLOW_UP},
+    "busy": {"template": "busy", "on": _FOLLOW_UP},
+    "price": {"template": "price", "on": _FOLLOW_UP},
+    "quality": {"template": "quality", "on": _FOLLOW_UP},
+    "default": {"template": "default", "on": _FOLLOW_UP}
+}
@@ -1,28 +1,80 @@
 """
 Conversation management for the AI Agent application.
+
+All changes to the conversation state are applied by a single-writer
+TurnExecutor, so turns from the conversation thread and the UI thread are
+serialized. Readers get immutable snapshots without taking any locks.
 """
 
-import random
+import concurrent.futures
+import threading
 from datetime import datetime
-from typing import List, Optional, Callable, Dict, Any
+from types import MappingProxyType
+from typing import Iterator, List, Mapping, Optional, Callable, Dict, Any, Sequence, Tuple
 from ..config.settings import (
-    PREDEFINED_QUESTIONS, 
-    RESPONSE_TEMPLATES, 
-    KEYWORD_MAPPINGS
+    EXPORT_FORMAT,
+    EXPORT_PROGRESS_INTERVAL,
+    HISTORY_SPILL_DIR,
+    MAX_CONVERSATION_HISTORY
 )
+from ..events import EventBus, HistoryEvent, StatusEvent
+from .engine import ConversationEngine, BOT_SPEAKER, USER_SPEAKER, NOT_STARTED
+from .exporter import export_entries
+from .history import ConversationHistory, HistorySnapshot
+from .turn_executor import TurnExecutor
+from ..workers import get_io_pool
 
 
 class ConversationManager:
-    """Manages conversation flow and response generation."""
-    
-    def __init__(self):
-        """Initialize the conversation manager."""
-        self.conversation_history: List[Dict[str, Any]] = []
-        self.user_responses: List[str] = []
-        self.current_question_index = 0
-        self.is_active = False
+    """Manages conversation flow and response generation for a single call."""
+    
+    def __init__(self, engine: Optional[ConversationEngine] = None):
+        """
+        Initialize the conversation manager.
+        
+        Args:
+            engine: Shared conversation engine; a private one is created if None
+        """
+        # The manager keeps the UI-facing history itself, so the session
+        # only needs the compact per-call state.
+        self.engine = engine or ConversationEngine(record_history=False)
+        self.session = self.engine.create_session()
+        # Long-running managers keep the newest entries in memory and
+        # spill older ones to disk
+        self._history = ConversationHistory(MAX_CONVERSATION_HISTORY, HISTORY_SPILL_DIR)
+        self._user_responses: List[str] = []
+        self._executor = TurnExecutor(name=f"conversation-{self.session.session_id}")
+        self._summary: Mapping[str, Any] = MappingProxyType({})
         self.history_callback: Optional[Callable] = None
         self.status_callback: Optional[Callable] = None
+        self.event_bus: Optional[EventBus] = None
+        self._publish_summary()
+    
+    @property
+    def current_question_index(self) -> int:
+        """Number of scripted questions asked so far."""
+        return self.engine.question_progress(self.session)
+    
+    @property
+    def is_active(self) -> bool:
+        """Whether the conversation is running."""
+        return self.session.is_active
+    
+    @property
+    def conversation_history(self) -> HistorySnapshot:
+        """Immutable snapshot of the conversation history."""
+        return self._history.snapshot()
+    
+    @property
+    def user_responses(self) -> HistorySnapshot:
+        """
+        Immutable snapshot of the user's recent messages.
+
+        Only the newest MAX_CONVERSATION_HISTORY or more are kept here; every
+        user message is also in the conversation history.
+        """
+        responses = self._user_responses
+        return HistorySnapshot(responses, len(responses))
     
     def set_history_callback(self, callback: Callable):
         """Set callback for conversation history updates."""
@@ -32,8 +84,14 @@ class ConversationManager:
         """Set callback for status updates."""
         self.status_callback = callback
     
+    def set_event_bus(self, event_bus: EventBus):
+        """Publish status and history events on an event bus."""
+        self.event_bus = event_bus
+    
     def _update_status(self, message: str):
-        """Update status via callback."""
+        """Update status via event bus or callback."""
+        if self.event_bus:
+            self.event_bus.publish(StatusEvent(message, source="conversation"))
         if self.status_callback:
             self.status_callback(message)
     
@@ -45,81 +103,127 @@ class ConversationManager:
             'speaker': speaker,
             'message': message
         }
-        self.conversation_history.append(entry)
+        self._history.append(entry)
         
+        if self.event_bus:
+            self.event_bus.publish(HistoryEvent(entry))
         if self.history_callback:
             self.history_callback(entry)
     
+    def _publish_summary(self):
+        """Publish a new immutable summary. Runs on the turn executor."""
+        total = self._history.total
+        user_messages = self.session.user_messages
+        self._summary = MappingProxyType({
+            'total_messages': total,
+            'user_messages': user_messages,
+            'bot_messages': total - user_messages,
+            'current_question_index': self.current_question_index,
+            'current_state': self.engine.state_name(self.session),
+            'is_active': self.session.is_active
+        })
+    
     def start_conversation(self):
         """Start a new conversation."""
-        self.is_active = True
-        self.current_question_index = 0
+        return self._executor.call(self._start_conversation)
+    
+    def _start_conversation(self):
         self._update_status("会話開始中...")
         
         # Ask the first question
-        if self.current_question_index < len(PREDEFINED_QUESTIONS):
-            question = PREDEFINED_QUESTIONS[self.current_question_index]
-            self._add_to_history("ボット", question)
-            self.current_question_index += 1
-            return question
-        return None
+        question = self.engine.start_session(self.session)
+        if question:
+            self._add_to_history(BOT_SPEAKER, question)
+        self._publish_summary()
+        return question
     
     def stop_conversation(self):
         """Stop the current conversation."""
-        self.is_active = False
+        self._executor.call(self._stop_conversation)
+    
+    def _stop_conversation(self):
+        self.session.is_active = False
+        self._publish_summary()
         self._update_status("会話停止")
     
-    def process_user_response(self, response: str) -> Optional[str]:
+    def process_user_response(self, response: str,
+                              prepared: Optional[Dict[int, str]] = None) -> Optional[str]:
         """
         Process user response and generate bot reply.
         
         Args:
             response: User's spoken or typed response
+            prepared: Replies chosen ahead of time by prepare_responses()
             
         Returns:
             Bot's response message
         """
+        return self.process_turn(response, prepared)[0]
+    
+    def process_turn(self, response: str,
+                     prepared: Optional[Dict[int, str]] = None) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Process user response and also report how it was classified.
+        
+        Args:
+            response: User's spoken or typed response
+            prepared: Replies chosen ahead of time by prepare_responses()
+            
+        Returns:
+            (bot's response message, intent id of the response or None if
+            the conversation is not active)
+        """
+        return self._executor.call(self._process_turn, response, prepared)
+    
+    def _process_turn(self, response: str,
+                      prepared: Optional[Dict[int, str]]) -> Tuple[Optional[str], Optional[int]]:
+        if not self.is_active:
+            return None, None
+        bot_response = self._process_user_response(response, prepared)
+        return bot_response, self.session.last_intent
+    
+    def _process_user_response(self, response: str,
+                               prepared: Optional[Dict[int, str]]) -> Optional[str]:
         if not self.is_active:
             return None
         
         # Add user response to history
-        self.user_responses.append(response)
-        self._add_to_history("ユーザー", response)
+        self._user_responses.append(response)
+        if len(self._user_responses) >= 2 * MAX_CONVERSATION_HISTORY:
+            # A new list, so user_responses snapshots stay valid; the
+            # history keeps the complete record
+            self._user_responses = self._user_responses[-MAX_CONVERSATION_HISTORY:]
+        self.session.user_messages += 1
+        self._add_to_history(USER_SPEAKER, response)
         
         # Generate bot response
-        bot_response = self._generate_response(response)
+        bot_response = self._generate_response(response, prepared)
         if bot_response:
-            self._add_to_history("ボット", bot_response)
+            self._add_to_history(BOT_SPEAKER, bot_response)
         
+        self._publish_summary()
         return bot_response
     
-    def _generate_response(self, user_response: str) -> str:
+    def _generate_response(self, user_response: str,
+                           prepared: Optional[Dict[int, str]] = None) -> str:
         """Generate appropriate response based on user input."""
-        # Check if we have predefined questions to ask
-        if self.current_question_index < len(PREDEFINED_QUESTIONS):
-            response = PREDEFINED_QUESTIONS[self.current_question_index]
-            self.current_question_index += 1
-            return response
-        
-        # Generate contextual response based on keywords
-        response_category = self._categorize_response(user_response)
-        
-        if response_category in RESPONSE_TEMPLATES:
-            responses = RESPONSE_TEMPLATES[response_category]
-            return random.choice(responses)
+        return self.engine.generate_response(self.session, user_response, prepared)
+    
+    def prepare_responses(self, intent_order: Optional[List[int]] = None) -> Dict[int, str]:
+        """
+        Choose the possible replies to the next user message in advance.
         
-        # Default response
-        return random.choice(RESPONSE_TEMPLATES["default"])
+        Args:
+            intent_order: Intent ids from most to least likely
+            
+        Returns:
+            Next state id to reply text, in likelihood order
+        """
+        return self._executor.call(self.engine.candidates, self.session, intent_order)
     
     def _categorize_response(self, response: str) -> str:
         """Categorize user response based on keywords."""
-        response_lower = response.lower()
-        
-        for category, keywords in KEYWORD_MAPPINGS.items():
-            if any(keyword in response for keyword in keywords):
-                return category
-        
-        return "default"
+        return self.engine.categorize(response)
     
     def send_manual_message(self, message: str) -> Optional[str]:
         """
@@ -135,45 +239,74 @@ class ConversationManager:
     
     def get_next_question(self) -> Optional[str]:
         """Get the next predefined question."""
-        if self.current_question_index < len(PREDEFINED_QUESTIONS):
-            question = PREDEFINED_QUESTIONS[self.current_question_index]
-            self.current_question_index += 1
-            return question
-        return None
+        return self._executor.call(self._get_next_question)
+    
+    def _get_next_question(self) -> Optional[str]:
+        question = self.engine.next_question(self.session)
+        self._publish_summary()
+        return question
     
     def reset_conversation(self):
         """Reset conversation to initial state."""
-        self.conversation_history.clear()
-        self.user_responses.clear()
-        self.current_question_index = 0
-        self.is_active = False
+        self._executor.call(self._reset_conversation)
+    
+    def _reset_conversation(self):
+        self._history.clear()
+        self._user_responses = []
+        self.session.user_messages = 0
+        self.session.state = NOT_STARTED
+        self.session.is_active = False
+        self._publish_summary()
         self._update_status("会話を初期化しました")
     
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history.clear()
+        self._executor.call(self._clear_history)
+    
+    def _clear_history(self):
+        self._history.clear()
+        self._publish_summary()
         self._update_status("ログをクリアしました")
     
-    def get_conversation_summary(self) -> Dict[str, Any]:
-        """Get summary of current conversation."""
-        return {
-            'total_messages': len(self.conversation_history),
-            'user_messages': len(self.user_responses),
-            'bot_messages': len(self.conversation_history) - len(self.user_responses),
-            'current_question_index': self.current_question_index,
-            'is_active': self.is_active
-        }
+    def get_conversation_summary(self) -> Mapping[str, Any]:
+        """Get an immutable summary of the current conversation."""
+        return self._summary
     
-    def export_conversation(self, filename: str):
-        """Export conversation to file."""
-        try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("AI エージェント - 会話ログ\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for entry in self.conversation_history:
-                    f.write(f"[{entry['timestamp']}] {entry['speaker']}: {entry['message']}\n\n")
+    def export_conversation(self, filename: str, export_format: str = EXPORT_FORMAT,
+                            compression: Optional[str] = None,
+                            background: bool = False) -> Optional[concurrent.futures.Future]:
+        """
+        Export conversation to file.
+        
+        Args:
+            filename: Output path (a .gz or .zst suffix selects compression)
+            export_format: 'text' for the readable log or 'jsonl'
+            compression: None, 'gzip' or 'zstd'; inferred from filename if None
+            background: Run the export on the shared I/O pool
             
+        Returns:
+            Future of the export if background is True, otherwise None
+        """
+        if background:
+            return get_io_pool().submit(self._export_worker, filename, export_format, compression)
+        
+        self._export_worker(filename, export_format, compression)
+        return None
+    
+    def _export_worker(self, filename: str, export_format: str, compression: Optional[str]):
+        """Stream the history into the export file and report progress."""
+        def report_progress(written: int, total: int):
+            self._update_status(f"エクスポート中... {written}/{total}")
+        
+        try:
+            export_entries(
+                self._history.snapshot(),
+                filename,
+                export_format=export_format,
+                compression=compression,
+                progress_callback=report_progress,
+                progress_interval=EXPORT_PROGRESS_INTERVAL
+            )
             self._update_status(f"会話を {filename} にエクスポートしました")
         except Exception as e:
             self._update_status(f"エクスポートエラー: {str(e)}")
@@ -182,6 +315,57 @@ class ConversationManager:
         """Check if conversation is currently active."""
         return self.is_active
     
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get full conversation history."""
-        return self.conversation_history.copy()
+    def get_conversation_history(self) -> Sequence[Dict[str, Any]]:
+        """Get an immutable O(1) snapshot of the whole conversation history."""
+        return self._history.snapshot()
+    
+    @property
+    def history_cursor(self) -> int:
+        """Sequence number the next history entry will get."""
+        return self._history.cursor
+    
+    def get_history_since(self, seq: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get only the history entries added after a cursor.
+        
+        Args:
+            seq: Cursor from a previous call, or 0 for the whole history
+            limit: Maximum number of entries to return
+            
+        Returns:
+            (new entries, cursor for the next call)
+        """
+        return self._history.since(seq, limit)
+    
+    def get_history_before(self, seq: int, count: int) -> List[Dict[str, Any]]:
+        """
+        Get up to count history entries older than a sequence number.
+        
+        Args:
+            seq: Sequence number of the oldest entry already loaded
+            count: Maximum number of entries to return
+            
+        Returns:
+            Entries in chronological order
+        """
+        return self._history.before(seq, count)
+    
+    def subscribe_history(self, seq: Optional[int] = None,
+                          stop_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield history entries as they are added.
+        
+        Args:
+            seq: First sequence number to yield; only new entries if None
+            stop_event: Ends the subscription when set
+        """
+        return self._history.subscribe(seq, stop_event)
+    
+    def pending_turns(self) -> int:
+        """Number of state changes waiting on the turn executor."""
+        return self._executor.pending()
+    
+    def close(self):
+        """Wait for pending turns to run and release the session."""
+        self._executor.shutdown()
+        self.engine.end_session(self.session.session_id)
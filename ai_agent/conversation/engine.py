@@ -0,0 +1,362 @@
+"""
+Session-oriented conversation engine for the AI Agent application.
+
+The script, response templates, compiled keyword matchers and the compiled
+conversation flow are loaded once into an immutable ConversationScript shared
+by every call. Each call only owns a small ConversationSession, so one process
+can hold many concurrent calls.
+
+The script can be replaced while calls are running (see script_file): the
+engine swaps one reference, and each session moves to the new script by
+state name on its next turn.
+"""
+
+import itertools
+import random
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from ..config.settings import (
+    PREDEFINED_QUESTIONS,
+    RESPONSE_TEMPLATES,
+    KEYWORD_MAPPINGS,
+    CONVERSATION_FLOW,
+    CONVERSATION_START_STATE
+)
+from ..metrics import CATEGORY_HITS, CONVERSATION_TURNS
+from ..tracing import get_tracer, CATEGORIZATION, RESPONSE_SELECTION
+from .flow import ConversationGraph, DEFAULT_INTENT, build_linear_flow, compile_flow
+
+DEFAULT_CATEGORY = DEFAULT_INTENT
+
+# Session state before the conversation has started
+NOT_STARTED = -1
+
+# Speaker labels used in conversation history
+BOT_SPEAKER = "ボット"
+USER_SPEAKER = "ユーザー"
+
+
+class KeywordMatcher:
+    """Keyword categorizer with one precompiled pattern per category."""
+
+    __slots__ = ('categories', 'default_id', '_patterns')
+
+    def __init__(self, keyword_mappings: Mapping[str, Sequence[str]]):
+        """
+        Compile keyword mappings.
+
+        Args:
+            keyword_mappings: Category name to keyword list, in priority order
+        """
+        categories = tuple(c for c in keyword_mappings if c != DEFAULT_CATEGORY)
+        self.categories: Tuple[str, ...] = categories + (DEFAULT_CATEGORY,)
+        self.default_id = len(categories)
+        self._patterns = tuple(
+            (intent_id, re.compile("|".join(re.escape(k) for k in keyword_mappings[category])))
+            for intent_id, category in enumerate(categories)
+            if keyword_mappings[category]
+        )
+
+    def classify(self, text: str) -> int:
+        """Return the intent id of the first category whose keywords occur in text."""
+        for intent_id, pattern in self._patterns:
+            if pattern.search(text):
+                return intent_id
+        return self.default_id
+
+    def categorize(self, text: str) -> str:
+        """Return the first category whose keywords occur in text."""
+        return self.categories[self.classify(text)]
+
+
+class ConversationScript:
+    """Immutable sales script shared read-only by all sessions."""
+
+    __slots__ = ('questions', 'templates', 'matcher', 'graph')
+
+    def __init__(self, questions: Sequence[str],
+                 templates: Mapping[str, Sequence[str]],
+                 keyword_mappings: Mapping[str, Sequence[str]],
+                 flow: Optional[Mapping[str, Mapping[str, Any]]] = None,
+                 start_state: Optional[str] = None):
+        """
+        Build the shared script.
+
+        Args:
+            questions: Scripted questions referenced by the flow
+            templates: Category name to candidate responses
+            keyword_mappings: Category name to keywords; categories are the intents
+            flow: Declarative conversation flow; questions are asked in order
+                  and then answered by intent if None
+            start_state: Opening state of the flow
+        """
+        self.questions: Tuple[str, ...] = tuple(questions)
+        self.templates: Dict[str, Tuple[str, ...]] = {
+            category: tuple(responses) for category, responses in templates.items()
+        }
+        self.matcher = KeywordMatcher(keyword_mappings)
+        if flow is None:
+            flow = build_linear_flow(len(self.questions), self.matcher.categories[:-1])
+            start_state = None
+        self.graph: ConversationGraph = compile_flow(
+            flow, start_state, self.questions, self.templates, self.matcher.categories
+        )
+
+    def template_response(self, category: str) -> str:
+        """Pick a response template for a category."""
+        responses = self.templates.get(category) or self.templates[DEFAULT_CATEGORY]
+        return random.choice(responses)
+
+
+@lru_cache(maxsize=1)
+def default_script() -> ConversationScript:
+    """Get the script built from the application settings."""
+    return ConversationScript(PREDEFINED_QUESTIONS, RESPONSE_TEMPLATES, KEYWORD_MAPPINGS,
+                              CONVERSATION_FLOW, CONVERSATION_START_STATE)
+
+
+class ConversationSession:
+    """Per-call conversation state."""
+
+    __slots__ = ('session_id', 'script', 'state', 'user_messages', 'is_active', 'last_intent', 'history')
+
+    def __init__(self, session_id: str, record_history: bool = True,
+                 script: Optional[ConversationScript] = None):
+        """
+        Initialize the session.
+
+        Args:
+            session_id: Unique call identifier
+            record_history: Keep (time, speaker, message) tuples for this call
+            script: Script whose graph the state refers to
+        """
+        self.session_id = session_id
+        self.script = script
+        self.state = NOT_STARTED
+        self.user_messages = 0
+        self.is_active = False
+        # Intent id of the customer's last message
+        self.last_intent: Optional[int] = None
+        self.history: Optional[List[Tuple[float, str, str]]] = [] if record_history else None
+
+    def record(self, speaker: str, message: str):
+        """Append a message to the session history if it is recorded."""
+        if self.history is not None:
+            self.history.append((time.time(), speaker, message))
+
+
+class ConversationEngine:
+    """Runs many conversation sessions against one shared script."""
+
+    def __init__(self, script: Optional[ConversationScript] = None, record_history: bool = True):
+        """
+        Initialize the engine.
+
+        Args:
+            script: Shared script; defaults to the one built from settings
+            record_history: Whether new sessions keep their own history
+        """
+        self.record_history = record_history
+        self._sessions: Dict[str, ConversationSession] = {}
+        self._ids = itertools.count(1)
+        # (script, hit counter per intent id) replaced as one reference
+        self._active: Tuple[ConversationScript, List[Any]] = self._compile(script or default_script())
+
+    @staticmethod
+    def _compile(script: ConversationScript) -> Tuple[ConversationScript, List[Any]]:
+        """Pair a script with its per-intent metric children."""
+        return script, [CATEGORY_HITS.labels(name) for name in script.graph.intents]
+
+    @property
+    def script(self) -> ConversationScript:
+        """Script currently used for new turns."""
+        return self._active[0]
+
+    def swap_script(self, script: ConversationScript):
+        """
+        Replace the shared script without interrupting running calls.
+
+        The swap is a single reference assignment. Sessions keep their place
+        in the conversation by state name; a session whose state no longer
+        exists continues from the new start state.
+        """
+        self._active = self._compile(script)
+
+    @staticmethod
+    def _state_in(session: ConversationSession, script: ConversationScript) -> int:
+        """The session's state as an id in script's graph."""
+        if session.script is script or session.state == NOT_STARTED or session.script is None:
+            return session.state
+        name = session.script.graph.state_names[session.state]
+        return script.graph.state_ids.get(name, script.graph.start)
+
+    def _bind(self, session: ConversationSession, script: ConversationScript) -> bool:
+        """Move a session to script; True if it had to be moved."""
+        if session.script is script:
+            return False
+        session.state = self._state_in(session, script)
+        session.script = script
+        return True
+
+    def create_session(self, session_id: Optional[str] = None) -> ConversationSession:
+        """Create and register a new idle session."""
+        if session_id is None:
+            session_id = f"call-{next(self._ids)}"
+        session = ConversationSession(session_id, self.record_history, self.script)
+        self._sessions[session_id] = session
+        return session
+
+    def start_session(self, session: ConversationSession) -> str:
+        """
+        Start (or restart) a session and return the opening message.
+
+        Args:
+            session: Session to start
+
+        Returns:
+            Bot message of the flow's start state
+        """
+        script = self.script
+        graph = script.graph
+        session.script = script
+        session.is_active = True
+        session.state = graph.start
+        question = graph.respond(graph.start)
+        session.record(BOT_SPEAKER, question)
+        return question
+
+    def process(self, session: ConversationSession, user_response: str,
+                prepared: Optional[Mapping[int, str]] = None) -> Optional[str]:
+        """
+        Run one customer turn.
+
+        Args:
+            session: Session the turn belongs to
+            user_response: Customer's utterance
+            prepared: Responses chosen in advance by candidates(), keyed by state
+
+        Returns:
+            Bot response, or None if the session is not active
+        """
+        if not session.is_active:
+            return None
+
+        session.user_messages += 1
+        session.record(USER_SPEAKER, user_response)
+
+        bot_response = self.generate_response(session, user_response, prepared)
+        if bot_response:
+            session.record(BOT_SPEAKER, bot_response)
+        return bot_response
+
+    def generate_response(self, session: ConversationSession, user_response: str,
+                          prepared: Optional[Mapping[int, str]] = None) -> str:
+        """Advance the session on the customer's intent and return the reply."""
+        script, category_hits = self._active
+        if self._bind(session, script):
+            # Prepared replies are keyed by states of the previous script
+            prepared = None
+        graph = script.graph
+        tracer = get_tracer()
+        with tracer.span(CATEGORIZATION):
+            intent = script.matcher.classify(user_response)
+        session.last_intent = intent
+        category_hits[intent].inc()
+        CONVERSATION_TURNS.inc()
+        with tracer.span(RESPONSE_SELECTION):
+            if session.state == NOT_STARTED:
+                session.state = graph.start
+            else:
+                session.state = graph.next_state(session.state, intent)
+            if prepared and session.state in prepared:
+                return prepared[session.state]
+            return graph.respond(session.state)
+
+    def candidates(self, session: ConversationSession,
+                   intent_order: Optional[Sequence[int]] = None) -> Dict[int, str]:
+        """
+        Choose the reply for every state the next turn can reach.
+
+        The session is not modified. Any text returned here is a valid reply
+        for its state, so it can be passed to process() as prepared responses.
+
+        Args:
+            session: Session to look ahead from
+            intent_order: Intent ids from most to least likely; the default
+                          intent first, then the rest in table order if None
+
+        Returns:
+            Next state id to reply text, in likelihood order
+        """
+        script = self.script
+        graph = script.graph
+        state = self._state_in(session, script)
+        if state == NOT_STARTED:
+            return {graph.start: graph.respond(graph.start)}
+
+        if intent_order is None:
+            default_id = script.matcher.default_id
+            intent_order = [default_id] + [i for i in range(len(graph.intents)) if i != default_id]
+
+        row = graph.successors(state)
+        result: Dict[int, str] = {}
+        for intent in intent_order:
+            if intent >= len(row):
+                continue
+            target = row[intent]
+            if target not in result:
+                result[target] = graph.respond(target)
+        return result
+
+    def next_question(self, session: ConversationSession) -> Optional[str]:
+        """Advance the session along its default transition."""
+        script = self.script
+        self._bind(session, script)
+        graph = script.graph
+        if session.state == NOT_STARTED:
+            session.state = graph.start
+        else:
+            session.state = graph.next_state(session.state, script.matcher.default_id)
+        return graph.respond(session.state)
+
+    def question_progress(self, session: ConversationSession) -> int:
+        """Number of scripted questions the session has reached."""
+        script = self.script
+        state = self._state_in(session, script)
+        if state == NOT_STARTED:
+            return 0
+        return script.graph.progress[state]
+
+    def state_name(self, session: ConversationSession) -> Optional[str]:
+        """Name of the session's current flow state."""
+        script = self.script
+        state = self._state_in(session, script)
+        if state == NOT_STARTED:
+            return None
+        return script.graph.state_names[state]
+
+    def categorize(self, user_response: str) -> str:
+        """Categorize a customer utterance using the shared matchers."""
+        return self.script.matcher.categorize(user_response)
+
+    def end_session(self, session_id: str) -> Optional[ConversationSession]:
+        """Deactivate and unregister a session."""
+        session = self._sessions.pop(session_id, None)
+        if session:
+            session.is_active = False
+        return session
+
+    def get_session(self, session_id: str) -> Optional[ConversationSession]:
+        """Look up a registered session."""
+        return self._sessions.get(session_id)
+
+    def sessions(self) -> Iterator[ConversationSession]:
+        """Iterate over registered sessions."""
+        return iter(list(self._sessions.values()))
+
+    @property
+    def session_count(self) -> int:
+        """Number of registered sessions."""
+        return len(self._sessions)
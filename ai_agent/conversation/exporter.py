@@ -0,0 +1,129 @@
+"""
+Streaming conversation export for the AI Agent application.
+
+Entries are pulled from the history one at a time, formatted by a generator
+and written straight into the (optionally compressed) output stream, so the
+memory used by an export does not depend on the length of the history.
+"""
+
+import gzip
+import io
+import itertools
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+EXPORT_FORMATS = ('text', 'jsonl')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+_TEXT_HEADER = "AI エージェント - 会話ログ\n" + "=" * 50 + "\n\n"
+
+
+def iter_entries(history: Sequence[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield history entries without copying the list.
+
+    The number of entries is fixed when iteration starts, so entries added
+    while the export is running are not included; if the history is cleared
+    in the meantime the export simply ends early. History snapshots stream
+    their spilled entries from disk in batches.
+    """
+    return itertools.islice(iter(history), len(history))
+
+
+def format_text(entries: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Format entries in the human-readable log format."""
+    yield _TEXT_HEADER
+    for entry in entries:
+        yield f"[{entry['timestamp']}] {entry['speaker']}: {entry['message']}\n\n"
+
+
+def format_jsonl(entries: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Format entries as one JSON object per line."""
+    for entry in entries:
+        yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+_FORMATTERS = {
+    'text': format_text,
+    'jsonl': format_jsonl,
+}
+
+
+def detect_compression(filename: str) -> Optional[str]:
+    """Guess the compression from the file extension."""
+    lower = filename.lower()
+    if lower.endswith('.gz'):
+        return 'gzip'
+    if lower.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def open_export_stream(filename: str, compression: Optional[str] = None) -> io.TextIOBase:
+    """
+    Open a UTF-8 text stream for writing, optionally compressed.
+
+    Args:
+        filename: Output path
+        compression: None, 'gzip' or 'zstd'
+
+    Returns:
+        Writable text stream; closing it finishes the compressed frame
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt', encoding='utf-8')
+
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        raw = open(filename, 'wb')
+        writer = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+
+    return open(filename, 'w', encoding='utf-8')
+
+
+def export_entries(history: Sequence[Dict[str, Any]], filename: str,
+                   export_format: str = 'text', compression: Optional[str] = None,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   progress_interval: int = 500) -> int:
+    """
+    Stream history entries into a file.
+
+    Args:
+        history: Conversation history (iterated, never copied)
+        filename: Output path
+        export_format: 'text' or 'jsonl'
+        compression: None, 'gzip' or 'zstd'; inferred from the extension if None
+        progress_callback: Called with (written, total) every progress_interval entries
+        progress_interval: Number of entries between progress reports
+
+    Returns:
+        Number of entries written
+    """
+    if export_format not in _FORMATTERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if compression is None:
+        compression = detect_compression(filename)
+
+    total = len(history)
+    written = 0
+
+    def counted(entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        nonlocal written
+        for entry in entries:
+            yield entry
+            written += 1
+            if progress_callback and written % progress_interval == 0:
+                progress_callback(written, total)
+
+    formatter = _FORMATTERS[export_format]
+    with open_export_stream(filename, compression) as f:
+        f.writelines(formatter(counted(iter_entries(history))))
+
+    return written
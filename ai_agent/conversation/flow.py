@@ -0,0 +1,169 @@
+"""
+Compiled conversation flow for the AI Agent application.
+
+The sales script is declared as a graph of named states. Each state either asks
+a scripted question or answers from a response template category, and maps
+customer intents to the next state. At load time the graph is compiled into a
+dense transition table indexed by (state id, intent id), so every turn is a
+single list lookup and the compiled graph can be shared read-only by sessions.
+"""
+
+import random
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_INTENT = "default"
+
+
+class FlowError(ValueError):
+    """Raised when a conversation flow definition is invalid."""
+
+
+class ConversationGraph:
+    """Immutable, compiled conversation state machine."""
+
+    __slots__ = ('state_names', 'state_ids', 'intents', 'start', 'table',
+                 'responses', 'progress', '_intent_count')
+
+    def __init__(self, state_names: Tuple[str, ...], intents: Tuple[str, ...], start: int,
+                 table: Tuple[int, ...], responses: Tuple[Tuple[str, ...], ...],
+                 progress: Tuple[int, ...]):
+        self.state_names = state_names
+        self.state_ids = {name: index for index, name in enumerate(state_names)}
+        self.intents = intents
+        self.start = start
+        self.table = table
+        self.responses = responses
+        self.progress = progress
+        self._intent_count = len(intents)
+
+    def next_state(self, state: int, intent: int) -> int:
+        """Look up the state reached from state on intent."""
+        return self.table[state * self._intent_count + intent]
+
+    def successors(self, state: int) -> Tuple[int, ...]:
+        """Row of the transition table for a state, indexed by intent id."""
+        offset = state * self._intent_count
+        return self.table[offset:offset + self._intent_count]
+
+    def respond(self, state: int) -> str:
+        """Pick the bot utterance for entering a state."""
+        responses = self.responses[state]
+        if len(responses) == 1:
+            return responses[0]
+        return random.choice(responses)
+
+    def intent_id(self, intent: str) -> int:
+        """Map an intent name to its id."""
+        return self.intents.index(intent)
+
+
+def build_linear_flow(question_count: int, categories: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build a flow that asks every question in order, then answers by intent.
+
+    This matches the classic scripted behaviour and is used when a script
+    does not declare its own flow.
+    """
+    follow_up = {category: category for category in categories}
+    follow_up[DEFAULT_INTENT] = DEFAULT_INTENT
+
+    flow: Dict[str, Dict[str, Any]] = {}
+    for index in range(question_count):
+        target = f"question_{index + 1}" if index + 1 < question_count else None
+        flow[f"question_{index}"] = {
+            'question': index,
+            'on': {DEFAULT_INTENT: target} if target else dict(follow_up),
+        }
+    for category in follow_up:
+        flow[category] = {'template': category, 'on': dict(follow_up)}
+    return flow
+
+
+def compile_flow(flow: Mapping[str, Mapping[str, Any]], start_state: Optional[str],
+                 questions: Sequence[str], templates: Mapping[str, Sequence[str]],
+                 intents: Sequence[str]) -> ConversationGraph:
+    """
+    Compile a declarative flow into a ConversationGraph.
+
+    Args:
+        flow: State name to {'question': index} or {'template': category},
+              plus 'on': {intent: next state}; 'default' covers unlisted intents
+        start_state: Name of the opening state (first state if None)
+        questions: Scripted questions referenced by index
+        templates: Template category to candidate responses
+        intents: Intent names; 'default' is appended if missing
+
+    Returns:
+        Compiled graph
+    """
+    if not flow:
+        raise FlowError("Conversation flow is empty")
+
+    intent_names = tuple(intents) if DEFAULT_INTENT in intents else tuple(intents) + (DEFAULT_INTENT,)
+    state_names = tuple(flow)
+    state_ids = {name: index for index, name in enumerate(state_names)}
+    start_state = start_state or state_names[0]
+    if start_state not in state_ids:
+        raise FlowError(f"Unknown start state: {start_state}")
+
+    responses: List[Tuple[str, ...]] = []
+    question_of: List[int] = []
+    table: List[int] = []
+
+    for name in state_names:
+        state = flow[name]
+        if 'question' in state:
+            index = state['question']
+            if not 0 <= index < len(questions):
+                raise FlowError(f"State '{name}' refers to missing question {index}")
+            responses.append((questions[index],))
+            question_of.append(index)
+        elif 'template' in state:
+            category = state['template']
+            if not templates.get(category):
+                raise FlowError(f"State '{name}' refers to missing template '{category}'")
+            responses.append(tuple(templates[category]))
+            question_of.append(-1)
+        else:
+            raise FlowError(f"State '{name}' needs a 'question' or 'template'")
+
+        transitions = state.get('on', {})
+        for intent in transitions:
+            if intent not in intent_names:
+                raise FlowError(f"State '{name}' has a transition on unknown intent '{intent}'")
+        for target in transitions.values():
+            if target not in state_ids:
+                raise FlowError(f"State '{name}' transitions to unknown state '{target}'")
+
+        default_target = transitions.get(DEFAULT_INTENT, name)
+        for intent in intent_names:
+            table.append(state_ids[transitions.get(intent, default_target)])
+
+    progress = _question_progress(tuple(table), question_of, state_ids[start_state], len(intent_names))
+    return ConversationGraph(state_names, intent_names, state_ids[start_state],
+                             tuple(table), tuple(responses), progress)
+
+
+def _question_progress(table: Tuple[int, ...], question_of: List[int], start: int,
+                       intent_count: int) -> Tuple[int, ...]:
+    """Number of scripted questions asked by the time each state is reached."""
+    progress = [0] * len(question_of)
+    reached = [False] * len(question_of)
+
+    def enter(state: int, previous: int) -> bool:
+        value = question_of[state] + 1 if question_of[state] >= 0 else previous
+        if not reached[state] or value > progress[state]:
+            reached[state] = True
+            progress[state] = value
+            return True
+        return False
+
+    enter(start, 0)
+    pending = [start]
+    while pending:
+        state = pending.pop()
+        offset = state * intent_count
+        for target in set(table[offset:offset + intent_count]):
+            if enter(target, progress[state]):
+                pending.append(target)
+    return tuple(progress)
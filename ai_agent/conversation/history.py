@@ -0,0 +1,277 @@
+"""
+Append-only conversation history with cheap immutable snapshots.
+
+The history is written by a single writer (the conversation turn executor).
+Entries are only ever appended, and clearing swaps in a new list instead of
+emptying the old one, so a snapshot can share the underlying list and only
+needs to remember how many entries it covers. Sequence numbers let pollers
+fetch only the entries added since their last read. With a memory bound the
+oldest entries move to an append-only spill file, which snapshots, cursors
+and exports read transparently, so no entry of a call is ever lost.
+"""
+
+import json
+import tempfile
+import threading
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+# Every SPILL_INDEX_INTERVAL-th spilled entry has its file offset indexed
+SPILL_INDEX_INTERVAL = 64
+# Spilled entries decoded per read while iterating a snapshot
+SPILL_READ_BATCH = 256
+
+
+class HistorySpill:
+    """
+    Append-only JSONL temporary file of history entries evicted from memory.
+
+    Only a sparse offset index stays in memory; a read seeks to the nearest
+    indexed entry and skips at most SPILL_INDEX_INTERVAL - 1 lines.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize an empty spill file.
+
+        Args:
+            directory: Directory for the temporary file; the system default if None
+        """
+        self._file = tempfile.TemporaryFile(prefix="ai_agent_history_", dir=directory)
+        self._offsets = array('Q')
+        self._count = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def extend(self, entries: Sequence[Dict[str, Any]]):
+        """Append entries. Must only be called by the history writer."""
+        lines = [(json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8') for entry in entries]
+        with self._lock:
+            offset = self._size
+            for index, line in enumerate(lines, self._count):
+                if index % SPILL_INDEX_INTERVAL == 0:
+                    self._offsets.append(offset)
+                offset += len(line)
+            self._file.seek(self._size)
+            self._file.write(b"".join(lines))
+            self._size = offset
+            self._count += len(lines)
+
+    def read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Get the spilled entries with index start up to (not including) stop."""
+        with self._lock:
+            stop = min(stop, self._count)
+            if start >= stop:
+                return []
+            block = start // SPILL_INDEX_INTERVAL
+            self._file.seek(self._offsets[block])
+            for _ in range(start - block * SPILL_INDEX_INTERVAL):
+                self._file.readline()
+            return [json.loads(self._file.readline()) for _ in range(stop - start)]
+
+
+class HistorySnapshot(Sequence):
+    """
+    Read-only view of a history: the entries spilled to disk so far followed
+    by the first N entries of an in-memory list.
+    """
+
+    __slots__ = ('_entries', '_length', '_spill', '_spilled')
+
+    def __init__(self, entries: List[Dict[str, Any]], length: int,
+                 spill: Optional[HistorySpill] = None, spilled: int = 0):
+        self._entries = entries
+        self._length = length
+        self._spill = spill
+        self._spilled = spilled
+
+    def __len__(self) -> int:
+        return self._spilled + self._length
+
+    def _range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        spilled = self._spilled
+        result = []
+        if start < spilled:
+            result = self._spill.read(start, min(stop, spilled))
+            start = spilled
+        if start < stop:
+            result.extend(self._entries[start - spilled:stop - spilled])
+        return result
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Dict[str, Any]]: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step == 1:
+                return self._range(start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history snapshot index out of range")
+        if index < self._spilled:
+            return self._spill.read(index, index + 1)[0]
+        return self._entries[index - self._spilled]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for start in range(0, self._spilled, SPILL_READ_BATCH):
+            yield from self._spill.read(start, min(start + SPILL_READ_BATCH, self._spilled))
+        entries = self._entries
+        for index in range(self._length):
+            yield entries[index]
+
+    def __repr__(self) -> str:
+        return f"HistorySnapshot(length={len(self)}, spilled={self._spilled})"
+
+
+class ConversationHistory:
+    """
+    Single-writer, append-only history list with sequence numbers.
+
+    Every entry gets a 'seq' number that keeps increasing across clears, so
+    pollers can ask for entries after a cursor and only pay for new data.
+    With max_entries the oldest entries move to a spill file in batches, so
+    at least the newest max_entries (and at most twice as many) stay in
+    memory while every entry since the last clear can still be read.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, spill_dir: Optional[str] = None):
+        """
+        Initialize an empty history.
+
+        Args:
+            max_entries: Entries to keep in memory; unbounded if None
+            spill_dir: Directory for the spill file; the system temp directory if None
+        """
+        # (seq of the first entry since the clear, seq of the first entry in
+        # memory, entries in memory, spill file) swapped as one reference
+        self._segment: Tuple[int, int, List[Dict[str, Any]], Optional[HistorySpill]] = (0, 0, [], None)
+        self._next_seq = 0
+        self._max_entries = max_entries
+        self._spill_dir = spill_dir
+        self._condition = threading.Condition()
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Append an entry. Must only be called by the writer.
+
+        Returns:
+            Sequence number assigned to the entry
+        """
+        seq = self._next_seq
+        entry['seq'] = seq
+        origin, base, entries, spill = self._segment
+        entries.append(entry)
+        self._next_seq = seq + 1
+        if self._max_entries and len(entries) >= 2 * self._max_entries:
+            # Spill the oldest entries, then copy the newest to a new list;
+            # snapshots keep the old list and their own spilled count
+            drop = len(entries) - self._max_entries
+            spill = spill or HistorySpill(self._spill_dir)
+            spill.extend(entries[:drop])
+            self._segment = (origin, base + drop, entries[drop:], spill)
+        with self._condition:
+            self._condition.notify_all()
+        return seq
+
+    def clear(self):
+        """Start a new, empty list and spill file so existing snapshots stay valid."""
+        self._segment = (self._next_seq, self._next_seq, [], None)
+
+    def _view(self) -> Tuple[int, HistorySnapshot]:
+        origin, base, entries, spill = self._segment
+        return origin, HistorySnapshot(entries, len(entries), spill, base - origin)
+
+    def snapshot(self) -> HistorySnapshot:
+        """Get an O(1) immutable view of all entries since the last clear."""
+        return self._view()[1]
+
+    @property
+    def total(self) -> int:
+        """Entries appended since the last clear, in memory or spilled."""
+        return self._next_seq - self._segment[0]
+
+    @property
+    def in_memory(self) -> int:
+        """Entries currently held in memory."""
+        return len(self._segment[2])
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number the next entry will get."""
+        return self._next_seq
+
+    def since(self, seq: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get entries with a sequence number of at least seq.
+
+        Cost is proportional to the number of entries returned, not to the
+        length of the history; spilled entries are read back from disk.
+        Entries removed by a clear are skipped.
+
+        Args:
+            seq: Cursor returned by a previous call (0 for the beginning)
+            limit: Maximum number of entries to return
+
+        Returns:
+            (entries, cursor to pass to the next call)
+        """
+        origin, snapshot = self._view()
+        end = len(snapshot)
+        start = max(seq - origin, 0)
+        if limit is not None:
+            end = min(end, start + limit)
+        if start >= end:
+            return [], max(seq, origin + start)
+        return snapshot[start:end], origin + end
+
+    def before(self, seq: int, count: int) -> List[Dict[str, Any]]:
+        """
+        Get up to count entries immediately preceding sequence number seq.
+
+        Returns:
+            Entries in chronological order
+        """
+        origin, snapshot = self._view()
+        end = min(max(seq - origin, 0), len(snapshot))
+        return snapshot[max(end - count, 0):end]
+
+    def wait_for(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until an entry with sequence number seq exists.
+
+        Returns:
+            True if new data is available, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._next_seq > seq, timeout)
+
+    def subscribe(self, seq: Optional[int] = None, stop_event: Optional[threading.Event] = None,
+                  poll_interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """
+        Yield entries as they are appended.
+
+        Args:
+            seq: First sequence number to yield; only new entries if None
+            stop_event: Ends the subscription when set
+            poll_interval: Maximum time between stop_event checks
+        """
+        cursor = self._next_seq if seq is None else seq
+        while not (stop_event and stop_event.is_set()):
+            entries, cursor = self.since(cursor)
+            if entries:
+                yield from entries
+                continue
+            self.wait_for(cursor, poll_interval)
+
+    def __len__(self) -> int:
+        return self.total
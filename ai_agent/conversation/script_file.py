@@ -0,0 +1,200 @@
+"""
+External conversation script file for the AI Agent application.
+
+The questions, response templates, keyword mappings and flow can be kept in
+a JSON file instead of settings.py:
+
+    {
+        "questions": ["...", "..."],
+        "templates": {"price": ["..."], "default": ["..."]},
+        "keywords": {"price": ["値段", "価格"]},
+        "flow": {"greeting": {"question": 0, "on": {"default": "product"}}},
+        "start_state": "greeting"
+    }
+
+"flow" and "start_state" are optional, as for ConversationScript. A
+ScriptWatcher polls the file's modification time, compiles a changed file
+into a new ConversationScript on its own thread and swaps it into the
+engines, so running calls pick up new prices or keywords on their next turn
+without a restart. A file that fails to load is logged and the running
+script is kept.
+
+    python -m ai_agent.conversation.script_file --dump script.json
+    python -m ai_agent.conversation.script_file --check script.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+from ..config.settings import (
+    PREDEFINED_QUESTIONS,
+    RESPONSE_TEMPLATES,
+    KEYWORD_MAPPINGS,
+    CONVERSATION_FLOW,
+    CONVERSATION_START_STATE,
+    SCRIPT_RELOAD_INTERVAL
+)
+from ..metrics import SCRIPT_RELOAD_SUCCESS, SCRIPT_RELOAD_ERROR
+from .engine import ConversationEngine, ConversationScript
+
+logger = logging.getLogger("ai_agent.script")
+
+
+class ScriptFileError(ValueError):
+    """Raised when a script file is malformed."""
+
+
+def script_from_data(data: Dict[str, Any]) -> ConversationScript:
+    """Compile the parsed contents of a script file."""
+    if not isinstance(data, dict):
+        raise ScriptFileError("script file must contain a JSON object")
+    for key, kind in (('questions', list), ('templates', dict), ('keywords', dict)):
+        if not isinstance(data.get(key), kind):
+            raise ScriptFileError(f"'{key}' must be a JSON {'array' if kind is list else 'object'}")
+    if 'default' not in data['templates']:
+        raise ScriptFileError("'templates' needs a 'default' category")
+    try:
+        return ConversationScript(data['questions'], data['templates'], data['keywords'],
+                                  data.get('flow'), data.get('start_state'))
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise ScriptFileError(f"invalid script: {e}") from e
+
+
+def load_script(filename: str) -> ConversationScript:
+    """Read and compile a script file."""
+    with open(filename, encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ScriptFileError(f"{filename}: {e}") from e
+    return script_from_data(data)
+
+
+def dump_default_script(filename: str):
+    """Write the script from settings.py as a script file to start from."""
+    data = {
+        'questions': PREDEFINED_QUESTIONS,
+        'templates': RESPONSE_TEMPLATES,
+        'keywords': KEYWORD_MAPPINGS,
+        'flow': CONVERSATION_FLOW,
+        'start_state': CONVERSATION_START_STATE
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def _signature(filename: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime, size, inode) of a file, or None if it cannot be read."""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    # The inode changes when editors replace the file by renaming over it
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ScriptWatcher:
+    """Reloads a script file into engines when it changes."""
+
+    def __init__(self, filename: str, engines: Sequence[ConversationEngine],
+                 interval: float = SCRIPT_RELOAD_INTERVAL):
+        """
+        Initialize the watcher.
+
+        Args:
+            filename: Script file to watch
+            engines: Engines that get the new script
+            interval: Seconds between checks; a check is one stat() call
+        """
+        self.filename = filename
+        self.engines = list(engines)
+        self.interval = interval
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._signature = _signature(filename)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """
+        Reload the file if it changed since the last check.
+
+        Returns:
+            True if a new script was swapped in
+        """
+        signature = _signature(self.filename)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            script = load_script(self.filename)
+        except (OSError, ScriptFileError) as e:
+            # Half-written files fail here and load on the next change
+            self.last_error = str(e)
+            SCRIPT_RELOAD_ERROR.inc()
+            logger.error("Script reload failed, keeping the current script: %s", e)
+            return False
+        for engine in self.engines:
+            engine.swap_script(script)
+        self.reloads += 1
+        self.last_error = None
+        SCRIPT_RELOAD_SUCCESS.inc()
+        logger.info("Reloaded conversation script from %s", self.filename)
+        return True
+
+    def start(self):
+        """Start checking on a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name="script-watcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Script watcher error")
+
+    def stop(self):
+        """Stop checking."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Conversation script files")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--dump', metavar='FILE', help="write the settings.py script to FILE")
+    group.add_argument('--check', metavar='FILE', help="validate FILE and print its flow")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Dump or validate a script file from the command line."""
+    args = parse_args(argv)
+    if args.dump:
+        dump_default_script(args.dump)
+        print(f"Wrote {args.dump}")
+        return 0
+    try:
+        script = load_script(args.check)
+    except (OSError, ScriptFileError) as e:
+        print(f"Invalid script: {e}")
+        return 1
+    graph = script.graph
+    print(f"{len(script.questions)} questions, {len(script.templates)} template categories, "
+          f"intents: {', '.join(graph.intents)}")
+    print(f"states: {', '.join(graph.state_names)} (start: {graph.state_names[graph.start]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Speculative response preparation for the AI Agent application.
+
+While the customer is still speaking, the replies for every state the next
+turn can reach are chosen up front and the most likely ones are synthesized
+to audio in the background. When the transcript arrives the real reply is
+committed and, if its audio is ready, played without waiting for synthesis.
+The remaining candidates are discarded. Committing never waits for the
+synthesis in progress: every prepare() starts a new generation, and audio
+finished for an older generation is deleted by the worker that made it.
+"""
+
+import concurrent.futures
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+from ..config.settings import SPECULATION_MAX_CANDIDATES
+from ..workers import get_cpu_pool
+
+
+class ResponseSpeculator:
+    """Prepares and pre-synthesizes the likely next replies of a conversation."""
+
+    def __init__(self, conversation_manager, synthesizer=None,
+                 max_candidates: int = SPECULATION_MAX_CANDIDATES):
+        """
+        Initialize the speculator.
+
+        Args:
+            conversation_manager: ConversationManager whose next turn is predicted
+            synthesizer: Object with synthesize_to_file(text, filename,
+                         preemptible) -> bool, usually the TTSEngine; candidates
+                         are synthesized preemptibly so live speech of a miss
+                         never waits for them; replies are only chosen if None
+            max_candidates: Number of candidates synthesized per turn
+        """
+        self.conversation_manager = conversation_manager
+        self.synthesizer = synthesizer
+        self.max_candidates = max_candidates
+
+        self._plan: Dict[int, str] = {}
+        # Audio of the current generation; workers of older ones discard theirs
+        self._audio: Dict[str, Tuple[str, float]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._in_use: Optional[str] = None
+        # Synthesis tasks not finished yet, including retired ones
+        self._workers: Set[concurrent.futures.Future] = set()
+        self._temp_dir: Optional[str] = None
+        self._file_counter = 0
+        self._intent_counts: Dict[int, int] = {}
+
+        # Statistics
+        self.turns = 0
+        self.audio_hits = 0
+        self.misses = 0
+        self.synthesized = 0
+        self.discarded = 0
+        self.time_saved = 0.0
+
+    def prepare(self):
+        """Choose the next replies and start synthesizing them in the background."""
+        self._discard_audio(self._retire())
+
+        self._plan = self.conversation_manager.prepare_responses(self._intent_order())
+        if not self.synthesizer or self.max_candidates <= 0:
+            return
+
+        texts = []
+        for text in self._plan.values():
+            if text not in texts:
+                texts.append(text)
+            if len(texts) >= self.max_candidates:
+                break
+
+        # Speculation is optional, so a saturated pool just skips it
+        worker = get_cpu_pool().try_submit(self._synthesize_worker, texts, self._generation)
+        if worker:
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def commit(self, user_response: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Commit the customer's actual message.
+
+        Only audio that is ready is used; a candidate still being synthesized
+        is left to finish in the background and deleted.
+
+        Args:
+            user_response: Recognized customer message
+
+        Returns:
+            (bot response, prepared WAV file or None if it was not ready)
+        """
+        ready = self._retire()
+
+        bot_response, intent = self.conversation_manager.process_turn(user_response, self._plan)
+        self._plan = {}
+        if intent is not None:
+            self._intent_counts[intent] = self._intent_counts.get(intent, 0) + 1
+        if not bot_response:
+            self._discard_audio(ready)
+            return bot_response, None
+
+        self.turns += 1
+        audio_file = None
+        prepared = ready.pop(bot_response, None)
+        if prepared:
+            audio_file, synthesis_time = prepared
+            self.audio_hits += 1
+            self.time_saved += synthesis_time
+            self._in_use = audio_file
+        else:
+            self.misses += 1
+
+        self._discard_audio(ready, keep=audio_file)
+        return bot_response, audio_file
+
+    def cancel(self):
+        """Drop the current speculation without committing it."""
+        self._plan = {}
+        self._discard_audio(self._retire())
+
+    def close(self):
+        """Cancel speculation and remove all prepared audio."""
+        self.cancel()
+        # Retired workers delete their last file themselves; wait so none is left behind
+        concurrent.futures.wait([w for w in list(self._workers) if not w.cancel()])
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate and time saved so far."""
+        return {
+            'turns': self.turns,
+            'audio_hits': self.audio_hits,
+            'misses': self.misses,
+            'hit_rate': self.audio_hits / self.turns if self.turns else 0.0,
+            'synthesized': self.synthesized,
+            'discarded': self.discarded,
+            'time_saved': self.time_saved
+        }
+
+    def format_report(self) -> str:
+        """Human-readable summary of the speculation statistics."""
+        stats = self.get_stats()
+        return (f"先読み: ヒット率 {stats['hit_rate']:.0%} "
+                f"({stats['audio_hits']}/{stats['turns']}), "
+                f"短縮時間 {stats['time_saved']:.1f}秒")
+
+    def _intent_order(self):
+        """Intent ids ordered by how often the customer has used them."""
+        matcher = self.conversation_manager.engine.script.matcher
+        intents = range(len(matcher.categories))
+        return sorted(intents, key=lambda i: (-self._intent_counts.get(i, 0), i != matcher.default_id))
+
+    def _synthesize_worker(self, texts, generation: int):
+        """Synthesize candidate replies until done or the generation is retired."""
+        for text in texts:
+            if generation != self._generation:
+                return
+            filename = self._next_filename()
+            started = time.perf_counter()
+            if not self.synthesizer.synthesize_to_file(text, filename, preemptible=True):
+                # Failed, or cancelled by live speech: drop any partial file
+                self._remove(filename)
+                continue
+            with self._lock:
+                current = generation == self._generation
+                self.synthesized += 1
+                if current:
+                    self._audio[text] = (filename, time.perf_counter() - started)
+                else:
+                    self.discarded += 1
+            if not current:
+                # Committed or cancelled while this candidate was synthesized
+                self._remove(filename)
+                return
+
+    def _next_filename(self) -> str:
+        """Create a unique WAV path in the speculation directory."""
+        with self._lock:
+            if not self._temp_dir:
+                self._temp_dir = tempfile.mkdtemp(prefix="ai_agent_speculation_")
+            self._file_counter += 1
+            return os.path.join(self._temp_dir, f"candidate_{self._file_counter}.wav")
+
+    def _retire(self) -> Dict[str, Tuple[str, float]]:
+        """
+        Start a new generation without waiting for the synthesis worker.
+
+        Returns:
+            Audio the worker had finished for the retired generation
+        """
+        with self._lock:
+            self._generation += 1
+            ready, self._audio = self._audio, {}
+        return ready
+
+    def _discard_audio(self, audio: Dict[str, Tuple[str, float]], keep: Optional[str] = None):
+        """Delete prepared audio that will not be played."""
+        for filename, _ in audio.values():
+            with self._lock:
+                self.discarded += 1
+            self._remove(filename)
+
+        if self._in_use and self._in_use != keep:
+            self._remove(self._in_use)
+            self._in_use = None
+
+    @staticmethod
+    def _remove(filename: str):
+        """Remove a file, ignoring errors."""
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
@@ -0,0 +1,110 @@
+"""
+Single-writer turn executor for the AI Agent application.
+
+Every change to a conversation's state is sent as a message to the
+conversation's executor and applied in arrival order, so turns coming from
+the conversation thread and the UI thread can never interleave. Executors
+own no thread: each schedules at most one drain task at a time on the shared
+turn pool, so the number of threads does not grow with concurrent calls.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from ..workers import WorkerPool, get_turn_pool
+
+
+def _noop():
+    pass
+
+
+class TurnExecutor:
+    """Serial actor whose queued calls run one at a time on a shared pool."""
+
+    def __init__(self, name: str = "conversation-turns", pool: Optional[WorkerPool] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            name: Name of the executor, for logs and debugging
+            pool: Pool running the drain task; the shared turn pool if None
+        """
+        self.name = name
+        self._pool = pool
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        # Pool thread currently draining this executor's queue
+        self._thread: Optional[threading.Thread] = None
+
+    def _schedule(self):
+        """Submit a drain task unless one is already queued or running."""
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            (self._pool or get_turn_pool()).submit(self._drain)
+        except BaseException:
+            with self._lock:
+                self._scheduled = False
+            raise
+
+    def _drain(self):
+        """Run queued calls until the queue is empty."""
+        self._thread = threading.current_thread()
+        while True:
+            try:
+                future, fn, args, kwargs = self._queue.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    # A call queued after get_nowait() saw _scheduled still
+                    # set, so it must be picked up here
+                    if self._queue.empty():
+                        self._thread = None
+                        self._scheduled = False
+                        return
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def pending(self) -> int:
+        """Number of calls waiting to run."""
+        return self._queue.qsize()
+
+    def in_executor(self) -> bool:
+        """Check whether the caller is running a call of this executor."""
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a call without waiting for it.
+
+        Returns:
+            Future completed with the call's result
+        """
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        self._schedule()
+        return future
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a call on the executor and wait for its result.
+
+        Calls made from within a call of this executor (for example from a
+        callback fired during a turn) run inline to avoid deadlock.
+        """
+        if self.in_executor():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def shutdown(self, wait: bool = True):
+        """Let the queued calls run, waiting for them if wait is True."""
+        if wait and not self.in_executor():
+            self.submit(_noop).result()
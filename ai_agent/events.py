@@ -0,0 +1,223 @@
+"""
+In-process event bus for the AI Agent application.
+
+Components publish typed events instead of calling a single consumer
+callback. Every subscriber has its own bounded queue with a drop or coalesce
+policy, so publishing never waits for a slow consumer such as the Tk UI.
+Subscribers are either served by their own daemon thread or drained
+explicitly by the consumer (the UI drains its queues on the Tk thread).
+"""
+
+import collections
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Type
+
+logger = logging.getLogger("ai_agent.events")
+
+# Queue policies
+DROP_OLDEST = "drop_oldest"  # a full queue discards its oldest event
+DROP_NEWEST = "drop_newest"  # a full queue rejects the new event
+COALESCE = "coalesce"  # only the latest undelivered event is kept
+
+# Delivery modes
+THREAD = "thread"  # a daemon thread calls the handler
+MANUAL = "manual"  # the consumer calls Subscription.drain()
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class of all bus events."""
+
+
+@dataclass(frozen=True)
+class StatusEvent(Event):
+    """Human-readable status message."""
+    message: str
+    source: str = ""
+
+
+@dataclass(frozen=True)
+class HistoryEvent(Event):
+    """New conversation history entry."""
+    entry: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class VoiceEvent(Event):
+    """Voice visualization frame of (x, height, color) bars."""
+    pitch_data: List[tuple] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ConversationStateEvent(Event):
+    """Conversation started or stopped."""
+    active: bool
+
+
+class Subscription:
+    """One subscriber's bounded queue and handler."""
+
+    def __init__(self, event_type: Type[Event], handler: Callable, maxsize: int = 256,
+                 policy: str = DROP_OLDEST, mode: str = THREAD, batch: bool = False):
+        """
+        Initialize the subscription.
+
+        Args:
+            event_type: Events of this type (and subclasses) are delivered
+            handler: Called with each event, or with a list of events if batch
+            maxsize: Queue capacity
+            policy: DROP_OLDEST, DROP_NEWEST or COALESCE
+            mode: THREAD or MANUAL
+            batch: Deliver all pending events in one handler call
+        """
+        if policy not in (DROP_OLDEST, DROP_NEWEST, COALESCE):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        if mode not in (THREAD, MANUAL):
+            raise ValueError(f"Unknown delivery mode: {mode}")
+
+        self.event_type = event_type
+        self.handler = handler
+        self.policy = policy
+        self.mode = mode
+        self.batch = batch
+        self.maxsize = 1 if policy == COALESCE else maxsize
+        self.dropped = 0
+
+        # deque append/popleft are atomic; maxlen makes DROP_OLDEST and
+        # COALESCE lock-free for producers
+        self._queue: collections.deque = collections.deque(
+            maxlen=None if policy == DROP_NEWEST else self.maxsize
+        )
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        if mode == THREAD:
+            self._thread = threading.Thread(
+                target=self._run, name=f"event-{event_type.__name__}"
+            )
+            self._thread.daemon = True
+            self._thread.start()
+
+    def offer(self, event: Event):
+        """Queue an event without blocking. Called by the bus."""
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            if self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return
+            if self.policy == DROP_OLDEST:
+                self.dropped += 1
+        queue.append(event)
+        if self._thread is not None:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        """Number of undelivered events."""
+        return len(self._queue)
+
+    def drain(self, limit: Optional[int] = None) -> int:
+        """
+        Deliver pending events on the calling thread.
+
+        Args:
+            limit: Maximum number of events to deliver
+
+        Returns:
+            Number of events delivered
+        """
+        events = []
+        queue = self._queue
+        while limit is None or len(events) < limit:
+            try:
+                events.append(queue.popleft())
+            except IndexError:
+                break
+        if not events:
+            return 0
+
+        try:
+            if self.batch:
+                self.handler(events)
+            else:
+                for event in events:
+                    self.handler(event)
+        except Exception:
+            logger.exception("Event handler for %s failed", self.event_type.__name__)
+        return len(events)
+
+    def close(self):
+        """Stop delivering events."""
+        self._closed = True
+        self._wakeup.set()
+
+    def _run(self):
+        """Delivery loop of THREAD subscriptions."""
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._closed:
+                self.drain()
+
+
+class EventBus:
+    """Typed publish/subscribe bus with per-subscriber queues."""
+
+    def __init__(self):
+        """Initialize the bus."""
+        self._subscriptions: Dict[Type[Event], List[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: Type[Event], handler: Callable, maxsize: int = 256,
+                  policy: str = DROP_OLDEST, mode: str = THREAD,
+                  batch: bool = False) -> Subscription:
+        """
+        Subscribe a handler to an event type.
+
+        Returns:
+            Subscription; pass it to unsubscribe() or drain() it in MANUAL mode
+        """
+        subscription = Subscription(event_type, handler, maxsize, policy, mode, batch)
+        with self._lock:
+            # Copy-on-write so publish() can iterate without locking
+            subscribers = dict(self._subscriptions)
+            subscribers[event_type] = subscribers.get(event_type, []) + [subscription]
+            self._subscriptions = subscribers
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription and stop its delivery."""
+        with self._lock:
+            subscribers = dict(self._subscriptions)
+            remaining = [s for s in subscribers.get(subscription.event_type, []) if s is not subscription]
+            subscribers[subscription.event_type] = remaining
+            self._subscriptions = subscribers
+        subscription.close()
+
+    def publish(self, event: Event):
+        """Offer an event to every matching subscriber without blocking."""
+        subscriptions = self._subscriptions
+        for event_type in type(event).__mro__:
+            for subscription in subscriptions.get(event_type, ()):
+                subscription.offer(event)
+            if event_type is Event:
+                break
+
+    def pending(self) -> int:
+        """Undelivered events across all subscribers."""
+        return sum(s.pending() for subs in self._subscriptions.values() for s in subs)
+
+    def dropped(self) -> int:
+        """Events dropped by full subscriber queues so far."""
+        return sum(s.dropped for subs in self._subscriptions.values() for s in subs)
+
+    def close(self):
+        """Close all subscriptions."""
+        with self._lock:
+            subscribers = self._subscriptions
+            self._subscriptions = {}
+        for subscriptions in subscribers.values():
+            for subscription in subscriptions:
+                subscription.close()
@@ -0,0 +1,153 @@
+"""
+Headless front end for the AI Agent application.
+
+HeadlessSink stands in for MainWindow on display-less servers. It accepts the
+same callbacks and update calls, writes them to the log and keeps simple
+counters instead of drawing anything, and never imports tkinter.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+from .events import (
+    EventBus, StatusEvent, HistoryEvent, VoiceEvent, ConversationStateEvent, COALESCE
+)
+
+logger = logging.getLogger("ai_agent.headless")
+
+
+class HeadlessSink:
+    """Logging/metrics replacement for MainWindow."""
+
+    def __init__(self, exit_when_idle: bool = True):
+        """
+        Initialize the sink.
+
+        Args:
+            exit_when_idle: Return from run() once the conversation ends
+        """
+        self.exit_when_idle = exit_when_idle
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.conversation_active = False
+
+        # Counters
+        self.status_updates = 0
+        self.history_entries: Dict[str, int] = {}
+        self.visualization_frames = 0
+        self.errors = 0
+        self.last_status = ""
+
+        # Callbacks kept for API compatibility with MainWindow
+        self.start_callback: Optional[Callable] = None
+        self.stop_callback: Optional[Callable] = None
+        self.send_text_callback: Optional[Callable] = None
+        self.clear_log_callback: Optional[Callable] = None
+        self.init_conversation_callback: Optional[Callable] = None
+        self.volume_change_callback: Optional[Callable] = None
+        self.history_loader_callback: Optional[Callable] = None
+
+    def set_start_callback(self, callback: Callable):
+        """Set callback for starting a conversation."""
+        self.start_callback = callback
+
+    def set_stop_callback(self, callback: Callable):
+        """Set callback for stopping a conversation."""
+        self.stop_callback = callback
+
+    def set_send_text_callback(self, callback: Callable):
+        """Set callback for manual text messages."""
+        self.send_text_callback = callback
+
+    def set_clear_log_callback(self, callback: Callable):
+        """Set callback for clearing the log."""
+        self.clear_log_callback = callback
+
+    def set_init_conversation_callback(self, callback: Callable):
+        """Set callback for resetting the conversation."""
+        self.init_conversation_callback = callback
+
+    def set_volume_change_callback(self, callback: Callable):
+        """Set callback for volume changes."""
+        self.volume_change_callback = callback
+
+    def set_history_loader_callback(self, callback: Callable):
+        """Set callback for loading older history entries."""
+        self.history_loader_callback = callback
+
+    def attach_event_bus(self, event_bus: EventBus):
+        """Subscribe the sink to bus events on its own delivery threads."""
+        event_bus.subscribe(StatusEvent, lambda e: self.update_status(e.message))
+        event_bus.subscribe(HistoryEvent, lambda e: self.add_to_history(e.entry), maxsize=1024)
+        event_bus.subscribe(VoiceEvent, lambda e: self.update_voice_visualization(e.pitch_data),
+                            policy=COALESCE)
+        event_bus.subscribe(ConversationStateEvent, lambda e: self.set_conversation_state(e.active))
+
+    def update_status(self, message: str):
+        """Log a status update."""
+        with self._lock:
+            self.status_updates += 1
+            self.last_status = message
+        logger.info("status: %s", message)
+
+    def add_to_history(self, entry: Dict[str, Any]):
+        """Log a conversation history entry."""
+        speaker = entry.get('speaker', '')
+        with self._lock:
+            self.history_entries[speaker] = self.history_entries.get(speaker, 0) + 1
+        logger.info("[%s] %s: %s", entry.get('timestamp', ''), speaker, entry.get('message', ''))
+
+    def update_voice_visualization(self, pitch_data: list):
+        """Count visualization frames; nothing is drawn."""
+        self.visualization_frames += 1
+
+    def clear_history(self):
+        """Nothing to clear without a history view."""
+        logger.debug("history view cleared")
+
+    def set_conversation_state(self, is_active: bool):
+        """Track whether a conversation is running."""
+        was_active = self.conversation_active
+        self.conversation_active = is_active
+        if was_active and not is_active and self.exit_when_idle:
+            self._stop_event.set()
+
+    def show_error(self, title: str, message: str):
+        """Log an error instead of showing a dialog."""
+        with self._lock:
+            self.errors += 1
+        logger.error("%s: %s", title, message)
+
+    def show_info(self, title: str, message: str):
+        """Log an informational message."""
+        logger.info("%s: %s", title, message)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get the counters collected so far."""
+        with self._lock:
+            return {
+                'status_updates': self.status_updates,
+                'history_entries': dict(self.history_entries),
+                'visualization_frames': self.visualization_frames,
+                'errors': self.errors,
+                'last_status': self.last_status
+            }
+
+    def run(self):
+        """Start the conversation and block until it ends or stop() is called."""
+        if self.start_callback:
+            self.start_callback()
+        try:
+            while not self._stop_event.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            logger.info("interrupted")
+        logger.info("session metrics: %s", self.get_metrics())
+
+    def stop(self):
+        """Make run() return."""
+        self._stop_event.set()
+
+    def destroy(self):
+        """Release the sink."""
+        self.stop()
@@ -0,0 +1,82 @@
+"""
+Non-blocking logging for the AI Agent application.
+
+In production, log calls on the audio and conversation threads only put the
+record on a queue. A single QueueListener thread formats the records and
+writes them to a size-rotated log file and the console, so slow disk or
+console I/O never stalls a call.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import List, Optional
+
+
+class EnqueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the arguments into the message and pass the record on unformatted.
+
+        The stock QueueHandler formats the whole record so it can be pickled;
+        the queue here never leaves the process, so only the message
+        arguments, which may be mutated later, are resolved on the caller.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_queue_logging(log_file: str, level: int = logging.INFO,
+                        fmt: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                        console: bool = True) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background writer.
+
+    Args:
+        log_file: Log file, rotated when it reaches max_bytes
+        level: Root logger level
+        fmt: Record format used by the writer
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated files kept
+        console: Also write records to stderr
+
+    Returns:
+        The running listener; it is stopped and flushed at exit
+    """
+    formatter = logging.Formatter(fmt)
+    handlers: List[logging.Handler] = [
+        logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    ]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(EnqueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(stop_queue_logging, listener)
+    return listener
+
+
+def stop_queue_logging(listener: Optional[logging.handlers.QueueListener]):
+    """Write out the queued records and stop the listener thread."""
+    if listener is None or listener._thread is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
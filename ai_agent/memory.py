@@ -0,0 +1,376 @@
+"""
+Memory diagnostics for the AI Agent application.
+
+MemoryMonitor takes tracemalloc snapshots at a fixed interval and diffs each
+one against the first snapshot and the previous one, attributing growth to
+modules and source lines; `python main.py --memory-diagnostics` logs these
+reports while the agent runs.
+
+The soak test replays synthetic calls in rounds through the call pipeline
+(see replay), measures resident memory after every round and fails if it
+grows by more than a threshold per session. Growth is the median of the
+per-round growth rates, so a one-off step (an allocator arena or a thread
+stack mapped in one round) does not fail a run while a steady leak, which
+shows up in every round, does. Runs too short to judge (see
+MEMORY_SOAK_MIN_* in settings) exit with status 2 instead of a verdict:
+
+    python -m ai_agent.memory --rounds 8 --calls 500 --max-kb-per-session 8
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .config.settings import (
+    MEMORY_SNAPSHOT_INTERVAL, MEMORY_SOAK_MAX_KB_PER_SESSION, MEMORY_SOAK_MIN_ROUNDS,
+    MEMORY_SOAK_MIN_SESSIONS, MEMORY_SOAK_MIN_WARMUP_ROUNDS
+)
+
+logger = logging.getLogger("ai_agent.memory")
+
+# Allocations made by the diagnostics themselves
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def module_name(filename: str) -> str:
+    """Dotted module name of a source file, or the file name if it is not on sys.path."""
+    path = os.path.abspath(filename)
+    best = ""
+    for entry in sys.path:
+        entry = os.path.abspath(entry or os.curdir)
+        if path.startswith(entry + os.sep) and len(entry) > len(best):
+            best = entry
+    if not best:
+        return filename
+    name = os.path.splitext(os.path.relpath(path, best))[0].replace(os.sep, ".")
+    return name[:-len(".__init__")] if name.endswith(".__init__") else name
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, if the platform exposes it."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryMonitor:
+    """Periodic tracemalloc snapshots with growth by module and line."""
+
+    def __init__(self, interval: float = MEMORY_SNAPSHOT_INTERVAL, top: int = 10, frames: int = 1):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between snapshots
+            top: Entries per growth table
+            frames: Traceback frames stored per allocation; 1 is enough for
+                    line attribution and keeps tracing overhead low
+        """
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._latest: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Start tracing and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        gc.collect()
+        self._baseline = self._previous = self._latest = self._take()
+
+    def rebase(self):
+        """Make the current heap the baseline, e.g. after a warmup."""
+        gc.collect()
+        with self._lock:
+            self._baseline = self._previous = self._latest = self._take()
+
+    def _take(self) -> tracemalloc.Snapshot:
+        """Snapshot without the diagnostics' own allocations."""
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Take a snapshot and return the growth since the baseline and the previous one."""
+        if self._baseline is None:
+            self.begin()
+        gc.collect()
+        with self._lock:
+            self._previous = self._latest
+            self._latest = self._take()
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            'time': time.time(),
+            'traced_kb': traced / 1024,
+            'peak_kb': peak / 1024,
+            'rss_kb': (rss_bytes() or 0) / 1024,
+            'by_module': self.growth('module'),
+            'by_line': self.growth('lineno'),
+            'since_previous': self.growth('lineno', since_baseline=False)
+        }
+
+    def growth(self, group_by: str = 'lineno', since_baseline: bool = True,
+               limit: Optional[int] = None) -> List[Tuple[str, float, int]]:
+        """
+        Largest growth between two snapshots.
+
+        Args:
+            group_by: 'module' or 'lineno'
+            since_baseline: Compare with the first snapshot, else with the previous one
+            limit: Entries to return (top if None)
+
+        Returns:
+            (location, KiB grown, allocation count change), largest first
+        """
+        base = self._baseline if since_baseline else self._previous
+        latest = self._latest
+        if base is None or latest is None:
+            return []
+        limit = self.top if limit is None else limit
+
+        if group_by == 'module':
+            totals: Dict[str, List[int]] = {}
+            for stat in latest.compare_to(base, 'filename'):
+                name = module_name(stat.traceback[0].filename)
+                entry = totals.setdefault(name, [0, 0])
+                entry[0] += stat.size_diff
+                entry[1] += stat.count_diff
+            rows = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+            return [(name, size / 1024, count) for name, (size, count) in rows[:limit] if size > 0]
+
+        rows = []
+        for stat in latest.compare_to(base, 'lineno'):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            rows.append((f"{module_name(frame.filename)}:{frame.lineno}", stat.size_diff / 1024,
+                         stat.count_diff))
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def format_report(self, report: Optional[Dict[str, Any]] = None) -> str:
+        """Human-readable growth tables of a snapshot report."""
+        report = report or self.snapshot()
+        lines = [f"traced {report['traced_kb']:.0f} KiB (peak {report['peak_kb']:.0f} KiB), "
+                 f"RSS {report['rss_kb']:.0f} KiB"]
+        for title, rows in (("growth by module since start", report['by_module']),
+                            ("growth by line since start", report['by_line']),
+                            ("growth by line since previous snapshot", report['since_previous'])):
+            lines.append(f"{title}:")
+            for location, kb, count in rows:
+                lines.append(f"  {kb:>10.1f} KiB {count:>+8} blocks  {location}")
+        return "\n".join(lines)
+
+    def start(self):
+        """Take the baseline and log a report every interval on a daemon thread."""
+        self.begin()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                logger.info("Memory snapshot\n%s", self.format_report())
+            except Exception:
+                logger.exception("Memory snapshot failed")
+
+    def stop(self):
+        """Stop the snapshots and tracing started by begin()."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def _slope(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Least-squares slope of ys over xs."""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def _median_growth(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Median of the growth rates of ys over xs between consecutive samples."""
+    rates = sorted((y1 - y0) / (x1 - x0) for x0, x1, y0, y1 in zip(xs, xs[1:], ys, ys[1:]) if x1 != x0)
+    if not rates:
+        return 0.0
+    middle = len(rates) // 2
+    return rates[middle] if len(rates) % 2 else (rates[middle - 1] + rates[middle]) / 2
+
+
+def soak_too_short(rounds: int, calls: int, warmup_rounds: int) -> Optional[str]:
+    """Why a soak run of this size cannot be judged, or None if it can."""
+    if warmup_rounds < MEMORY_SOAK_MIN_WARMUP_ROUNDS:
+        return f"{warmup_rounds} warmup rounds, at least {MEMORY_SOAK_MIN_WARMUP_ROUNDS} are needed"
+    if rounds < MEMORY_SOAK_MIN_ROUNDS:
+        return f"{rounds} measured rounds, at least {MEMORY_SOAK_MIN_ROUNDS} are needed"
+    if rounds * calls < MEMORY_SOAK_MIN_SESSIONS:
+        return f"{rounds * calls} measured sessions, at least {MEMORY_SOAK_MIN_SESSIONS} are needed"
+    return None
+
+
+def run_soak(rounds: int = 8, calls: int = 500, lines: int = 20, speed: float = 0.0,
+             warmup_rounds: int = 3, trace: bool = False) -> Dict[str, Any]:
+    """
+    Replay synthetic calls in rounds and measure memory after each round.
+
+    Growth per session is the median per-round growth of RSS (and of the
+    traced Python heap with trace), so one-off allocations such as caches
+    filling up or an arena mapped in one round do not count; the
+    least-squares slope over all rounds is reported alongside.
+    With trace, tracemalloc's own bookkeeping is subtracted from each RSS
+    sample, since it grows with every allocation it tracks.
+
+    Args:
+        rounds: Measured rounds
+        calls: Calls per round
+        lines: Concurrent calls
+        speed: Audio speed relative to real time; 0 runs without waiting
+        warmup_rounds: Rounds run before the first measurement
+        trace: Also trace the Python heap and attribute its growth
+    """
+    from .replay import ReplayHarness, synthetic_calls
+
+    harness = ReplayHarness(lines=lines, speed=speed)
+    call_list = synthetic_calls(calls)
+    # Trace from the start: objects allocated before tracing and replaced
+    # later (ring buffers, caches) would otherwise show up as growth
+    monitor = MemoryMonitor() if trace else None
+    if monitor:
+        monitor.begin()
+    for _ in range(warmup_rounds):
+        harness.run(call_list)
+    if monitor:
+        monitor.rebase()
+    sessions: List[int] = []
+    rss_kb: List[float] = []
+    heap_kb: List[float] = []
+    started = time.perf_counter()
+    for index in range(rounds + 1):
+        if index:
+            harness.run(call_list)
+        gc.collect()
+        sessions.append(index * calls)
+        rss = rss_bytes() or 0
+        if monitor:
+            rss -= tracemalloc.get_tracemalloc_memory()
+            heap_kb.append(tracemalloc.get_traced_memory()[0] / 1024)
+        rss_kb.append(rss / 1024)
+        logger.info("soak round %d/%d: RSS %.0f KiB", index, rounds, rss_kb[-1])
+
+    report: Dict[str, Any] = {
+        'rounds': rounds,
+        'calls_per_round': calls,
+        'sessions': rounds * calls,
+        'elapsed_sec': time.perf_counter() - started,
+        'rss_start_kb': rss_kb[0],
+        'rss_end_kb': rss_kb[-1],
+        'rss_kb_per_session': _median_growth(sessions, rss_kb),
+        'rss_kb_per_session_fit': _slope(sessions, rss_kb)
+    }
+    if monitor:
+        monitor.snapshot()
+        report['heap_kb_per_session'] = _median_growth(sessions, heap_kb)
+        report['by_module'] = monitor.growth('module')
+        report['by_line'] = monitor.growth('lineno')
+        monitor.stop()
+    return report
+
+
+def growth_per_session(report: Dict[str, Any]) -> float:
+    """
+    Growth the soak test is judged on: the traced Python heap if it was
+    traced, since RSS then also moves with tracemalloc's own bookkeeping,
+    otherwise RSS.
+    """
+    return report.get('heap_kb_per_session', report['rss_kb_per_session'])
+
+
+def format_soak_report(report: Dict[str, Any], threshold: float) -> str:
+    """Human-readable soak test result."""
+    traced = 'heap_kb_per_session' in report
+    limit = "" if traced else f" (limit {threshold} KiB)"
+    lines = [
+        f"Soak: {report['sessions']} sessions in {report['rounds']} rounds, "
+        f"{report['elapsed_sec']:.1f} s",
+        f"RSS {report['rss_start_kb'] / 1024:.1f} -> {report['rss_end_kb'] / 1024:.1f} MiB, "
+        f"{report['rss_kb_per_session']:.3f} KiB/session{limit}, "
+        f"least-squares {report['rss_kb_per_session_fit']:.3f} KiB/session"
+    ]
+    if traced:
+        lines.append(f"python heap: {report['heap_kb_per_session']:.3f} KiB/session (limit {threshold} KiB)")
+        for title, key in (("growth by module", 'by_module'), ("growth by line", 'by_line')):
+            lines.append(f"{title}:")
+            for location, kb, count in report[key]:
+                lines.append(f"  {kb:>10.1f} KiB {count:>+8} blocks  {location}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Memory soak test of the call pipeline")
+    parser.add_argument('--rounds', type=int, default=8, help="measured rounds")
+    parser.add_argument('--calls', type=int, default=500, help="calls per round")
+    parser.add_argument('--lines', type=int, default=20, help="concurrent calls")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="audio speed relative to real time (0 = no waiting)")
+    parser.add_argument('--warmup-rounds', type=int, default=3, help="rounds before measuring")
+    parser.add_argument('--max-kb-per-session', type=float, default=MEMORY_SOAK_MAX_KB_PER_SESSION,
+                        help="fail if RSS (the Python heap with --tracemalloc) grows by more than this per session")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="trace the Python heap and show where it grew (slower)")
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="report format")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the soak test from the command line."""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    too_short = soak_too_short(args.rounds, args.calls, args.warmup_rounds)
+    if too_short:
+        print(f"run too short to judge memory growth: {too_short}")
+        return 2
+    report = run_soak(args.rounds, args.calls, args.lines, args.speed,
+                      args.warmup_rounds, args.tracemalloc)
+    report['max_kb_per_session'] = args.max_kb_per_session
+    report['passed'] = growth_per_session(report) <= args.max_kb_per_session
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.format == 'json'
+          else format_soak_report(report, args.max_kb_per_session))
+    if not report['passed']:
+        print("FAILED: memory grows per session beyond the limit")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
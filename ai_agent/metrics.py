@@ -0,0 +1,512 @@
+"""
+Metrics registry for the AI Agent application.
+
+Counters, gauges and fixed-bucket histograms in the Prometheus data model,
+served as Prometheus text from a small local HTTP listener or written
+periodically to a textfile (for node_exporter's textfile collector).
+
+Hot-path updates are cheap: labelled children are resolved once and kept by
+the caller, an update takes one uncontended lock and touches preallocated
+slots only, and histogram buckets are found by bisect on a fixed tuple.
+Gauges such as queue depths can be backed by a function that is only
+evaluated at scrape time.
+"""
+
+import bisect
+import http.server
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from .config.settings import KEYWORD_MAPPINGS
+
+logger = logging.getLogger("ai_agent.metrics")
+
+# Default histogram buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SPEECH_BUCKETS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render {name="value",...}."""
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == float('inf'):
+        return "+Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    """One labelled counter series."""
+
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """Add amount (must not be negative)."""
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    """One labelled gauge series."""
+
+    __slots__ = ('value', 'function', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        """Set the gauge."""
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        """Increase the gauge."""
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the gauge."""
+        with self._lock:
+            self.value -= amount
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Read the value from function at scrape time instead."""
+        self.function = function
+
+    def get(self) -> float:
+        """Current value."""
+        function = self.function
+        if function is None:
+            return self.value
+        try:
+            return float(function())
+        except Exception:
+            return float('nan')
+
+
+class _HistogramChild:
+    """One labelled histogram series with fixed buckets."""
+
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bound plus +Inf
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record one observation."""
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Consistent copy of the bucket counts and sum."""
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Metric:
+    """Named metric family with optional labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        """
+        Initialize the metric.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names; use labels() to get a series
+            registry: Registry to add the metric to; REGISTRY if None
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self._child(())
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _child(self, values: Tuple[str, ...]):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def labels(self, *values: str):
+        """
+        Series for label values.
+
+        Resolve the series once and keep it; updates then build no keys,
+        strings or containers.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return self._child(tuple(str(v) for v in values))
+
+    def series(self) -> Iterator[Tuple[Tuple[str, ...], object]]:
+        """All series of the family."""
+        return iter(list(self._children.items()))
+
+    def expose(self) -> List[str]:
+        """Lines of the text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled series."""
+        self._unlabelled.inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in self.series()
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        """Set the unlabelled series."""
+        self._unlabelled.set(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increase the unlabelled series."""
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the unlabelled series."""
+        self._unlabelled.dec(amount)
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Back the unlabelled series by a function evaluated at scrape time."""
+        self._unlabelled.set_function(function)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+            for values, child in self.series()
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS,
+                 registry: Optional["MetricsRegistry"] = None):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets: Upper bounds in increasing order; +Inf is implied
+        """
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        """Record an observation on the unlabelled series."""
+        self._unlabelled.observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for values, child in self.series():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metric families rendered together."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        """Add a metric family."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, filename: str):
+        """Write the metrics atomically, for a textfile collector."""
+        tmp = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp, filename)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """Local HTTP listener serving /metrics."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9464):
+        """
+        Initialize the server.
+
+        Args:
+            registry: Metrics to serve
+            host: Interface to bind; local only by default
+            port: TCP port, 0 for any free port
+        """
+        registry_ref = registry
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("metrics request: " + format, *args)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Bound port."""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Serve on a daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class TextfileWriter:
+    """Rewrites a metrics textfile at a fixed interval."""
+
+    def __init__(self, filename: str, registry: MetricsRegistry = REGISTRY, interval: float = 15.0):
+        """
+        Initialize the writer.
+
+        Args:
+            filename: Output file, replaced atomically
+            registry: Metrics to write
+            interval: Seconds between writes
+        """
+        self.filename = filename
+        self.registry = registry
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start writing on a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.registry.write_textfile(self.filename)
+            except OSError as e:
+                logger.warning("Failed to write metrics textfile: %s", e)
+            if self._stop_event.wait(self.interval):
+                return
+
+    def stop(self):
+        """Write a final time and stop."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        try:
+            self.registry.write_textfile(self.filename)
+        except OSError as e:
+            logger.warning("Failed to write metrics textfile: %s", e)
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+RECOGNITION_RESULTS = Counter(
+    "ai_agent_recognition_results_total",
+    "Speech recognition attempts by outcome",
+    ("outcome",)
+)
+RECOGNITION_SUCCESS = RECOGNITION_RESULTS.labels("success")
+RECOGNITION_UNKNOWN_VALUE = RECOGNITION_RESULTS.labels("unknown_value")
+RECOGNITION_WAIT_TIMEOUT = RECOGNITION_RESULTS.labels("wait_timeout")
+RECOGNITION_REQUEST_ERROR = RECOGNITION_RESULTS.labels("request_error")
+RECOGNITION_ERROR = RECOGNITION_RESULTS.labels("error")
+
+CATEGORY_HITS = Counter(
+    "ai_agent_categorization_hits_total",
+    "Customer utterances by matched KEYWORD_MAPPINGS category",
+    ("category",)
+)
+for _category in list(KEYWORD_MAPPINGS) + ["default"]:
+    CATEGORY_HITS.labels(_category)
+
+CONVERSATION_TURNS = Counter(
+    "ai_agent_conversation_turns_total",
+    "Customer turns processed"
+)
+
+TTS_SPEAK_SECONDS = Histogram(
+    "ai_agent_tts_speak_seconds",
+    "Time to speak one reply, synthesis and playback",
+    buckets=SPEECH_BUCKETS
+)
+TTS_SYNTHESIZE_SECONDS = Histogram(
+    "ai_agent_tts_synthesize_seconds",
+    "Time to render one reply to a file",
+    buckets=SPEECH_BUCKETS
+)
+
+STAGE_LATENCY = Histogram(
+    "ai_agent_stage_latency_seconds",
+    "Turn stage latency; stage=turn is end of speech to first audio",
+    ("stage",)
+)
+
+QUEUE_DEPTH = Gauge(
+    "ai_agent_queue_depth",
+    "Items waiting in internal queues",
+    ("queue",)
+)
+EVENTS_DROPPED = Gauge(
+    "ai_agent_events_dropped",
+    "Events dropped by full event bus subscriber queues"
+)
+
+SCRIPT_RELOADS = Counter(
+    "ai_agent_script_reloads_total",
+    "Conversation script file reloads by outcome",
+    ("outcome",)
+)
+SCRIPT_RELOAD_SUCCESS = SCRIPT_RELOADS.labels("success")
+SCRIPT_RELOAD_ERROR = SCRIPT_RELOADS.labels("error")
+
+POOL_ACTIVE = Gauge(
+    "ai_agent_pool_active_tasks",
+    "Tasks running in a worker pool",
+    ("pool",)
+)
+POOL_SATURATION = Gauge(
+    "ai_agent_pool_saturation",
+    "Fraction of a worker pool's threads and queue slots in use",
+    ("pool",)
+)
+POOL_REJECTED = Counter(
+    "ai_agent_pool_rejected_total",
+    "Tasks refused because a worker pool stayed saturated",
+    ("pool",)
+)
+
+RECORDED_SEGMENTS = Counter(
+    "ai_agent_recorded_segments_total",
+    "Audio segments appended to the segment store by source",
+    ("source",)
+)
+RECORDING_BYTES = Counter(
+    "ai_agent_recording_bytes_total",
+    "Compressed audio bytes appended to the segment store"
+)
+RECORDING_DROPPED = Counter(
+    "ai_agent_recording_dropped_total",
+    "Audio segments dropped because the recording writer fell behind"
+)
+
+CAPTURE_OVERRUNS = Gauge(
+    "ai_agent_capture_overruns",
+    "Audio chunks lost by the capture process; stage=device (late read) or ring (reader behind)",
+    ("stage",)
+)
@@ -0,0 +1,198 @@
+"""
+asyncio conversation orchestrator for the AI Agent application.
+
+Each call is a coroutine whose stages (listen, respond, speak) are awaitable.
+Blocking libraries such as PyAudio, speech_recognition and pyttsx3 run in an
+executor, so one event loop thread can drive many calls, and stopping a call
+is a task cancellation that takes effect immediately.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+from typing import Any, Callable, Coroutine, Optional, Tuple
+from .tracing import get_tracer
+from .workers import WorkerPool
+
+logger = logging.getLogger("ai_agent.orchestrator")
+
+# Pause after a listen attempt that produced nothing, so a failing
+# microphone does not spin the loop
+LISTEN_RETRY_DELAY = 0.1
+
+
+class CallPipeline:
+    """Awaitable stages of a single call."""
+
+    def __init__(self, conversation_manager, speech_recognizer, tts_engine, speculator=None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            conversation_manager: ConversationManager for the call
+            speech_recognizer: Object with listen_for_speech() and stop_listening()
+            tts_engine: Object with speak(text, blocking, prepared_audio) and stop()
+            speculator: Optional ResponseSpeculator preparing replies while listening
+        """
+        self.conversation_manager = conversation_manager
+        self.speech_recognizer = speech_recognizer
+        self.tts_engine = tts_engine
+        self.speculator = speculator
+        self.executor: Optional[concurrent.futures.Executor] = None
+
+    async def _blocking(self, fn: Callable, *args) -> Any:
+        """Run a blocking call in the executor, in the call's trace context."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, context.run, fn, *args)
+
+    async def start(self) -> Optional[str]:
+        """Start the conversation and return the opening question."""
+        return await self._blocking(self.conversation_manager.start_conversation)
+
+    async def listen(self) -> Optional[str]:
+        """Listen for and recognize one customer utterance."""
+        if self.speculator:
+            await self._blocking(self.speculator.prepare)
+        return await self._blocking(self.speech_recognizer.listen_for_speech)
+
+    async def respond(self, user_response: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Generate the reply to a customer utterance.
+
+        Returns:
+            (bot response, prepared audio file or None)
+        """
+        if self.speculator:
+            return await self._blocking(self.speculator.commit, user_response)
+        bot_response = await self._blocking(self.conversation_manager.process_user_response, user_response)
+        return bot_response, None
+
+    async def speak(self, text: str, prepared_audio: Optional[str] = None):
+        """Speak a reply and wait until playback finishes."""
+        await self._blocking(self.tts_engine.speak, text, True, prepared_audio)
+
+    async def run(self, opening: Optional[str] = None):
+        """
+        Run the call until the conversation ends or the task is cancelled.
+
+        Args:
+            opening: Bot message to speak before the first turn
+        """
+        tracer = get_tracer()
+        call_id = self.conversation_manager.session.session_id
+        turn = 0
+        try:
+            if opening:
+                # The opening belongs to the first turn of the call
+                tracer.begin_turn(call_id, turn)
+                await self.speak(opening)
+
+            while self.conversation_manager.is_conversation_active():
+                tracer.begin_turn(call_id, turn)
+                turn += 1
+                user_response = await self.listen()
+                if not user_response:
+                    if self.speculator:
+                        self.speculator.cancel()
+                    if not self.conversation_manager.is_conversation_active():
+                        break
+                    await asyncio.sleep(LISTEN_RETRY_DELAY)
+                    continue
+
+                bot_response, prepared_audio = await self.respond(user_response)
+                if bot_response:
+                    await self.speak(bot_response, prepared_audio)
+        except asyncio.CancelledError:
+            # The blocking stage keeps running in its worker thread; make it
+            # finish as soon as possible and drop its result.
+            self.speech_recognizer.stop_listening()
+            self.tts_engine.stop()
+            if self.speculator:
+                self.speculator.cancel()
+            raise
+
+
+class ConversationOrchestrator:
+    """Owns one asyncio event loop, running in a background thread, for many calls."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            max_workers: Threads for blocking stages; the executor default if None
+        """
+        # Calls are admitted by their caller; a bounded queue here would
+        # block the event loop, so only the thread count is limited
+        self.executor = WorkerPool("call_stage", max_workers, queue_limit=None)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop driving the calls, started on first use."""
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run_loop, name="conversation-loop")
+                self._thread.daemon = True
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def pending(self) -> int:
+        """Blocking stages waiting for an executor thread."""
+        return self.executor.pending()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def start_call(self, pipeline: CallPipeline, opening: Optional[str] = None) -> concurrent.futures.Future:
+        """
+        Start a call.
+
+        Args:
+            pipeline: Stages of the call
+            opening: Bot message spoken first
+
+        Returns:
+            Future for the call; cancel() stops it
+        """
+        pipeline.executor = self.executor
+        return self.submit(pipeline.run(opening))
+
+    def shutdown(self):
+        """Cancel all calls and stop the loop."""
+        loop = self._loop
+        if loop is None:
+            return
+
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(cancel_all()).result(timeout=5)
+        except Exception as e:
+            logger.warning("Failed to cancel calls cleanly: %s", e)
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.executor.shutdown(wait=False)
+        self._loop = None
+        self._thread = None
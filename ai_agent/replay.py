@@ -0,0 +1,367 @@
+"""
+Deterministic replay and load-test harness for the AI Agent application.
+
+Scripted calls (text or WAV turns) run through the real call pipeline: an
+AudioSource replaces the microphone, the local transcript backend replaces
+Google Speech Recognition and NullSink replaces TTS, each taking as long as
+the audio would, divided by the speed factor. Many calls run concurrently on
+one orchestrator, and the report gives turns/sec, per-stage latency from the
+tracer and memory growth per call, so performance can be compared run to run
+on a plain Linux box without sound card or network.
+
+    python -m ai_agent.replay --count 200 --lines 20 --speed 10
+
+With --lines 1 and a fixed --seed a run is fully deterministic.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+from .memory import rss_bytes
+from .orchestrator import CallPipeline, ConversationOrchestrator
+from .tracing import get_tracer
+
+# Customer turns of the synthetic calls used when no call file is given
+SAMPLE_TURNS = [
+    "はい、もしもし",
+    "お米ですか、品質はどうですか",
+    "値段はいくらですか",
+    "詳しく聞きたいです、サンプルをください",
+    "ありがとうございます"
+]
+
+# speech_recognition's default endpointing silence
+DEFAULT_PAUSE_THRESHOLD = 0.8
+
+
+def load_calls(filename: str) -> List[Dict[str, Any]]:
+    """
+    Load call scripts from a JSON list or a JSONL file.
+
+    Each call is {"id": ..., "turns": [...]}, where a turn is customer text,
+    {"text": ...} or {"wav": path}; a WAV file's transcript is read from a
+    .txt file next to it. For endpointing evaluation a turn may list its
+    intra-utterance "pauses" in seconds and a call its caller "style"
+    (fast, normal or slow).
+    """
+    with open(filename, encoding='utf-8') as f:
+        if filename.endswith('.jsonl'):
+            calls = [json.loads(line) for line in f if line.strip()]
+        else:
+            calls = json.load(f)
+    base = os.path.dirname(os.path.abspath(filename))
+    for index, call in enumerate(calls):
+        call.setdefault('id', f"call-{index}")
+        for turn in call['turns']:
+            if isinstance(turn, dict) and 'wav' in turn:
+                turn['wav'] = os.path.join(base, turn['wav'])
+    return calls
+
+
+def synthetic_calls(count: int, turns: Sequence[str] = SAMPLE_TURNS) -> List[Dict[str, Any]]:
+    """Generate count identical scripted calls."""
+    return [{'id': f"call-{i}", 'turns': list(turns)} for i in range(count)]
+
+
+def build_source(call: Dict[str, Any], speed: float, pause_threshold: float = 0.0):
+    """Audio source replaying the customer turns of a call."""
+    from .audio.sources import AudioClip, ScriptedSource
+
+    clips = []
+    for turn in call['turns']:
+        if isinstance(turn, dict) and 'wav' in turn:
+            clips.append(AudioClip.from_wav(turn['wav'], turn.get('text')))
+        else:
+            text = turn['text'] if isinstance(turn, dict) else turn
+            clips.append(AudioClip.from_text(text))
+    return ScriptedSource(clips, speed, pause_threshold)
+
+
+class TimedPipeline(CallPipeline):
+    """CallPipeline that records the time from recognized text to reply."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the pipeline; see CallPipeline."""
+        super().__init__(*args, **kwargs)
+        self.latencies: List[float] = []
+
+    async def respond(self, user_response: str):
+        """Generate the reply and record how long it took."""
+        started = time.perf_counter()
+        result = await super().respond(user_response)
+        self.latencies.append(time.perf_counter() - started)
+        return result
+
+
+async def run_scripted_call(engine, executor, call: Dict[str, Any], speed: float,
+                            pause_threshold: float = 0.0, recorder=None,
+                            adaptive_endpointing: bool = False) -> Dict[str, Any]:
+    """
+    Run one scripted call to the end and measure it.
+
+    Args:
+        engine: Shared ConversationEngine
+        executor: Executor for the blocking stages
+        call: Call script, see load_calls()
+        speed: Audio speed relative to real time; 0 runs without waiting
+        pause_threshold: Endpointing silence after each customer turn
+        recorder: SegmentRecorder storing the call's audio, if any
+        adaptive_endpointing: Adapt pause_threshold to the pauses measured
+                              in the call's audio
+
+    Returns:
+        Call id, turns, wall duration, reply latencies and simulated audio seconds
+    """
+    from .audio.sinks import NullSink
+    from .conversation.conversation_manager import ConversationManager
+    from .speech.backends import TranscriptBackend
+    from .speech.endpointing import AdaptiveEndpointer
+    from .speech.source_recognizer import SourceRecognizer
+
+    manager = ConversationManager(engine)
+    source = build_source(call, speed, pause_threshold)
+    endpointer = AdaptiveEndpointer(initial=pause_threshold) if adaptive_endpointing else None
+    recognizer = SourceRecognizer(source, TranscriptBackend(), on_exhausted=manager.stop_conversation,
+                                  endpointer=endpointer)
+    sink = NullSink(speed)
+    if recorder:
+        recognizer.set_recorder(recorder)
+        sink.set_recorder(recorder)
+    pipeline = TimedPipeline(manager, recognizer, sink)
+    pipeline.executor = executor
+
+    started = time.perf_counter()
+    try:
+        opening = await pipeline.start()
+        await pipeline.run(opening)
+    finally:
+        recognizer.close()
+        manager.close()
+    return {
+        'call_id': call['id'],
+        'turns': len(pipeline.latencies),
+        'duration': time.perf_counter() - started,
+        'latencies': pipeline.latencies,
+        'audio_sec': source.total_duration + sink.spoken_seconds
+    }
+
+
+class ReplayHarness:
+    """Runs scripted calls concurrently through the full call pipeline."""
+
+    def __init__(self, lines: int = 10, speed: float = 10.0,
+                 pause_threshold: float = DEFAULT_PAUSE_THRESHOLD, seed: int = 0,
+                 trace_memory: bool = False, recorder=None, adaptive_endpointing: bool = False):
+        """
+        Initialize the harness.
+
+        Args:
+            lines: Calls running at the same time
+            speed: Audio speed relative to real time; 0 runs without waiting
+            pause_threshold: Endpointing silence after each customer turn
+            seed: Seed for reply selection
+            trace_memory: Measure Python heap growth with tracemalloc (slower)
+            recorder: SegmentRecorder storing the audio of every call
+            adaptive_endpointing: Adapt the pause threshold within each call
+        """
+        self.lines = lines
+        self.speed = speed
+        self.pause_threshold = pause_threshold
+        self.seed = seed
+        self.trace_memory = trace_memory
+        self.recorder = recorder
+        self.adaptive_endpointing = adaptive_endpointing
+
+    async def _drive(self, engine, executor, calls: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run all calls with at most lines at a time."""
+        slots = asyncio.Semaphore(self.lines)
+
+        async def one(call):
+            async with slots:
+                return await run_scripted_call(engine, executor, call, self.speed,
+                                               self.pause_threshold, self.recorder,
+                                               self.adaptive_endpointing)
+
+        return await asyncio.gather(*(one(call) for call in calls))
+
+    def run(self, calls: Sequence[Dict[str, Any]], warmup: int = 0) -> Dict[str, Any]:
+        """
+        Replay the calls and return the report.
+
+        Args:
+            calls: Call scripts
+            warmup: Calls run first and left out of the report
+        """
+        from .conversation.engine import ConversationEngine
+
+        random.seed(self.seed)
+        engine = ConversationEngine(record_history=False)
+        orchestrator = ConversationOrchestrator(max_workers=self.lines)
+        tracer = get_tracer()
+        try:
+            if warmup:
+                orchestrator.submit(self._drive(engine, orchestrator.executor, calls[:warmup])).result()
+            tracer.clear()
+            gc.collect()
+            if self.trace_memory:
+                tracemalloc.start()
+            heap_start = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+            rss_start = rss_bytes()
+
+            started = time.perf_counter()
+            results = orchestrator.submit(
+                self._drive(engine, orchestrator.executor, calls[warmup:])
+            ).result()
+            elapsed = time.perf_counter() - started
+
+            gc.collect()
+            rss_end = rss_bytes()
+            heap_end = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+            if self.trace_memory:
+                tracemalloc.stop()
+        finally:
+            orchestrator.shutdown()
+
+        count = len(results)
+        turns = sum(r['turns'] for r in results)
+        audio = sum(r['audio_sec'] for r in results)
+        memory = {'rss_start_mb': None, 'rss_end_mb': None, 'rss_growth_kb_per_call': None}
+        if rss_start is not None and rss_end is not None:
+            memory = {
+                'rss_start_mb': rss_start / 1024 / 1024,
+                'rss_end_mb': rss_end / 1024 / 1024,
+                'rss_growth_kb_per_call': (rss_end - rss_start) / 1024 / max(count, 1)
+            }
+        if self.trace_memory:
+            memory['heap_growth_kb_per_call'] = (heap_end - heap_start) / 1024 / max(count, 1)
+        return {
+            'calls': count,
+            'turns': turns,
+            'lines': self.lines,
+            'speed': self.speed,
+            'elapsed_sec': elapsed,
+            'turns_per_sec': turns / elapsed if elapsed else 0.0,
+            'calls_per_sec': count / elapsed if elapsed else 0.0,
+            'audio_sec': audio,
+            'stages': tracer.summary(),
+            'memory': memory
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable replay report."""
+    lines = [
+        f"Replay: {report['calls']} calls, {report['turns']} turns on {report['lines']} lines "
+        f"at {report['speed']}x in {report['elapsed_sec']:.2f} s",
+        f"throughput: {report['turns_per_sec']:.1f} turns/s, {report['calls_per_sec']:.2f} calls/s, "
+        f"{report['audio_sec']:.0f} s of simulated audio",
+        f"{'stage':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    ]
+    for stage, p in report['stages'].items():
+        lines.append(f"{stage:<20} {p['count']:>6} {p['p50_ms']:>9.2f} {p['p95_ms']:>9.2f} "
+                     f"{p['p99_ms']:>9.2f} {p['max_ms']:>9.2f}")
+    memory = report['memory']
+    if memory['rss_start_mb'] is not None:
+        lines.append(f"memory: RSS {memory['rss_start_mb']:.1f} -> {memory['rss_end_mb']:.1f} MiB, "
+                     f"{memory['rss_growth_kb_per_call']:.2f} KiB/call")
+    if 'heap_growth_kb_per_call' in memory:
+        lines.append(f"python heap growth: {memory['heap_growth_kb_per_call']:.2f} KiB/call")
+    recording = report.get('recording')
+    if recording:
+        lines.append(f"recording: {recording['segments']} segments, "
+                     f"{recording['stored_bytes'] / 1024:.1f} KiB stored "
+                     f"({recording['ratio']:.3f} of PCM), {recording['dropped']} dropped")
+    return "\n".join(lines)
+
+
+def compare_baseline(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressions of throughput and turn latency against a baseline report."""
+    problems = []
+    if baseline.get('turns_per_sec'):
+        change = report['turns_per_sec'] / baseline['turns_per_sec'] - 1
+        if change < -threshold:
+            problems.append(f"turns/sec {change:+.1%} against the baseline")
+    for stage, stats in baseline.get('stages', {}).items():
+        current = report['stages'].get(stage)
+        if current and stats['p95_ms'] > 0:
+            change = current['p95_ms'] / stats['p95_ms'] - 1
+            if change > threshold:
+                problems.append(f"{stage} p95 {change:+.1%} against the baseline")
+    return problems
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Replay scripted calls through the call pipeline")
+    parser.add_argument('--calls', help="JSON/JSONL file of call scripts")
+    parser.add_argument('--count', type=int, default=100,
+                        help="synthetic calls to run when --calls is not given")
+    parser.add_argument('--repeat', type=int, default=1, help="run the call list this many times")
+    parser.add_argument('--lines', type=int, default=10, help="concurrent calls")
+    parser.add_argument('--speed', type=float, default=10.0,
+                        help="audio speed relative to real time (0 = no waiting)")
+    parser.add_argument('--pause-threshold', type=float, default=DEFAULT_PAUSE_THRESHOLD,
+                        help="endpointing silence after each customer turn, in audio seconds")
+    parser.add_argument('--adaptive-endpointing', action='store_true',
+                        help="adapt the pause threshold to the pauses measured in each call's audio")
+    parser.add_argument('--warmup', type=int, default=0, help="calls run before measuring")
+    parser.add_argument('--seed', type=int, default=0, help="seed for reply selection")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="also measure Python heap growth per call")
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="report format")
+    parser.add_argument('--trace', metavar='FILE', help="write the spans as Chrome trace-event JSON")
+    parser.add_argument('--record', metavar='DIR', help="store the calls' audio in a segment store in DIR")
+    parser.add_argument('--baseline', help="baseline report JSON to compare with")
+    parser.add_argument('--save-baseline', help="write the report to this JSON file")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed regression against the baseline (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the harness from the command line."""
+    args = parse_args(argv)
+    calls = load_calls(args.calls) if args.calls else synthetic_calls(args.count)
+    calls = [dict(call, id=f"{call['id']}#{i}") for i in range(args.repeat) for call in calls]
+
+    recorder = None
+    if args.record:
+        from .audio.recording import SegmentRecorder
+        recorder = SegmentRecorder(args.record)
+    harness = ReplayHarness(args.lines, args.speed, args.pause_threshold, args.seed, args.tracemalloc,
+                            recorder, args.adaptive_endpointing)
+    try:
+        report = harness.run(calls, warmup=min(args.warmup, len(calls)))
+    finally:
+        if recorder:
+            recorder.close()
+    if recorder:
+        report['recording'] = recorder.stats()
+    if args.trace:
+        get_tracer().export_chrome_trace(args.trace)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.format == 'json'
+          else format_report(report))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            problems = compare_baseline(report, json.load(f), args.threshold)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
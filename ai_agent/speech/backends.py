@@ -0,0 +1,77 @@
+"""
+Speech recognition backends for the AI Agent application.
+
+A backend turns one AudioClip into text. GoogleBackend uses the online
+service through speech_recognition; TranscriptBackend is a local stand-in
+that returns the clip's known transcript, for load tests and replays.
+"""
+
+from typing import Optional
+from ..audio.sources import AudioClip
+
+
+class RecognitionServiceError(Exception):
+    """The recognition service could not be reached or failed."""
+
+
+class RecognitionBackend:
+    """Base class of recognition backends."""
+
+    def recognize(self, clip: AudioClip) -> Optional[str]:
+        """
+        Recognize one utterance.
+
+        Returns:
+            Recognized text, or None if the speech could not be understood
+
+        Raises:
+            RecognitionServiceError: If the service failed
+        """
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognitionBackend):
+    """Google Speech Recognition through speech_recognition."""
+
+    def __init__(self, language: str = 'ja-JP', recognizer=None):
+        """
+        Initialize the backend.
+
+        Args:
+            language: Language code for speech recognition
+            recognizer: speech_recognition.Recognizer to use
+        """
+        import speech_recognition as sr
+        self.language = language
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, clip: AudioClip) -> Optional[str]:
+        """Send the clip to Google Speech Recognition."""
+        import speech_recognition as sr
+        audio = sr.AudioData(clip.pcm, clip.sample_rate, clip.sample_width)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise RecognitionServiceError(str(e)) from e
+
+
+class TranscriptBackend(RecognitionBackend):
+    """Local stand-in that returns the transcript carried by the clip."""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialize the backend.
+
+        Args:
+            latency: Seconds to wait per request, imitating a service round trip
+        """
+        self.latency = latency
+
+    def recognize(self, clip: AudioClip) -> Optional[str]:
+        """Return the clip's transcript."""
+        if self.latency > 0:
+            import time
+            time.sleep(self.latency)
+        return clip.transcript or None
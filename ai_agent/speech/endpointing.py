@@ -0,0 +1,398 @@
+"""
+Adaptive endpointing for the AI Agent application.
+
+An utterance ends after pause_threshold seconds of silence. A fixed value
+(speech_recognition's 0.8 s) makes fast talkers wait for a reply and cuts
+slow talkers off in the middle of a sentence. AdaptiveEndpointer measures the
+pauses inside each of the caller's utterances (silent runs between speech in
+the captured PCM) and sets the threshold to a high quantile of them (by
+default the longest) times a margin, within
+ENDPOINT_MIN_PAUSE..ENDPOINT_MAX_PAUSE; until it has seen a few pauses in the
+call it uses ENDPOINT_PAUSE_THRESHOLD. A turn cut short (the caller went on
+talking within ENDPOINT_RESUME_WINDOW of the endpoint) counts as a pause as
+long as the gap, so the threshold rises after a truncation.
+
+On the synthetic calls of the offline evaluation the defaults shorten fast
+callers' end-of-turn delay from 800 to about 750 ms (about 20 ms on average)
+with no caller style truncated more often. Slow callers are cut off as often
+as with the fixed threshold (about 25% of turns). Letting the threshold rise
+above it (ENDPOINT_MAX_PAUSE 1.5 s) brings that to 15%, but raises the mean
+delay to about 940 ms. ADAPTIVE_ENDPOINTING is therefore off by default.
+
+The offline evaluation replays the per-turn pauses of replay call scripts
+(a turn's "pauses" list, the measured pauses of a WAV turn, or pauses drawn
+from fast/normal/slow caller models for synthetic calls) through the fixed
+and the adaptive threshold and compares end-of-turn delay and truncations:
+
+    python -m ai_agent.speech.endpointing --count 500 --check
+    python -m ai_agent.speech.endpointing --calls calls.jsonl --fixed 0.8
+"""
+
+import argparse
+import collections
+import json
+import math
+import random
+import sys
+import threading
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from ..audio.shared_capture import rms
+from ..config.settings import (
+    ENDPOINT_PAUSE_THRESHOLD, ENDPOINT_MIN_PAUSE, ENDPOINT_MAX_PAUSE, ENDPOINT_PAUSE_QUANTILE,
+    ENDPOINT_MARGIN, ENDPOINT_MIN_SAMPLES, ENDPOINT_WINDOW, ENDPOINT_RESUME_WINDOW, ENERGY_THRESHOLD
+)
+
+# Energy frames and the shortest silence counted as a pause (shorter gaps
+# are stop consonants and breaths)
+FRAME_SECONDS = 0.03
+MIN_MEASURED_PAUSE = 0.1
+
+
+def _loud_frames(pcm: bytes, sample_rate: int, energy_threshold: float,
+                 frame_seconds: float) -> List[bool]:
+    """Whether each frame of 16-bit PCM is above energy_threshold."""
+    frame_bytes = max(2, int(sample_rate * frame_seconds) * 2)
+    view = memoryview(pcm)
+    return [rms(view[start:start + frame_bytes]) > energy_threshold
+            for start in range(0, len(view) - frame_bytes + 1, frame_bytes)]
+
+
+def pause_durations(pcm: bytes, sample_rate: int, sample_width: int = 2,
+                    energy_threshold: float = ENERGY_THRESHOLD,
+                    frame_seconds: float = FRAME_SECONDS) -> List[float]:
+    """
+    Silences between speech inside an utterance, in seconds.
+
+    Leading and trailing silence are not pauses. Only 16-bit PCM is measured.
+    """
+    if sample_width != 2:
+        return []
+    pauses = []
+    silent_frames = 0
+    spoken = False
+    for loud in _loud_frames(pcm, sample_rate, energy_threshold, frame_seconds):
+        if loud:
+            if spoken and silent_frames * frame_seconds >= MIN_MEASURED_PAUSE:
+                pauses.append(silent_frames * frame_seconds)
+            spoken = True
+            silent_frames = 0
+        else:
+            silent_frames += 1
+    return pauses
+
+
+def speech_extent(pcm: bytes, sample_rate: int, sample_width: int = 2,
+                  energy_threshold: float = ENERGY_THRESHOLD,
+                  frame_seconds: float = FRAME_SECONDS) -> Optional[float]:
+    """
+    Seconds from the first to the end of the last speech frame of an utterance.
+
+    None if no speech was found or the PCM is not 16-bit.
+    """
+    if sample_width != 2:
+        return None
+    loud = _loud_frames(pcm, sample_rate, energy_threshold, frame_seconds)
+    if True not in loud:
+        return None
+    first = loud.index(True)
+    last = len(loud) - loud[::-1].index(True)
+    return (last - first) * frame_seconds
+
+
+class AdaptiveEndpointer:
+    """
+    Endpoint silence threshold learned from one caller's pauses.
+
+    Observations may arrive from a worker pool after the turn that captured
+    them. Each call is a new generation: an observation tagged with the
+    generation of an earlier call is ignored, so one caller's pauses never
+    leak into the next call.
+
+    Given the time speech ended, observe_audio() also detects truncations: an
+    utterance that starts within resume_window of the previous endpoint is
+    the caller going on after a pause that was taken for the end of the turn.
+    """
+
+    def __init__(self, initial: float = ENDPOINT_PAUSE_THRESHOLD, minimum: float = ENDPOINT_MIN_PAUSE,
+                 maximum: float = ENDPOINT_MAX_PAUSE, quantile: float = ENDPOINT_PAUSE_QUANTILE,
+                 margin: float = ENDPOINT_MARGIN, min_samples: int = ENDPOINT_MIN_SAMPLES,
+                 window: int = ENDPOINT_WINDOW, resume_window: float = ENDPOINT_RESUME_WINDOW):
+        """
+        Initialize the endpointer.
+
+        Args:
+            initial: Threshold until min_samples pauses have been seen
+            minimum: Lowest threshold
+            maximum: Highest threshold
+            quantile: Share of the caller's pauses the threshold should exceed
+            margin: Factor applied to that quantile
+            min_samples: Pauses needed before adapting
+            window: Most recent pauses considered
+            resume_window: Seconds after an endpoint within which speech
+                           means the turn was cut short
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.quantile = quantile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.resume_window = resume_window
+        self._pauses: Deque[float] = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.threshold = initial
+        self.truncations = 0
+        # (end of speech, threshold that ended it) of the last utterance
+        self._last_endpoint: Optional[Tuple[float, float]] = None
+
+    def reset(self):
+        """Forget the pauses of the previous call and start a new generation."""
+        with self._lock:
+            self.generation += 1
+            self._pauses.clear()
+            self.threshold = self.initial
+            self.truncations = 0
+            self._last_endpoint = None
+
+    def observe_pauses(self, pauses: Sequence[float], generation: Optional[int] = None):
+        """
+        Learn from the pauses measured inside a finished utterance.
+
+        Args:
+            pauses: Pause durations in seconds
+            generation: Generation read when the utterance was captured;
+                        the observation is dropped if reset() ran since
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._pauses.extend(pauses)
+            self._update()
+
+    def observe_audio(self, pcm: bytes, sample_rate: int, sample_width: int = 2,
+                      energy_threshold: float = ENERGY_THRESHOLD, generation: Optional[int] = None,
+                      end_of_speech: Optional[float] = None, threshold: Optional[float] = None):
+        """
+        Learn from the pauses inside a captured utterance; see observe_pauses().
+
+        Args:
+            end_of_speech: perf_counter() time the caller stopped speaking; if
+                           given, the utterance is also checked with
+                           observe_endpoint()
+            threshold: Pause threshold that ended the utterance
+        """
+        self.observe_pauses(pause_durations(pcm, sample_rate, sample_width, energy_threshold), generation)
+        if end_of_speech is None or threshold is None:
+            return
+        extent = speech_extent(pcm, sample_rate, sample_width, energy_threshold)
+        if extent is not None:
+            self.observe_endpoint(end_of_speech - extent, end_of_speech, threshold, generation)
+
+    def observe_endpoint(self, onset: float, end_of_speech: float, threshold: float,
+                         generation: Optional[int] = None):
+        """
+        Record an utterance's endpoint, and a truncation if it resumed the previous one.
+
+        Args:
+            onset: perf_counter() time the caller started speaking
+            end_of_speech: perf_counter() time the caller stopped speaking
+            threshold: Pause threshold that ended the utterance
+            generation: See observe_pauses()
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            previous = self._last_endpoint
+            if previous is not None:
+                gap = onset - previous[0]
+                # The previous turn ended previous[1] seconds into this gap
+                if 0 < gap <= previous[1] + self.resume_window:
+                    self._add_truncation(gap)
+            # Observations from the pool may arrive out of order
+            if previous is None or end_of_speech > previous[0]:
+                self._last_endpoint = (end_of_speech, threshold)
+
+    def observe_truncation(self, gap: float, generation: Optional[int] = None):
+        """The caller resumed gap seconds after an utterance was ended."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._add_truncation(gap)
+
+    def _add_truncation(self, gap: float):
+        """Count a truncation as a pause of gap seconds. Called with the lock held."""
+        self.truncations += 1
+        self._pauses.append(gap)
+        self._update()
+
+    def _update(self):
+        """Recompute the threshold. Called with the lock held."""
+        pauses = sorted(self._pauses)
+        if len(pauses) < self.min_samples:
+            return
+        position = min(len(pauses) - 1, math.ceil(self.quantile * len(pauses)) - 1)
+        target = pauses[max(0, position)] * self.margin
+        self.threshold = min(self.maximum, max(self.minimum, target))
+
+
+# ---------------------------------------------------------------------------
+# Offline evaluation
+# ---------------------------------------------------------------------------
+
+# Median and spread (log-normal sigma) of intra-utterance pauses per caller style
+CALLER_STYLES = {
+    'fast': (0.2, 0.3),
+    'normal': (0.35, 0.35),
+    'slow': (0.6, 0.35)
+}
+
+
+def synthetic_pauses(text: str, style: str, rng: random.Random) -> List[float]:
+    """Pauses a caller of the given style makes while saying text."""
+    median, sigma = CALLER_STYLES[style]
+    count = rng.randint(0, 2 + len(text) // 10)
+    return [rng.lognormvariate(math.log(median), sigma) for _ in range(count)]
+
+
+def caller_styles(calls: Sequence[Dict[str, Any]], seed: int = 0) -> List[str]:
+    """Style of every call: its "style" key, or a random one."""
+    rng = random.Random(seed)
+    return [call.get('style') or rng.choice(sorted(CALLER_STYLES)) for call in calls]
+
+
+def turn_pauses(calls: Sequence[Dict[str, Any]], styles: Sequence[str],
+                seed: int = 0) -> List[List[List[float]]]:
+    """
+    Pauses of every turn of every call.
+
+    A turn's "pauses" list is used if present, a WAV turn is measured, and
+    other turns get pauses drawn for the call's caller style.
+    """
+    from ..audio.sources import AudioClip
+
+    rng = random.Random(seed)
+    result = []
+    for call, style in zip(calls, styles):
+        pauses = []
+        for turn in call['turns']:
+            if isinstance(turn, dict) and 'pauses' in turn:
+                pauses.append(list(turn['pauses']))
+            elif isinstance(turn, dict) and 'wav' in turn:
+                clip = AudioClip.from_wav(turn['wav'], "")
+                pauses.append(pause_durations(clip.pcm, clip.sample_rate, clip.sample_width))
+            else:
+                text = turn['text'] if isinstance(turn, dict) else turn
+                pauses.append(synthetic_pauses(text, style, rng))
+        result.append(pauses)
+    return result
+
+
+def simulate(calls_pauses: Sequence[Sequence[Sequence[float]]],
+             endpointer: Optional[AdaptiveEndpointer] = None,
+             fixed: float = ENDPOINT_PAUSE_THRESHOLD) -> Dict[str, Any]:
+    """
+    Endpoint every turn with a fixed or adaptive threshold.
+
+    A turn is truncated at its first pause as long as the threshold; its
+    end-of-turn delay is otherwise the threshold itself, the silence waited
+    after the caller stopped.
+    """
+    delays = []
+    turns = truncated = 0
+    for pauses in calls_pauses:
+        if endpointer:
+            endpointer.reset()
+        for turn in pauses:
+            threshold = endpointer.threshold if endpointer else fixed
+            turns += 1
+            cut = next((i for i, pause in enumerate(turn) if pause >= threshold), None)
+            if cut is None:
+                delays.append(threshold)
+                if endpointer:
+                    endpointer.observe_pauses(turn)
+            else:
+                truncated += 1
+                if endpointer:
+                    endpointer.observe_pauses(turn[:cut])
+                    endpointer.observe_truncation(turn[cut])
+    delays.sort()
+    return {
+        'turns': turns,
+        'truncated': truncated,
+        'truncation_rate': truncated / turns if turns else 0.0,
+        'mean_delay_ms': sum(delays) / len(delays) * 1000 if delays else 0.0,
+        'p95_delay_ms': delays[min(len(delays) - 1, int(len(delays) * 0.95))] * 1000 if delays else 0.0
+    }
+
+
+def evaluate(calls: Sequence[Dict[str, Any]], fixed: float = ENDPOINT_PAUSE_THRESHOLD,
+             seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Fixed and adaptive endpointing over the same calls, overall and per caller style."""
+    styles = caller_styles(calls, seed)
+    pauses = turn_pauses(calls, styles, seed)
+    report = {
+        'fixed': simulate(pauses, fixed=fixed),
+        'adaptive': simulate(pauses, AdaptiveEndpointer(initial=fixed))
+    }
+    for style in sorted(set(styles)):
+        subset = [p for p, s in zip(pauses, styles) if s == style]
+        report[f'fixed/{style}'] = simulate(subset, fixed=fixed)
+        report[f'adaptive/{style}'] = simulate(subset, AdaptiveEndpointer(initial=fixed))
+    return report
+
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    """Human-readable evaluation table."""
+    lines = [f"{'policy':<18} {'turns':>6} {'truncated':>10} {'rate':>7} {'mean ms':>9} {'p95 ms':>9}"]
+    for name, r in report.items():
+        lines.append(f"{name:<18} {r['turns']:>6} {r['truncated']:>10} {r['truncation_rate']:>7.2%} "
+                     f"{r['mean_delay_ms']:>9.0f} {r['p95_delay_ms']:>9.0f}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compare fixed and adaptive endpointing offline")
+    parser.add_argument('--calls', help="JSON/JSONL file of replay call scripts")
+    parser.add_argument('--count', type=int, default=300, help="synthetic calls if no file is given")
+    parser.add_argument('--fixed', type=float, default=ENDPOINT_PAUSE_THRESHOLD,
+                        help="fixed pause threshold to compare with (seconds)")
+    parser.add_argument('--seed', type=int, default=0, help="seed for caller styles and pauses")
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="report format")
+    parser.add_argument('--check', action='store_true',
+                        help="exit 1 if adaptive endpointing truncates more for any caller style "
+                             "or does not wait less on average")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the evaluation from the command line.
+
+    With --check, returns 1 if adaptive endpointing truncates more turns than
+    the fixed threshold for any caller style, or does not wait less on average.
+    """
+    from ..replay import load_calls, synthetic_calls
+
+    args = parse_args(argv)
+    calls = load_calls(args.calls) if args.calls else synthetic_calls(args.count)
+    report = evaluate(calls, args.fixed, args.seed)
+    print(json.dumps(report, indent=2) if args.format == 'json' else format_report(report))
+    if not args.check:
+        return 0
+    failures = [f"more truncations for {name.split('/', 1)[1]} callers"
+                for name, result in report.items()
+                if name.startswith('adaptive/') and result['truncated'] > report['fixed/' + name[9:]]['truncated']]
+    if report['adaptive']['truncated'] > report['fixed']['truncated']:
+        failures.append("more truncations overall")
+    if report['adaptive']['mean_delay_ms'] >= report['fixed']['mean_delay_ms']:
+        failures.append("no shorter mean delay")
+    if failures:
+        print("Adaptive endpointing is no better than the fixed threshold: " + ", ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
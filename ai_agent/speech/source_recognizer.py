@@ -0,0 +1,163 @@
+"""
+Speech recognizer over pluggable audio sources for the AI Agent application.
+
+SourceRecognizer offers the SpeechRecognizer interface but reads utterances
+from an AudioSource and recognizes them with a RecognitionBackend, so calls
+can be driven from WAV files or scripted text without a microphone.
+"""
+
+import logging
+import time
+from typing import Callable, Optional
+from ..audio.sources import AudioSource
+from ..events import EventBus, StatusEvent
+from ..metrics import (
+    RECOGNITION_SUCCESS, RECOGNITION_UNKNOWN_VALUE, RECOGNITION_WAIT_TIMEOUT,
+    RECOGNITION_REQUEST_ERROR, RECOGNITION_ERROR
+)
+from ..tracing import get_tracer, CAPTURE, ENDPOINTING, RECOGNITION
+from ..workers import get_cpu_pool
+from .backends import RecognitionBackend, RecognitionServiceError
+from .endpointing import AdaptiveEndpointer
+
+logger = logging.getLogger("ai_agent.speech")
+
+
+class SourceRecognizer:
+    """Recognizes utterances read from an AudioSource."""
+
+    def __init__(self, audio_source: AudioSource, backend: RecognitionBackend,
+                 timeout: int = 5, phrase_time_limit: int = 10,
+                 on_exhausted: Optional[Callable[[], None]] = None,
+                 endpointer: Optional[AdaptiveEndpointer] = None):
+        """
+        Initialize the recognizer.
+
+        Args:
+            audio_source: Where utterances come from
+            backend: Turns utterances into text
+            timeout: Timeout in seconds for listening
+            phrase_time_limit: Maximum time for a phrase
+            on_exhausted: Called once when the source has no more utterances,
+                          e.g. to end the call
+            endpointer: Sets the source's pause_threshold from the caller's
+                        measured pauses; the source's own value if None
+        """
+        self.audio_source = audio_source
+        self.backend = backend
+        self.timeout = timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.on_exhausted = on_exhausted
+        self.endpointer = endpointer
+        self.status_callback: Optional[Callable] = None
+        self.event_bus: Optional[EventBus] = None
+        self.recorder = None
+        self._is_listening = False
+        self._exhausted_reported = False
+
+    def set_status_callback(self, callback: Callable):
+        """Set callback function for status updates."""
+        self.status_callback = callback
+
+    def set_event_bus(self, event_bus: EventBus):
+        """Publish status updates on an event bus."""
+        self.event_bus = event_bus
+
+    def set_recorder(self, recorder):
+        """Store every captured utterance in a SegmentRecorder."""
+        self.recorder = recorder
+
+    def reset_endpointing(self):
+        """Start learning the pauses of a new caller."""
+        if self.endpointer:
+            self.endpointer.reset()
+
+    def _update_status(self, message: str):
+        """Update status via event bus or callback."""
+        if self.event_bus:
+            self.event_bus.publish(StatusEvent(message, source="speech"))
+        if self.status_callback:
+            self.status_callback(message)
+
+    def listen_for_speech(self) -> Optional[str]:
+        """
+        Read one utterance from the source and return recognized text.
+
+        Returns:
+            Recognized text or None if no speech was recognized
+        """
+        self._update_status("音声を聞いています...")
+        self._is_listening = True
+        tracer = get_tracer()
+        try:
+            endpointer = self.endpointer
+            generation = endpointer.generation if endpointer else 0
+            if endpointer and hasattr(self.audio_source, 'pause_threshold'):
+                self.audio_source.pause_threshold = endpointer.threshold
+            started = time.perf_counter()
+            clip = self.audio_source.read_utterance(self.timeout, self.phrase_time_limit)
+            captured = time.perf_counter()
+            if clip is None:
+                if self.audio_source.exhausted:
+                    self._report_exhausted()
+                else:
+                    RECOGNITION_WAIT_TIMEOUT.inc()
+                    self._update_status("音声入力タイムアウト")
+                return None
+
+            end_of_speech = max(started, captured - self.audio_source.last_trailing_silence)
+            tracer.record(CAPTURE, started, end_of_speech)
+            tracer.record(ENDPOINTING, end_of_speech, captured)
+            tracer.end_of_speech(end_of_speech)
+            if self.recorder:
+                self.recorder.record_clip(clip)
+            if endpointer:
+                # Dropped by the endpointer if a new call has started meanwhile.
+                # Only a live source's timing tells a truncation from a new turn.
+                live = self.audio_source.live and hasattr(self.audio_source, 'pause_threshold')
+                get_cpu_pool().try_submit(
+                    endpointer.observe_audio, clip.pcm, clip.sample_rate, clip.sample_width,
+                    generation=generation, end_of_speech=end_of_speech if live else None,
+                    threshold=self.audio_source.pause_threshold if live else None
+                )
+            self._update_status("音声認識中...")
+            with tracer.span(RECOGNITION):
+                text = self.backend.recognize(clip)
+            if text is None:
+                RECOGNITION_UNKNOWN_VALUE.inc()
+                self._update_status("音声が認識できませんでした")
+                return None
+            RECOGNITION_SUCCESS.inc()
+            self._update_status("音声認識完了")
+            return text
+        except RecognitionServiceError as e:
+            RECOGNITION_REQUEST_ERROR.inc()
+            self._update_status(f"音声認識サービスエラー: {str(e)}")
+            return None
+        except Exception as e:
+            RECOGNITION_ERROR.inc()
+            self._update_status(f"音声認識エラー: {str(e)}")
+            return None
+        finally:
+            self._is_listening = False
+
+    def _report_exhausted(self):
+        """Notify once that the source has run out."""
+        if self._exhausted_reported:
+            return
+        self._exhausted_reported = True
+        logger.debug("audio source exhausted")
+        if self.on_exhausted:
+            self.on_exhausted()
+
+    def is_listening(self) -> bool:
+        """Check if currently listening for speech."""
+        return self._is_listening
+
+    def stop_listening(self):
+        """Stop current listening operation."""
+        self._is_listening = False
+
+    def close(self):
+        """Release the audio source."""
+        self.audio_source.close()
@@ -4,8 +4,39 @@ Speech Recognition engine for the AI Agent application.
 
 import speech_recognition as sr
 import threading
+import time
 from typing import Optional, Callable
 import queue
+from ..config.settings import ADAPTIVE_ENDPOINTING
+from ..events import EventBus, StatusEvent
+from ..metrics import (
+    RECOGNITION_SUCCESS, RECOGNITION_UNKNOWN_VALUE, RECOGNITION_WAIT_TIMEOUT,
+    RECOGNITION_REQUEST_ERROR, RECOGNITION_ERROR
+)
+from ..tracing import get_tracer, CAPTURE, ENDPOINTING, RECOGNITION
+from ..workers import get_cpu_pool, get_io_pool
+from .endpointing import AdaptiveEndpointer
+
+
+class _ListenInterrupted(Exception):
+    """Raised inside Recognizer.listen() when stop_listening() ends the capture."""
+
+
+class _InterruptibleStream:
+    """Microphone stream whose next read fails once capture is stopped."""
+
+    def __init__(self, stream, stop_event: threading.Event):
+        self._stream = stream
+        self._stop_event = stop_event
+
+    def read(self, size: int) -> bytes:
+        # listen() reads one chunk at a time, so a stop takes effect within a chunk
+        if self._stop_event.is_set():
+            raise _ListenInterrupted()
+        return self._stream.read(size)
+
+    def close(self):
+        self._stream.close()
 
 
 class SpeechRecognizer:
@@ -26,8 +57,17 @@ class SpeechRecognizer:
         self.timeout = timeout
         self.phrase_time_limit = phrase_time_limit
         self.status_callback: Optional[Callable] = None
+        self.event_bus: Optional[EventBus] = None
+        self.recorder = None
         self._audio_queue = queue.Queue()
         self._is_listening = False
+        # The microphone can only be opened once at a time; stop_listening()
+        # sets _stop_capture to make the capture holding it return early
+        self._capture_lock = threading.Lock()
+        self._stop_capture = threading.Event()
+        # Learns the caller's pauses; None keeps the recognizer's pause_threshold
+        self.endpointer = AdaptiveEndpointer() if ADAPTIVE_ENDPOINTING else None
+        self._non_speaking_duration = self.recognizer.non_speaking_duration
         
         # Adjust for ambient noise
         self._calibrate_microphone()
@@ -35,7 +75,7 @@ class SpeechRecognizer:
     def _calibrate_microphone(self):
         """Calibrate microphone for ambient noise."""
         try:
-            with self.microphone as source:
+            with self._capture_lock, self.microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
         except Exception as e:
             print(f"Warning: Failed to calibrate microphone: {str(e)}")
@@ -44,8 +84,29 @@ class SpeechRecognizer:
         """Set callback function for status updates."""
         self.status_callback = callback
     
+    def set_event_bus(self, event_bus: EventBus):
+        """Publish status updates on an event bus."""
+        self.event_bus = event_bus
+    
+    def set_recorder(self, recorder):
+        """Store every captured utterance in a SegmentRecorder."""
+        self.recorder = recorder
+    
+    def reset_endpointing(self):
+        """Start learning the pauses of a new caller."""
+        if self.endpointer:
+            self.endpointer.reset()
+    
+    def _apply_pause_threshold(self, threshold: float):
+        """Use threshold seconds of silence as the end of an utterance."""
+        self.recognizer.pause_threshold = threshold
+        # speech_recognition requires non_speaking_duration <= pause_threshold
+        self.recognizer.non_speaking_duration = min(self._non_speaking_duration, threshold)
+    
     def _update_status(self, message: str):
-        """Update status via callback."""
+        """Update status via event bus or callback."""
+        if self.event_bus:
+            self.event_bus.publish(StatusEvent(message, source="speech"))
         if self.status_callback:
             self.status_callback(message)
     
@@ -60,66 +121,114 @@ class SpeechRecognizer:
             self._update_status("音声を聞いています...")
             self._is_listening = True
             
-            with self.microphone as source:
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=self.timeout, 
-                    phrase_time_limit=self.phrase_time_limit
-                )
+            tracer = get_tracer()
+            endpointer = self.endpointer
+            generation = endpointer.generation if endpointer else 0
+            if endpointer:
+                self._apply_pause_threshold(endpointer.threshold)
+            # Wait until a capture that was stopped has released the microphone
+            with self._capture_lock:
+                self._stop_capture.clear()
+                started = time.perf_counter()
+                with self.microphone as source:
+                    source.stream = _InterruptibleStream(source.stream, self._stop_capture)
+                    audio = self.recognizer.listen(
+                        source, 
+                        timeout=self.timeout, 
+                        phrase_time_limit=self.phrase_time_limit
+                    )
+            
+            # listen() returns after pause_threshold seconds of silence, so
+            # speech ended that long before it returned
+            captured = time.perf_counter()
+            end_of_speech = max(started, captured - self.recognizer.pause_threshold)
+            tracer.record(CAPTURE, started, end_of_speech)
+            tracer.record(ENDPOINTING, end_of_speech, captured)
+            tracer.end_of_speech(end_of_speech)
+            if self.recorder:
+                self.recorder.record(audio.get_raw_data(), audio.sample_rate, audio.sample_width)
+            if endpointer:
+                # Pauses are measured off the turn's critical path; skipped
+                # when busy and dropped if a new call has started meanwhile.
+                # Speech resumed right after the previous endpoint counts as
+                # a truncation of that turn.
+                get_cpu_pool().try_submit(endpointer.observe_audio, audio.get_raw_data(),
+                                          audio.sample_rate, audio.sample_width,
+                                          self.recognizer.energy_threshold, generation,
+                                          end_of_speech, self.recognizer.pause_threshold)
             
             self._update_status("音声認識中...")
             
             # Recognize speech using Google Speech Recognition
-            text = self.recognizer.recognize_google(audio, language=self.language)
+            with tracer.span(RECOGNITION):
+                text = self.recognizer.recognize_google(audio, language=self.language)
+            RECOGNITION_SUCCESS.inc()
             self._update_status("音声認識完了")
             self._is_listening = False
             return text
             
+        except _ListenInterrupted:
+            self._update_status("音声入力を停止しました")
+            self._is_listening = False
+            return None
         except sr.WaitTimeoutError:
+            RECOGNITION_WAIT_TIMEOUT.inc()
             self._update_status("音声入力タイムアウト")
             self._is_listening = False
             return None
         except sr.UnknownValueError:
+            RECOGNITION_UNKNOWN_VALUE.inc()
             self._update_status("音声が認識できませんでした")
             self._is_listening = False
             return None
         except sr.RequestError as e:
+            RECOGNITION_REQUEST_ERROR.inc()
             self._update_status(f"音声認識サービスエラー: {str(e)}")
             self._is_listening = False
             return None
         except Exception as e:
+            RECOGNITION_ERROR.inc()
             self._update_status(f"音声認識エラー: {str(e)}")
             self._is_listening = False
             return None
     
     def listen_continuous(self, callback: Callable[[str], None], stop_event: threading.Event):
         """
-        Continuously listen for speech in a separate thread.
+        Continuously listen for speech on the shared I/O pool, until
+        stop_event or the pool's stop_event is set.
         
         Args:
             callback: Function to call with recognized text
             stop_event: Event to signal when to stop listening
+            
+        Returns:
+            Future of the listening task, done once stop_event is set
         """
+        pool = get_io_pool()
+        
         def listen_worker():
-            while not stop_event.is_set():
+            while not (stop_event.is_set() or pool.stop_event.is_set()):
                 text = self.listen_for_speech()
                 if text:
                     callback(text)
                 if stop_event.wait(0.1):  # Small delay to prevent busy waiting
                     break
         
-        thread = threading.Thread(target=listen_worker)
-        thread.daemon = True
-        thread.start()
-        return thread
+        return pool.submit(listen_worker)
     
     def is_listening(self) -> bool:
         """Check if currently listening for speech."""
         return self._is_listening
     
     def stop_listening(self):
-        """Stop current listening operation."""
+        """
+        Stop the current listening operation.
+        
+        The capture returns within one audio chunk and closes the microphone,
+        so a call started right after can open it again.
+        """
         self._is_listening = False
+        self._stop_capture.set()
     
     def get_microphone_list(self):
         """Get list of available microphones."""
@@ -136,7 +245,7 @@ class SpeechRecognizer:
     def test_microphone(self) -> bool:
         """Test if microphone is working properly."""
         try:
-            with self.microphone as source:
+            with self._capture_lock, self.microphone as source:
                 audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
             return True
         except:
@@ -3,10 +3,26 @@ Text-to-Speech engine for the AI Agent application.
 """
 
 import pyttsx3
+import contextlib
+import logging
+import os
 import threading
 import random
+import sys
+import tempfile
+import time
+import wave
 from typing import Optional, Callable
+from ..events import EventBus, VoiceEvent
+from ..metrics import TTS_SPEAK_SECONDS, TTS_SYNTHESIZE_SECONDS
+from ..tracing import get_tracer, SYNTHESIS, PLAYBACK_START
+from ..workers import get_io_pool
 
+logger = logging.getLogger("ai_agent.speech")
+
+# Seconds between attempts of live speech to cancel speculative synthesis
+# that holds the engine
+PREEMPT_INTERVAL = 0.05
 
 class TTSEngine:
     """Text-to-Speech engine with Japanese voice support."""
@@ -23,6 +39,19 @@ class TTSEngine:
         self.volume = volume
         self.rate = rate
         self.voice_callback: Optional[Callable] = None
+        self.event_bus: Optional[EventBus] = None
+        self.recorder = None
+        # pyttsx3 engines are not reentrant; speech and synthesis share this
+        # lock, and live speech cancels speculative synthesis holding it
+        self._engine_lock = threading.RLock()
+        self._state_lock = threading.Lock()
+        self._live_waiting = 0
+        self._speculating = False
+        self._preempted = False
+        self._say_started = 0.0
+        # Set while the engine plays live speech; pyttsx3 also reports
+        # utterances it only renders to a file
+        self._live_utterance = False
         self._initialize_engine()
     
     def _initialize_engine(self):
@@ -46,6 +75,9 @@ class TTSEngine:
             self.engine.setProperty('rate', self.rate)
             self.engine.setProperty('volume', self.volume)
             
+            # Marks when synthesized audio starts playing, for tracing
+            self.engine.connect('started-utterance', self._on_utterance_started)
+            
         except ImportError as e:
             if 'pywintypes' in str(e):
                 raise RuntimeError(
@@ -74,36 +106,234 @@ class TTSEngine:
         """Set callback function for voice visualization."""
         self.voice_callback = callback
     
-    def speak(self, text: str, blocking: bool = True):
+    def set_event_bus(self, event_bus: EventBus):
+        """Publish voice visualization frames on an event bus."""
+        self.event_bus = event_bus
+    
+    def set_recorder(self, recorder):
+        """
+        Store every played reply in a SegmentRecorder.
+        
+        pyttsx3 does not expose the audio it plays, so while recording is on
+        replies are synthesized to a file and played from there.
+        """
+        self.recorder = recorder
+    
+    def speak(self, text: str, blocking: bool = True, prepared_audio: Optional[str] = None):
         """
         Speak the given text.
         
         Args:
             text: Text to speak
             blocking: Whether to block until speech is complete
+            prepared_audio: WAV file already synthesized for text, played
+                            directly instead of synthesizing again
+            
+        Returns:
+            Future of the speech on the shared I/O pool if not blocking
         """
         if not self.engine:
             raise RuntimeError("TTS engine not initialized")
         
-        if self.voice_callback:
+        if self.voice_callback or self.event_bus:
             self._animate_voice()
         
+        if prepared_audio:
+            if blocking:
+                if self.play_audio_file(prepared_audio):
+                    return None
+            else:
+                return get_io_pool().submit(self._play_or_say, text, prepared_audio)
+        
         try:
-            self.engine.say(text)
             if blocking:
-                self.engine.runAndWait()
+                self._say(text)
             else:
-                # Run in separate thread for non-blocking speech
-                thread = threading.Thread(target=self.engine.runAndWait)
-                thread.daemon = True
-                thread.start()
-                return thread
+                # Run on the I/O pool for non-blocking speech
+                return get_io_pool().submit(self._say, text)
         except Exception as e:
             raise RuntimeError(f"Failed to speak text: {str(e)}")
     
+    def _say(self, text: str):
+        """Synthesize and play text on the engine."""
+        if self.recorder and self._say_recorded(text):
+            return
+        with self._live_engine():
+            self._say_started = time.perf_counter()
+            self._live_utterance = True
+            try:
+                self.engine.say(text)
+                self.engine.runAndWait()
+            finally:
+                self._live_utterance = False
+            TTS_SPEAK_SECONDS.observe(time.perf_counter() - self._say_started)
+    
+    @contextlib.contextmanager
+    def _live_engine(self):
+        """Hold the engine for live speech, cancelling speculative synthesis that has it."""
+        with self._state_lock:
+            self._live_waiting += 1
+        try:
+            while True:
+                with self._state_lock:
+                    if self._speculating:
+                        self._preempted = True
+                        self.engine.stop()
+                if self._engine_lock.acquire(timeout=PREEMPT_INTERVAL):
+                    break
+            try:
+                yield
+            finally:
+                self._engine_lock.release()
+        finally:
+            with self._state_lock:
+                self._live_waiting -= 1
+    
+    def _say_recorded(self, text: str) -> bool:
+        """
+        Synthesize text to a temporary file and play it, so it can be recorded.
+        
+        Playback start and first audio are marked by play_audio_file when the
+        first chunk reaches the device, not when synthesis starts.
+        """
+        fd, filename = tempfile.mkstemp(suffix=".wav", prefix="ai_agent_say_")
+        os.close(fd)
+        try:
+            with get_tracer().span(SYNTHESIS):
+                synthesized = self.synthesize_to_file(text, filename)
+            return synthesized and self.play_audio_file(filename)
+        finally:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+    
+    def _on_utterance_started(self, name=None):
+        """pyttsx3 callback: the first audio of a live utterance is playing."""
+        if not self._live_utterance:
+            # save_to_file() in synthesize_to_file: nothing is played
+            return
+        now = time.perf_counter()
+        tracer = get_tracer()
+        # pyttsx3 synthesizes and starts the device in one step
+        tracer.record(SYNTHESIS, self._say_started, now)
+        tracer.record(PLAYBACK_START, now, now)
+        tracer.first_audio(now)
+    
+    def _play_or_say(self, text: str, audio_file: str):
+        """Play a prepared file, falling back to live synthesis."""
+        if not self.play_audio_file(audio_file):
+            self._say(text)
+    
+    def synthesize_to_file(self, text: str, filename: str, preemptible: bool = False) -> bool:
+        """
+        Render text to a WAV file without playing it.
+        
+        Args:
+            text: Text to synthesize
+            filename: Output WAV path
+            preemptible: Speculative synthesis: it does not start while live
+                         speech waits for the engine, and live speech cancels
+                         it, so a reply never queues behind a guess
+            
+        Returns:
+            True if the file was written; False if synthesis failed or was
+            cancelled, in which case the file may be incomplete
+        """
+        if not self.engine:
+            return False
+        
+        try:
+            if not preemptible:
+                with self._live_engine():
+                    self._render(text, filename)
+                return True
+            with self._engine_lock:
+                with self._state_lock:
+                    if self._live_waiting:
+                        return False
+                    self._speculating = True
+                    self._preempted = False
+                try:
+                    self._render(text, filename)
+                finally:
+                    with self._state_lock:
+                        self._speculating = False
+                        preempted = self._preempted
+            return not preempted
+        except Exception:
+            logger.exception("Synthesizing to %s failed", filename)
+            return False
+    
+    def _render(self, text: str, filename: str):
+        """Run save_to_file() on the engine. Called with the engine lock held."""
+        started = time.perf_counter()
+        self.engine.save_to_file(text, filename)
+        self.engine.runAndWait()
+        TTS_SYNTHESIZE_SECONDS.observe(time.perf_counter() - started)
+    
+    def play_audio_file(self, filename: str) -> bool:
+        """
+        Play a WAV file produced by synthesize_to_file.
+        
+        Returns:
+            True if playback started, even if it failed partway (falling
+            back to live speech would repeat the reply); False if nothing
+            was played
+        """
+        tracer = get_tracer()
+        started = time.perf_counter()
+        played = False
+        try:
+            if sys.platform == 'win32':
+                import winsound
+                # PlaySound blocks until the end; the request is the best mark
+                now = time.perf_counter()
+                tracer.record(PLAYBACK_START, started, now)
+                tracer.first_audio(now)
+                winsound.PlaySound(filename, winsound.SND_FILENAME)
+                played = True
+                TTS_SPEAK_SECONDS.observe(time.perf_counter() - started)
+                if self.recorder:
+                    self.recorder.record_wav(filename)
+                return True
+            
+            import pyaudio
+            with wave.open(filename, 'rb') as wav:
+                audio = pyaudio.PyAudio()
+                try:
+                    stream = audio.open(
+                        format=audio.get_format_from_width(wav.getsampwidth()),
+                        channels=wav.getnchannels(),
+                        rate=wav.getframerate(),
+                        output=True
+                    )
+                    chunk = wav.readframes(1024)
+                    if chunk:
+                        stream.write(chunk)
+                        played = True
+                        now = time.perf_counter()
+                        tracer.record(PLAYBACK_START, started, now)
+                        tracer.first_audio(now)
+                        chunk = wav.readframes(1024)
+                    while chunk:
+                        stream.write(chunk)
+                        chunk = wav.readframes(1024)
+                    stream.stop_stream()
+                    stream.close()
+                finally:
+                    audio.terminate()
+            TTS_SPEAK_SECONDS.observe(time.perf_counter() - started)
+            if self.recorder:
+                self.recorder.record_wav(filename)
+            return True
+        except Exception:
+            logger.exception("Playing %s failed%s", filename, " partway" if played else "")
+            return played
+    
     def _animate_voice(self):
-        """Animate voice visualization if callback is set."""
-        if self.voice_callback:
+        """Animate voice visualization if a callback or event bus is set."""
+        if self.voice_callback or self.event_bus:
             # Generate random pitch pattern for visualization
             pitch_data = []
             for i in range(10):
@@ -111,7 +341,10 @@ class TTSEngine:
                 color = f"#{random.randint(100, 255):02x}{random.randint(100, 255):02x}{random.randint(100, 255):02x}"
                 pitch_data.append((i * 10, height, color))
             
-            self.voice_callback(pitch_data)
+            if self.event_bus:
+                self.event_bus.publish(VoiceEvent(pitch_data))
+            if self.voice_callback:
+                self.voice_callback(pitch_data)
     
     def stop(self):
         """Stop current speech."""
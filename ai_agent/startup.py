@@ -0,0 +1,89 @@
+"""
+Startup profiling for the AI Agent application.
+
+StartupProfiler records how long each import and initialization phase takes,
+on which thread it ran and when it started, so the effect of lazy and
+parallel startup can be seen per component.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StartupProfiler:
+    """Collects timed startup phases from any thread."""
+
+    def __init__(self, enabled: bool = True, started: Optional[float] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled: Record phases; a disabled profiler costs almost nothing
+            started: perf_counter() value that offsets are measured from
+        """
+        self.enabled = enabled
+        self.started = time.perf_counter() if started is None else started
+        self.phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: float, error: Optional[str] = None):
+        """Record a phase measured elsewhere, as perf_counter() values."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.phases.append({
+                'name': name,
+                'thread': threading.current_thread().name,
+                'start_ms': (start - self.started) * 1000,
+                'duration_ms': (end - start) * 1000,
+                'error': error
+            })
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one phase."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.add(name, start, time.perf_counter(), error=str(e))
+            raise
+        self.add(name, start, time.perf_counter())
+
+    def total_ms(self) -> float:
+        """Wall time from the start until the last phase ended."""
+        with self._lock:
+            if not self.phases:
+                return 0.0
+            return max(p['start_ms'] + p['duration_ms'] for p in self.phases)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report as a JSON-serializable dict."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p['start_ms'])
+        return {'total_ms': self.total_ms(), 'phases': phases}
+
+    def format_report(self) -> str:
+        """Human-readable table of the recorded phases."""
+        report = self.to_dict()
+        lines = [
+            f"Startup profile (total {report['total_ms']:.1f} ms)",
+            f"{'phase':<34} {'thread':<14} {'start ms':>9} {'duration ms':>12}"
+        ]
+        for p in report['phases']:
+            line = (f"{p['name']:<34} {p['thread'][:14]:<14} "
+                    f"{p['start_ms']:>9.1f} {p['duration_ms']:>12.1f}")
+            if p['error']:
+                line += f"  ERROR: {p['error']}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """Report as JSON."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
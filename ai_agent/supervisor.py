@@ -0,0 +1,467 @@
+"""
+Multi-line call-center supervisor for the AI Agent application.
+
+The supervisor runs a pool of headless worker processes. Each worker owns a
+conversation engine and an asyncio orchestrator and serves several calls
+(lines) at once; the supervisor assigns calls to workers, restarts workers
+that crash and re-queues the calls they were handling, and aggregates
+per-worker throughput and turn latency.
+
+Workers run each call through the same pipeline as the headless application:
+the conversation manager, recognizer and TTS publish on the worker's event
+bus, consumed by a HeadlessSink, with response speculation and adaptive
+endpointing as configured in settings.py. Audio I/O is pluggable: by default
+the customer's text or WAV turns are recognized by a local stand-in backend
+and replies go to a silent sink, so the supervisor runs on servers without
+sound hardware; --audio live recognizes WAV turns with Google Speech
+Recognition and speaks through pyttsx3. --scripted runs the bare load-test
+pipeline of the replay harness instead.
+
+    python -m ai_agent.supervisor --workers 4 --lines 8 --calls calls.json
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from .orchestrator import ConversationOrchestrator
+from .replay import (
+    DEFAULT_PAUSE_THRESHOLD, TimedPipeline, build_source, load_calls, run_scripted_call,
+    synthetic_calls
+)
+
+logger = logging.getLogger("ai_agent.supervisor")
+
+# Result messages from workers
+STARTED = "started"
+FINISHED = "finished"
+FAILED = "failed"
+
+# Audio I/O of the headless pipeline
+STANDIN_AUDIO = "standin"
+LIVE_AUDIO = "live"
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+async def run_headless_call(engine, executor, call: Dict[str, Any], speed: float, event_bus,
+                            audio: str = STANDIN_AUDIO, tts_engine=None) -> Dict[str, Any]:
+    """
+    Run one call through the headless application pipeline and measure it.
+
+    Args:
+        engine: Shared ConversationEngine
+        executor: Executor for the blocking stages
+        call: Call script, see load_calls()
+        speed: Audio speed relative to real time; 0 runs without waiting
+        event_bus: Worker's EventBus the call's components publish on
+        audio: STANDIN_AUDIO or LIVE_AUDIO
+        tts_engine: Worker's TTSEngine for live audio; a silent sink if None
+
+    Returns:
+        Call id, turns, wall duration, reply latencies and audio seconds
+    """
+    from .audio.sinks import NullSink
+    from .config.settings import (
+        ADAPTIVE_ENDPOINTING, ENABLE_SPECULATION, PHRASE_TIME_LIMIT, SPEECH_TIMEOUT, VOICE_LANGUAGE
+    )
+    from .conversation.conversation_manager import ConversationManager
+    from .conversation.speculation import ResponseSpeculator
+    from .speech.backends import GoogleBackend, TranscriptBackend
+    from .speech.endpointing import AdaptiveEndpointer
+    from .speech.source_recognizer import SourceRecognizer
+
+    manager = ConversationManager(engine)
+    manager.set_event_bus(event_bus)
+    source = build_source(call, speed, DEFAULT_PAUSE_THRESHOLD)
+    backend = GoogleBackend(VOICE_LANGUAGE) if audio == LIVE_AUDIO else TranscriptBackend()
+    recognizer = SourceRecognizer(source, backend, SPEECH_TIMEOUT, PHRASE_TIME_LIMIT,
+                                  on_exhausted=manager.stop_conversation,
+                                  endpointer=AdaptiveEndpointer() if ADAPTIVE_ENDPOINTING else None)
+    recognizer.set_event_bus(event_bus)
+    sink = tts_engine
+    if sink is None:
+        sink = NullSink(speed)
+        sink.set_event_bus(event_bus)
+    speculator = ResponseSpeculator(manager, sink if ENABLE_SPECULATION else None)
+    pipeline = TimedPipeline(manager, recognizer, sink, speculator)
+    pipeline.executor = executor
+
+    started = time.perf_counter()
+    try:
+        opening = await pipeline.start()
+        await pipeline.run(opening)
+    finally:
+        # Closing waits for speculative synthesis, so keep it off the loop
+        await asyncio.get_running_loop().run_in_executor(executor, speculator.close)
+        recognizer.close()
+        manager.close()
+    return {
+        'call_id': call['id'],
+        'turns': len(pipeline.latencies),
+        'duration': time.perf_counter() - started,
+        'latencies': pipeline.latencies,
+        'audio_sec': source.total_duration + getattr(sink, 'spoken_seconds', 0.0)
+    }
+
+
+def worker_main(worker_id: int, generation: int, tasks, results, lines: int, speed: float,
+                script_file: Optional[str] = None, scripted: bool = False,
+                audio: str = STANDIN_AUDIO):
+    """
+    Entry point of a worker process.
+
+    Runs up to lines calls concurrently on one orchestrator until a None task
+    arrives, reporting each call on the results queue. Calls go through the
+    headless application pipeline, or the replay harness's load-test pipeline
+    if scripted is True. A script file is watched and reloaded into the
+    worker's engine while calls run.
+    """
+    logging.basicConfig(level=logging.WARNING)
+    from .conversation.engine import ConversationEngine
+
+    watcher = None
+    if script_file:
+        from .conversation.script_file import ScriptWatcher, load_script
+        engine = ConversationEngine(load_script(script_file), record_history=False)
+        watcher = ScriptWatcher(script_file, [engine])
+        watcher.start()
+    else:
+        engine = ConversationEngine(record_history=False)
+    # Each line blocks at most one executor thread at a time, plus one
+    # closing the speculator at the end of its call
+    orchestrator = ConversationOrchestrator(max_workers=lines * 2)
+    outstanding = threading.Semaphore(lines)
+    running: List[Any] = []
+
+    event_bus = sink = tts_engine = None
+    if not scripted:
+        # One front end per worker, as in the headless application
+        from .events import EventBus
+        from .headless import HeadlessSink
+        event_bus = EventBus()
+        sink = HeadlessSink(exit_when_idle=False)
+        sink.attach_event_bus(event_bus)
+        if audio == LIVE_AUDIO:
+            from .config.settings import DEFAULT_VOICE_RATE, DEFAULT_VOLUME
+            from .speech.tts_engine import TTSEngine
+            tts_engine = TTSEngine(volume=DEFAULT_VOLUME, rate=DEFAULT_VOICE_RATE)
+            tts_engine.set_event_bus(event_bus)
+
+    def run_call(call):
+        if scripted:
+            return run_scripted_call(engine, orchestrator.executor, call, speed)
+        return run_headless_call(engine, orchestrator.executor, call, speed, event_bus,
+                                 audio, tts_engine)
+
+    def report(call_id, future):
+        outstanding.release()
+        try:
+            results.put((FINISHED, worker_id, generation, call_id, future.result()))
+        except Exception as e:
+            results.put((FAILED, worker_id, generation, call_id, repr(e)))
+
+    try:
+        while True:
+            call = tasks.get()
+            if call is None:
+                break
+            outstanding.acquire()
+            results.put((STARTED, worker_id, generation, call['id'], os.getpid()))
+            future = orchestrator.submit(run_call(call))
+            future.add_done_callback(lambda f, call_id=call['id']: report(call_id, f))
+            running.append(future)
+            running = [f for f in running if not f.done()]
+        for future in running:
+            try:
+                future.result()
+            except Exception:
+                pass
+    finally:
+        orchestrator.shutdown()
+        if watcher:
+            watcher.stop()
+        if tts_engine:
+            tts_engine.cleanup()
+        if event_bus:
+            event_bus.close()
+            logger.info("worker %d session metrics: %s", worker_id, sink.get_metrics())
+
+
+# ---------------------------------------------------------------------------
+# Supervisor
+# ---------------------------------------------------------------------------
+
+class WorkerStats:
+    """Aggregated results of one worker slot across restarts."""
+
+    __slots__ = ('calls', 'failed', 'turns', 'restarts', 'latencies')
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.calls = 0
+        self.failed = 0
+        self.turns = 0
+        self.restarts = 0
+        self.latencies: List[float] = []
+
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        """Summary including throughput over elapsed seconds."""
+        return {
+            'calls': self.calls,
+            'failed': self.failed,
+            'turns': self.turns,
+            'restarts': self.restarts,
+            'turns_per_sec': self.turns / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': percentile(self.latencies, 50) * 1000,
+            'latency_p95_ms': percentile(self.latencies, 95) * 1000,
+            'latency_max_ms': max(self.latencies, default=0.0) * 1000
+        }
+
+
+class WorkerHandle:
+    """Supervisor-side state of one worker process."""
+
+    def __init__(self, worker_id: int):
+        """Initialize the handle; the process is started by the supervisor."""
+        self.worker_id = worker_id
+        self.generation = 0
+        self.process = None
+        self.tasks = None
+        self.in_flight: Dict[str, Tuple[Dict[str, Any], int]] = {}
+        self.stats = WorkerStats()
+
+
+class Supervisor:
+    """Assigns calls to worker processes and restarts crashed workers."""
+
+    def __init__(self, workers: int = 2, lines: int = 4, speed: float = 0.0,
+                 max_retries: int = 2, start_method: str = 'spawn',
+                 script_file: Optional[str] = None, scripted: bool = False,
+                 audio: str = STANDIN_AUDIO):
+        """
+        Initialize the supervisor.
+
+        Args:
+            workers: Number of worker processes
+            lines: Concurrent calls per worker
+            speed: Audio speed relative to real time; 0 runs as fast as possible
+            max_retries: Times a call is re-queued after its worker crashed
+            start_method: multiprocessing start method ('spawn' works everywhere)
+            script_file: JSON conversation script each worker loads and watches
+            scripted: Run the load-test pipeline instead of the headless one
+            audio: Audio I/O of the headless pipeline, STANDIN_AUDIO or LIVE_AUDIO
+        """
+        self.workers = workers
+        self.lines = lines
+        self.speed = speed
+        self.max_retries = max_retries
+        self.script_file = script_file
+        self.scripted = scripted
+        self.audio = audio
+        self._context = multiprocessing.get_context(start_method)
+        self._results = self._context.Queue()
+        self._handles = [WorkerHandle(i) for i in range(workers)]
+        self._pending: Deque[Tuple[Dict[str, Any], int]] = collections.deque()
+        self._lost: List[str] = []
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def _spawn(self, handle: WorkerHandle):
+        """Start (or restart) the process of a worker slot."""
+        handle.generation += 1
+        handle.tasks = self._context.Queue()
+        handle.process = self._context.Process(
+            target=worker_main,
+            args=(handle.worker_id, handle.generation, handle.tasks, self._results,
+                  self.lines, self.speed, self.script_file, self.scripted, self.audio),
+            name=f"call-worker-{handle.worker_id}"
+        )
+        handle.process.daemon = True
+        handle.process.start()
+
+    def _assign(self):
+        """Hand pending calls to workers with free lines, least loaded first."""
+        while self._pending:
+            handle = min(self._handles, key=lambda h: len(h.in_flight))
+            if len(handle.in_flight) >= self.lines:
+                return
+            call, attempts = self._pending.popleft()
+            handle.in_flight[call['id']] = (call, attempts)
+            handle.tasks.put(call)
+
+    def _handle_result(self, message: Tuple):
+        """Apply one worker report."""
+        kind, worker_id, generation, call_id, payload = message
+        handle = self._handles[worker_id]
+        if generation != handle.generation or call_id not in handle.in_flight:
+            # Report from a crashed generation whose calls were re-queued
+            return
+        if kind == STARTED:
+            return
+        del handle.in_flight[call_id]
+        if kind == FINISHED:
+            handle.stats.calls += 1
+            handle.stats.turns += payload['turns']
+            handle.stats.latencies.extend(payload['latencies'])
+        else:
+            handle.stats.failed += 1
+            logger.warning("call %s failed on worker %d: %s", call_id, worker_id, payload)
+
+    def _check_workers(self):
+        """Restart dead workers and re-queue their calls."""
+        for handle in self._handles:
+            if handle.process.is_alive():
+                continue
+            logger.warning("worker %d exited with code %s; restarting",
+                           handle.worker_id, handle.process.exitcode)
+            for call, attempts in handle.in_flight.values():
+                if attempts < self.max_retries:
+                    self._pending.appendleft((call, attempts + 1))
+                else:
+                    self._lost.append(call['id'])
+                    handle.stats.failed += 1
+            handle.in_flight = {}
+            handle.stats.restarts += 1
+            self._spawn(handle)
+
+    def run(self, calls: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run all calls and return the aggregated report.
+
+        Args:
+            calls: Call scripts, see load_calls()
+        """
+        self._pending.extend((call, 0) for call in calls)
+        self._started = time.perf_counter()
+        for handle in self._handles:
+            self._spawn(handle)
+
+        try:
+            while self._pending or any(h.in_flight for h in self._handles):
+                self._assign()
+                try:
+                    self._handle_result(self._results.get(timeout=0.2))
+                except queue.Empty:
+                    pass
+                self._check_workers()
+        finally:
+            self._elapsed = time.perf_counter() - self._started
+            self.shutdown()
+        return self.report()
+
+    def shutdown(self):
+        """Stop all workers after their current calls."""
+        for handle in self._handles:
+            if handle.process is not None and handle.process.is_alive():
+                handle.tasks.put(None)
+        for handle in self._handles:
+            if handle.process is None:
+                continue
+            handle.process.join(timeout=10)
+            if handle.process.is_alive():
+                handle.process.terminate()
+
+    def report(self) -> Dict[str, Any]:
+        """Per-worker and total throughput and latency."""
+        elapsed = self._elapsed
+        total = WorkerStats()
+        workers = {}
+        for handle in self._handles:
+            stats = handle.stats
+            workers[handle.worker_id] = stats.to_dict(elapsed)
+            total.calls += stats.calls
+            total.failed += stats.failed
+            total.turns += stats.turns
+            total.restarts += stats.restarts
+            total.latencies.extend(stats.latencies)
+        return {
+            'elapsed_sec': elapsed,
+            'lines': self.workers * self.lines,
+            'workers': workers,
+            'total': total.to_dict(elapsed),
+            'lost_calls': list(self._lost)
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable table of a supervisor report."""
+    header = (f"{'worker':<8} {'calls':>6} {'failed':>6} {'turns':>7} {'restarts':>8} "
+              f"{'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    lines = [f"Supervisor report ({report['lines']} lines, {report['elapsed_sec']:.2f} s)", header]
+    rows = [(str(worker_id), stats) for worker_id, stats in report['workers'].items()]
+    rows.append(('total', report['total']))
+    for name, s in rows:
+        lines.append(
+            f"{name:<8} {s['calls']:>6} {s['failed']:>6} {s['turns']:>7} {s['restarts']:>8} "
+            f"{s['turns_per_sec']:>8.1f} {s['latency_p50_ms']:>8.2f} "
+            f"{s['latency_p95_ms']:>8.2f} {s['latency_max_ms']:>8.2f}"
+        )
+    if report['lost_calls']:
+        lines.append(f"lost calls: {', '.join(report['lost_calls'])}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run many headless agent calls across processes")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help="worker processes")
+    parser.add_argument('--lines', type=int, default=4, help="concurrent calls per worker")
+    parser.add_argument('--calls', help="JSON/JSONL file of call scripts")
+    parser.add_argument('--count', type=int, default=20,
+                        help="synthetic calls to run when --calls is not given")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="audio speed relative to real time (0 = no waiting)")
+    parser.add_argument('--max-retries', type=int, default=2,
+                        help="re-queues of a call whose worker crashed")
+    parser.add_argument('--script', metavar='FILE',
+                        help="JSON conversation script, reloaded by the workers when it changes")
+    parser.add_argument('--scripted', action='store_true',
+                        help="run calls through the bare load-test pipeline of the replay "
+                             "harness instead of the headless application pipeline")
+    parser.add_argument('--audio', choices=(STANDIN_AUDIO, LIVE_AUDIO), default=STANDIN_AUDIO,
+                        help="audio I/O of the headless pipeline: local stand-ins, or Google "
+                             "Speech Recognition of WAV turns and pyttsx3 speech")
+    parser.add_argument('--format', choices=('text', 'json'), default='text',
+                        help="report format")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the supervisor from the command line."""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    calls = load_calls(args.calls) if args.calls else synthetic_calls(args.count)
+
+    supervisor = Supervisor(args.workers, args.lines, args.speed, args.max_retries,
+                            script_file=args.script, scripted=args.scripted, audio=args.audio)
+    report = supervisor.run(calls)
+    if args.format == 'json':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report))
+    return 1 if report['lost_calls'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Per-turn latency tracing for the AI Agent application.
+
+Stages of a turn (capture, endpointing, recognition, categorization,
+response selection, synthesis, playback start) record spans on a shared
+Tracer. Recording a span is two perf_counter() calls, two deque appends and
+a histogram update, cheap enough to leave on in production. Spans are kept
+in a ring buffer that can be exported as Chrome trace-event JSON
+(chrome://tracing, Perfetto), and every stage keeps a rolling window of
+durations for live p50/p95/p99 queries and feeds the stage latency
+histogram metric.
+
+A turn is identified by a context variable set by the call pipeline, so
+spans recorded on executor threads are attributed to the right call and
+turn. The "turn" stage measures end of customer speech to first audio out.
+"""
+
+import collections
+import contextvars
+import json
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .config.settings import ENABLE_TRACING, TRACE_BUFFER_SPANS, TRACE_HISTOGRAM_WINDOW
+from .metrics import STAGE_LATENCY
+
+# Stages
+CAPTURE = "capture"
+ENDPOINTING = "endpointing"
+RECOGNITION = "recognition"
+CATEGORIZATION = "categorization"
+RESPONSE_SELECTION = "response_selection"
+SYNTHESIS = "synthesis"
+PLAYBACK_START = "playback_start"
+TURN = "turn"
+
+STAGES = (CAPTURE, ENDPOINTING, RECOGNITION, CATEGORIZATION, RESPONSE_SELECTION,
+          SYNTHESIS, PLAYBACK_START, TURN)
+
+
+class TurnTrace:
+    """Identity and end-of-speech time of the turn being traced."""
+
+    __slots__ = ('call_id', 'turn', 'end_of_speech')
+
+    def __init__(self, call_id: Any, turn: int):
+        """Initialize the turn."""
+        self.call_id = call_id
+        self.turn = turn
+        self.end_of_speech: Optional[float] = None
+
+
+_current_turn: contextvars.ContextVar = contextvars.ContextVar("ai_agent_turn", default=None)
+
+
+def current_turn() -> Optional[TurnTrace]:
+    """Turn of the current context, or None outside a call."""
+    return _current_turn.get()
+
+
+class _Span:
+    """Context manager recording one span."""
+
+    __slots__ = ('tracer', 'stage', 'start')
+
+    def __init__(self, tracer: "Tracer", stage: str):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.stage, self.start, time.perf_counter())
+        return False
+
+
+class _NullSpan:
+    """Span of a disabled tracer."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects spans into a ring buffer and per-stage rolling windows."""
+
+    def __init__(self, enabled: bool = True, capacity: int = 20000, window: int = 1000):
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Record spans; a disabled tracer costs one attribute check
+            capacity: Spans kept for export
+            window: Durations kept per stage for percentiles
+        """
+        self.enabled = enabled
+        self.window = window
+        self.origin = time.perf_counter()
+        # (stage, start, duration, thread id, call id, turn)
+        self._spans: Deque[Tuple] = collections.deque(maxlen=capacity)
+        self._durations: Dict[str, Deque[float]] = {
+            stage: collections.deque(maxlen=window) for stage in STAGES
+        }
+        self._histograms = {stage: STAGE_LATENCY.labels(stage) for stage in STAGES}
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str):
+        """Context manager timing the enclosed block as stage."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def record(self, stage: str, start: float, end: float):
+        """Record a span measured elsewhere, as perf_counter() values."""
+        if not self.enabled:
+            return
+        duration = end - start
+        turn = _current_turn.get()
+        ident = threading.get_ident()
+        if ident not in self._thread_names:
+            self._thread_names[ident] = threading.current_thread().name
+        if turn is None:
+            self._spans.append((stage, start, duration, ident, None, None))
+        else:
+            self._spans.append((stage, start, duration, ident, turn.call_id, turn.turn))
+        durations = self._durations.get(stage)
+        if durations is None:
+            with self._lock:
+                durations = self._durations.setdefault(stage, collections.deque(maxlen=self.window))
+                self._histograms.setdefault(stage, STAGE_LATENCY.labels(stage))
+        durations.append(duration)
+        self._histograms[stage].observe(duration)
+
+    def begin_turn(self, call_id: Any, turn: int) -> TurnTrace:
+        """Attribute spans recorded in the current context to a turn."""
+        trace = TurnTrace(call_id, turn)
+        _current_turn.set(trace)
+        return trace
+
+    def end_of_speech(self, when: Optional[float] = None):
+        """Mark when the customer stopped speaking in the current turn."""
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.end_of_speech = time.perf_counter() if when is None else when
+
+    def first_audio(self, when: Optional[float] = None):
+        """Mark the first reply audio of the current turn and record the turn latency."""
+        turn = _current_turn.get()
+        if turn is None or turn.end_of_speech is None:
+            return
+        now = time.perf_counter() if when is None else when
+        self.record(TURN, turn.end_of_speech, now)
+        # Later utterances of the same turn are not the first audio
+        turn.end_of_speech = None
+
+    def percentiles(self, stage: str) -> Dict[str, float]:
+        """Count and p50/p95/p99/max in milliseconds over the stage's window."""
+        durations = sorted(self._durations.get(stage, ()))
+        if not durations:
+            return {'count': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        last = len(durations) - 1
+
+        def at(pct):
+            return durations[min(last, int(len(durations) * pct / 100))] * 1000
+
+        return {
+            'count': len(durations),
+            'p50_ms': at(50),
+            'p95_ms': at(95),
+            'p99_ms': at(99),
+            'max_ms': durations[last] * 1000
+        }
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles of every stage that has recorded spans."""
+        return {
+            stage: self.percentiles(stage)
+            for stage in list(self._durations) if self._durations[stage]
+        }
+
+    def format_report(self) -> str:
+        """Human-readable per-stage latency table."""
+        lines = [f"{'stage':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for stage, p in self.summary().items():
+            lines.append(f"{stage:<20} {p['count']:>6} {p['p50_ms']:>9.2f} {p['p95_ms']:>9.2f} "
+                         f"{p['p99_ms']:>9.2f} {p['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Buffered spans as a Chrome trace-event document."""
+        events: List[Dict[str, Any]] = []
+        for ident, name in list(self._thread_names.items()):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': ident,
+                           'args': {'name': name}})
+        for stage, start, duration, ident, call_id, turn in list(self._spans):
+            event = {
+                'name': stage,
+                'cat': 'turn',
+                'ph': 'X',
+                'ts': (start - self.origin) * 1e6,
+                'dur': duration * 1e6,
+                'pid': 1,
+                'tid': ident
+            }
+            if call_id is not None:
+                event['args'] = {'call': str(call_id), 'turn': turn}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, filename: str):
+        """Write the buffered spans as Chrome trace-event JSON."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def clear(self):
+        """Drop all recorded spans and durations."""
+        self._spans.clear()
+        for durations in list(self._durations.values()):
+            durations.clear()
+
+
+_tracer = Tracer(ENABLE_TRACING, TRACE_BUFFER_SPANS, TRACE_HISTOGRAM_WINDOW)
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer."""
+    return _tracer
@@ -0,0 +1,166 @@
+"""
+Cross-thread UI update dispatcher for the AI Agent application.
+
+Worker threads never touch Tk directly. They post updates here (or publish
+them on the event bus), and the Tk thread drains them with root.after at a
+fixed rate: status and visualization updates are coalesced so only the
+latest one is drawn, and consecutive history entries are inserted as one
+batch. History entries and posted calls (such as clearing the history) share
+one ordered stream, so a clear never brings back entries queued before it.
+"""
+
+import collections
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from ..config.settings import UI_REFRESH_RATE_HZ
+
+# Marker for history entries in the ordered queue
+_HISTORY = object()
+
+
+class UIDispatcher:
+    """Queues UI updates from any thread and applies them on the Tk thread."""
+
+    def __init__(self, root, refresh_rate: float = UI_REFRESH_RATE_HZ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            root: Tk root used for scheduling
+            refresh_rate: Drains per second
+        """
+        self.root = root
+        self.interval_ms = max(1, int(1000 / refresh_rate))
+        self.ui_thread_id = threading.get_ident()
+
+        # deque append/pop are atomic, so producers never take a lock.
+        # Latest-value slots keep only the newest status and visualization.
+        self._status: collections.deque = collections.deque(maxlen=1)
+        self._visualization: collections.deque = collections.deque(maxlen=1)
+        self._ordered: collections.deque = collections.deque()
+
+        self.status_handler: Optional[Callable[[str], None]] = None
+        self.visualization_handler: Optional[Callable[[list], None]] = None
+        self.history_handler: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+
+        self._subscriptions: list = []
+        # Subscriptions whose handlers post into the ordered stream; moving
+        # their events and appending a call happen under one lock
+        self._ordered_subscriptions: list = []
+        self._order_lock = threading.Lock()
+        self._after_id = None
+        self._running = False
+
+    def is_ui_thread(self) -> bool:
+        """Check whether the caller is the Tk thread."""
+        return threading.get_ident() == self.ui_thread_id
+
+    def post_status(self, message: str):
+        """Queue a status message; older undrawn messages are dropped."""
+        self._status.append(message)
+
+    def post_visualization(self, pitch_data: list):
+        """Queue a visualization frame; older undrawn frames are dropped."""
+        self._visualization.append(pitch_data)
+
+    def post_history(self, entry: Dict[str, Any]):
+        """Queue a history entry for the next batched insert."""
+        self._ordered.append((_HISTORY, entry))
+
+    def post_call(self, fn: Callable, *args):
+        """
+        Queue a call to run on the Tk thread, in order with history entries,
+        including those still waiting in ordered subscriptions.
+        """
+        with self._order_lock:
+            self._collect()
+            self._ordered.append((fn, args))
+
+    def add_subscription(self, subscription, ordered: bool = False):
+        """
+        Drain a MANUAL event bus subscription on every tick.
+
+        Args:
+            subscription: Subscription to drain
+            ordered: The subscription's handler posts history entries here;
+                     its events are moved into the ordered stream before
+                     every post_call() and at the start of every drain
+        """
+        if ordered:
+            self._ordered_subscriptions.append(subscription)
+        else:
+            self._subscriptions.append(subscription)
+
+    def _collect(self):
+        """Move events of ordered subscriptions into the ordered stream."""
+        for subscription in self._ordered_subscriptions:
+            subscription.drain()
+
+    def start(self):
+        """Start draining on the Tk event loop."""
+        if not self._running:
+            self._running = True
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Stop draining."""
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        """Drain pending updates and schedule the next drain."""
+        try:
+            self.drain()
+        finally:
+            if self._running:
+                self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def drain(self):
+        """Apply all pending updates. Must run on the Tk thread."""
+        with self._order_lock:
+            self._collect()
+        ordered = self._ordered
+        batch: List[Dict[str, Any]] = []
+        while True:
+            try:
+                fn, args = ordered.popleft()
+            except IndexError:
+                break
+            if fn is _HISTORY:
+                batch.append(args)
+                continue
+            if batch:
+                self._flush_history(batch)
+                batch = []
+            fn(*args)
+        if batch:
+            self._flush_history(batch)
+
+        for subscription in self._subscriptions:
+            subscription.drain()
+
+        try:
+            message = self._status.pop()
+        except IndexError:
+            pass
+        else:
+            if self.status_handler:
+                self.status_handler(message)
+
+        try:
+            pitch_data = self._visualization.pop()
+        except IndexError:
+            pass
+        else:
+            if self.visualization_handler:
+                self.visualization_handler(pitch_data)
+
+    def _flush_history(self, batch: List[Dict[str, Any]]):
+        """Hand a batch of history entries to the handler."""
+        if self.history_handler:
+            self.history_handler(batch)
@@ -2,16 +2,28 @@
 Main window UI for the AI Agent application.
 """
 
+import collections
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from typing import Optional, Callable
 from ..config.settings import (
-    APP_TITLE, WINDOW_SIZE, BG_COLOR, TITLE_FONT, STATUS_FONT, INPUT_FONT
+    APP_TITLE, WINDOW_SIZE, BG_COLOR, TITLE_FONT, STATUS_FONT, INPUT_FONT,
+    HISTORY_VIEW_MAX_ENTRIES, HISTORY_LOAD_BATCH
 )
+from ..events import (
+    EventBus, StatusEvent, HistoryEvent, VoiceEvent, ConversationStateEvent,
+    COALESCE, DROP_OLDEST, MANUAL
+)
+from .dispatcher import UIDispatcher
 
 
 class MainWindow:
-    """Main application window with all UI components."""
+    """
+    Main application window with all UI components.
+    
+    Public update methods may be called from any thread; they are queued on
+    a UIDispatcher and applied on the Tk thread.
+    """
     
     def __init__(self):
         """Initialize the main window."""
@@ -27,9 +39,21 @@ class MainWindow:
         self.clear_log_callback: Optional[Callable] = None
         self.init_conversation_callback: Optional[Callable] = None
         self.volume_change_callback: Optional[Callable] = None
+        self.history_loader_callback: Optional[Callable] = None
+        
+        # History widget window: (seq, line count) of each displayed entry
+        self._history_entries: collections.deque = collections.deque()
+        self._history_limit = HISTORY_VIEW_MAX_ENTRIES
         
         self._setup_ui()
         self._configure_styles()
+        
+        # Cross-thread update queue drained on the Tk thread
+        self.dispatcher = UIDispatcher(self.root)
+        self.dispatcher.status_handler = self._apply_status
+        self.dispatcher.history_handler = self._insert_history
+        self.dispatcher.visualization_handler = self._draw_visualization
+        self.dispatcher.start()
     
     def _setup_ui(self):
         """Set up the main UI components."""
@@ -124,6 +148,10 @@ class MainWindow:
         # Pitch visualization canvas
         self.pitch_canvas = tk.Canvas(pitch_frame, width=100, height=150, bg='white')
         self.pitch_canvas.grid(row=0, column=0)
+        
+        # Bars are created once and then moved/recolored in place
+        self._pitch_bars: list = []
+        self._pitch_colors: list = []
     
     def _create_conversation_history(self, parent):
         """Create conversation history components."""
@@ -135,6 +163,11 @@ class MainWindow:
         self.history_text = scrolledtext.ScrolledText(history_frame, height=15, width=60,
                                                      font=INPUT_FONT, wrap=tk.WORD)
         self.history_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # Older entries are dropped from the widget and reloaded on request
+        self.load_older_button = ttk.Button(history_frame, text="過去ログを表示",
+                                           command=self._on_load_older_clicked)
+        self.load_older_button.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
     
     def _create_input_frame(self, parent):
         """Create user input components."""
@@ -180,6 +213,26 @@ class MainWindow:
         if self.init_conversation_callback:
             self.init_conversation_callback()
     
+    def _on_load_older_clicked(self):
+        """Handle load older history button click."""
+        if not self.history_loader_callback or not self._history_entries:
+            return
+        oldest_seq = self._history_entries[0][0]
+        if oldest_seq is None:
+            return
+        
+        entries = self.history_loader_callback(oldest_seq, HISTORY_LOAD_BATCH)
+        if not entries:
+            return
+        
+        # Let the window grow while the user is browsing older entries
+        self._history_limit = min(self._history_limit + len(entries), HISTORY_VIEW_MAX_ENTRIES * 4)
+        text, lines = self._format_history(entries)
+        self.history_text.insert("1.0", text)
+        for seq_lines in reversed(lines):
+            self._history_entries.appendleft(seq_lines)
+        self.history_text.see("1.0")
+    
     def _on_volume_changed(self, value=None):
         """Handle volume slider change."""
         volume = self.volume_var.get()
@@ -212,26 +265,93 @@ class MainWindow:
         """Set callback for volume change."""
         self.volume_change_callback = callback
     
+    def set_history_loader_callback(self, callback: Callable):
+        """Set callback(before_seq, count) returning older history entries."""
+        self.history_loader_callback = callback
+    
+    def attach_event_bus(self, event_bus: EventBus):
+        """Subscribe the window to bus events, drained on the Tk thread."""
+        subscriptions = [
+            event_bus.subscribe(StatusEvent, lambda e: self._apply_status(e.message),
+                                policy=COALESCE, mode=MANUAL),
+            event_bus.subscribe(VoiceEvent, lambda e: self._draw_visualization(e.pitch_data),
+                                policy=COALESCE, mode=MANUAL),
+            event_bus.subscribe(ConversationStateEvent, lambda e: self.set_conversation_state(e.active),
+                                policy=COALESCE, mode=MANUAL),
+        ]
+        for subscription in subscriptions:
+            self.dispatcher.add_subscription(subscription)
+        # History events go into the dispatcher's ordered stream, so they
+        # stay in order with clear_history()
+        history = event_bus.subscribe(HistoryEvent, lambda e: self.dispatcher.post_history(e.entry),
+                                      maxsize=HISTORY_VIEW_MAX_ENTRIES, policy=DROP_OLDEST, mode=MANUAL)
+        self.dispatcher.add_subscription(history, ordered=True)
+    
     def update_status(self, message: str):
-        """Update status label."""
+        """Update status label (thread-safe, coalesced)."""
+        self.dispatcher.post_status(message)
+    
+    def _apply_status(self, message: str):
+        """Set the status label text on the Tk thread."""
         self.status_label.config(text=message)
-        self.root.update_idletasks()
     
     def add_to_history(self, entry: dict):
-        """Add entry to conversation history."""
-        timestamp = entry.get('timestamp', '')
-        speaker = entry.get('speaker', '')
-        message = entry.get('message', '')
+        """Add entry to conversation history (thread-safe, batched)."""
+        self.dispatcher.post_history(entry)
+    
+    @staticmethod
+    def _format_history(entries: list):
+        """Format entries and return (text, [(seq, line count), ...])."""
+        parts = []
+        lines = []
+        for entry in entries:
+            message = entry.get('message', '')
+            parts.append(f"[{entry.get('timestamp', '')}] {entry.get('speaker', '')}: {message}\n\n")
+            lines.append((entry.get('seq'), message.count("\n") + 2))
+        return "".join(parts), lines
+    
+    def _insert_history(self, entries: list):
+        """Insert a batch of history entries with a single widget update."""
+        # Only follow new entries if the user has not scrolled up
+        at_bottom = self.history_text.yview()[1] >= 0.999
+        if at_bottom:
+            self._history_limit = HISTORY_VIEW_MAX_ENTRIES
+        
+        text, lines = self._format_history(entries)
+        self.history_text.insert(tk.END, text)
+        self._history_entries.extend(lines)
+        self._trim_history()
         
-        self.history_text.insert(tk.END, f"[{timestamp}] {speaker}: {message}\n\n")
-        self.history_text.see(tk.END)
+        if at_bottom:
+            self.history_text.see(tk.END)
+    
+    def _trim_history(self):
+        """Drop the oldest entries beyond the window with one delete."""
+        excess = len(self._history_entries) - self._history_limit
+        if excess <= 0:
+            return
+        removed_lines = 0
+        for _ in range(excess):
+            removed_lines += self._history_entries.popleft()[1]
+        self.history_text.delete("1.0", f"{removed_lines + 1}.0")
     
     def clear_history(self):
-        """Clear conversation history display."""
+        """Clear conversation history display, after the entries queued before it (thread-safe)."""
+        self.dispatcher.post_call(self._clear_history_view)
+        if self.dispatcher.is_ui_thread():
+            self.dispatcher.drain()
+    
+    def _clear_history_view(self):
+        """Empty the history widget on the Tk thread."""
         self.history_text.delete(1.0, tk.END)
+        self._history_entries.clear()
+        self._history_limit = HISTORY_VIEW_MAX_ENTRIES
     
     def set_conversation_state(self, is_active: bool):
         """Set conversation state and update button states."""
+        if not self.dispatcher.is_ui_thread():
+            self.dispatcher.post_call(self.set_conversation_state, is_active)
+            return
         if is_active:
             self.start_button.config(state='disabled')
             self.stop_button.config(state='normal')
@@ -240,21 +360,41 @@ class MainWindow:
             self.stop_button.config(state='disabled')
     
     def update_voice_visualization(self, pitch_data: list):
-        """Update voice visualization with pitch data."""
-        self.pitch_canvas.delete("all")
+        """Update voice visualization with pitch data (thread-safe, latest frame wins)."""
+        self.dispatcher.post_visualization(pitch_data)
+    
+    def _draw_visualization(self, pitch_data: list):
+        """Update the retained pitch bars in place on the Tk thread."""
+        canvas = self.pitch_canvas
+        bars = self._pitch_bars
+        colors = self._pitch_colors
+        
+        while len(bars) < len(pitch_data):
+            bars.append(canvas.create_rectangle(0, 150, 0, 150, fill="", outline=""))
+            colors.append("")
         
-        for x, height, color in pitch_data:
-            self.pitch_canvas.create_rectangle(x, 150-height, x+8, 150, 
-                                             fill=color, outline="")
+        for i, (x, height, color) in enumerate(pitch_data):
+            canvas.coords(bars[i], x, 150-height, x+8, 150)
+            if colors[i] != color:
+                canvas.itemconfigure(bars[i], fill=color)
+                colors[i] = color
         
-        self.root.update_idletasks()
+        # Collapse bars not used by this frame
+        for i in range(len(pitch_data), len(bars)):
+            canvas.coords(bars[i], 0, 150, 0, 150)
     
     def show_error(self, title: str, message: str):
         """Show error message dialog."""
+        if not self.dispatcher.is_ui_thread():
+            self.dispatcher.post_call(self.show_error, title, message)
+            return
         messagebox.showerror(title, message)
     
     def show_info(self, title: str, message: str):
         """Show info message dialog."""
+        if not self.dispatcher.is_ui_thread():
+            self.dispatcher.post_call(self.show_info, title, message)
+            return
         messagebox.showinfo(title, message)
     
     def run(self):
@@ -263,4 +403,5 @@ class MainWindow:
     
     def destroy(self):
         """Destroy the window."""
+        self.dispatcher.stop()
         self.root.destroy()
@@ -0,0 +1,237 @@
+"""
+Shared worker pools for the AI Agent application.
+
+Background work runs on a few bounded pools instead of a new thread per
+task: an I/O pool for blocking audio, network and file work (including
+exports), a CPU pool for synthesis and pause analysis, and a turn pool
+draining the conversations' turn executors. Threads are named after their
+pool. A pool admits at most max_workers running plus queue_limit waiting
+tasks; when it is saturated submit() blocks the submitter (backpressure)
+and raises PoolSaturatedError if no slot frees up within submit_timeout.
+Queue depth, running tasks, saturation and rejections are exported as
+metrics.
+
+Pool threads are not daemon threads: long-running tasks such as continuous
+listening must also watch their pool's stop_event, which shutdown() sets and
+which is set for every pool at interpreter exit before the pool threads are
+joined.
+"""
+
+import concurrent.futures
+import threading
+from typing import Any, Callable, Dict, Optional
+from .config.settings import (
+    IO_POOL_WORKERS, CPU_POOL_WORKERS, TURN_POOL_WORKERS, WORKER_QUEUE_LIMIT, WORKER_SUBMIT_TIMEOUT
+)
+from .metrics import QUEUE_DEPTH, POOL_ACTIVE, POOL_SATURATION, POOL_REJECTED
+
+# Shared pools
+IO = "io"
+CPU = "cpu"
+TURN = "turn"
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a task cannot be queued because its pool stays full."""
+
+
+class WorkerPool(concurrent.futures.ThreadPoolExecutor):
+    """Thread pool with a bounded queue, named threads and metrics."""
+
+    def __init__(self, name: str, max_workers: Optional[int] = None,
+                 queue_limit: Optional[int] = WORKER_QUEUE_LIMIT,
+                 submit_timeout: Optional[float] = WORKER_SUBMIT_TIMEOUT):
+        """
+        Initialize the pool.
+
+        Args:
+            name: Pool name, used for thread names and metric labels
+            max_workers: Threads; the ThreadPoolExecutor default if None
+            queue_limit: Tasks allowed to wait for a thread; unbounded if None
+            submit_timeout: Seconds submit() waits on a saturated pool;
+                            forever if None
+        """
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self.name = name
+        self.submit_timeout = submit_timeout
+        self.capacity: Optional[int] = None if queue_limit is None else self._max_workers + queue_limit
+        self._slots = threading.BoundedSemaphore(self.capacity) if self.capacity else None
+        self._active = 0
+        self._active_lock = threading.Lock()
+        self.rejected = 0
+        self._rejected_counter = POOL_REJECTED.labels(name)
+        # Set when the pool shuts down; long-running tasks stop on it
+        self.stop_event = threading.Event()
+
+        QUEUE_DEPTH.labels(name).set_function(self.pending)
+        POOL_ACTIVE.labels(name).set_function(self.active)
+        POOL_SATURATION.labels(name).set_function(self.saturation)
+
+    @property
+    def max_workers(self) -> int:
+        """Number of threads."""
+        return self._max_workers
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> concurrent.futures.Future:
+        """
+        Schedule fn(*args, **kwargs), waiting while the pool is saturated.
+
+        Raises:
+            PoolSaturatedError: No slot freed up within submit_timeout
+        """
+        return self._submit(fn, args, kwargs, True)
+
+    def try_submit(self, fn: Callable, /, *args, **kwargs) -> Optional[concurrent.futures.Future]:
+        """Schedule fn(*args, **kwargs) if the pool has room, otherwise return None."""
+        try:
+            return self._submit(fn, args, kwargs, False)
+        except PoolSaturatedError:
+            return None
+
+    def _submit(self, fn: Callable, args: tuple, kwargs: Dict[str, Any],
+                wait: bool) -> concurrent.futures.Future:
+        """Take a slot and queue the task; the slot is returned when it is done."""
+        slots = self._slots
+        if slots is not None:
+            acquired = slots.acquire(True, self.submit_timeout) if wait else slots.acquire(False)
+            if not acquired:
+                self.rejected += 1
+                self._rejected_counter.inc()
+                raise PoolSaturatedError(f"worker pool '{self.name}' is saturated "
+                                         f"({self.capacity} tasks running or queued)")
+        try:
+            future = super().submit(self._run, fn, args, kwargs)
+        except BaseException:
+            if slots is not None:
+                slots.release()
+            raise
+        if slots is not None:
+            future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _run(self, fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Run a task, counting it as active."""
+        with self._active_lock:
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._active_lock:
+                self._active -= 1
+
+    def pending(self) -> int:
+        """Tasks waiting for a thread."""
+        return self._work_queue.qsize()
+
+    def active(self) -> int:
+        """Tasks running."""
+        return self._active
+
+    def saturation(self) -> float:
+        """Share of thread and queue slots in use (threads only if the queue is unbounded)."""
+        if self.capacity:
+            return min(1.0, (self._active + self.pending()) / self.capacity)
+        return self._active / self._max_workers
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """Set stop_event, then shut down the pool."""
+        self.stop_event.set()
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current pool figures."""
+        return {
+            'workers': self._max_workers,
+            'active': self.active(),
+            'pending': self.pending(),
+            'saturation': self.saturation(),
+            'rejected': self.rejected
+        }
+
+
+_config: Dict[str, Dict[str, Any]] = {
+    IO: {'max_workers': IO_POOL_WORKERS},
+    CPU: {'max_workers': CPU_POOL_WORKERS},
+    # A turn executor queues at most one drain task, so the queue is bounded
+    # by the number of conversations and never needs backpressure
+    TURN: {'max_workers': TURN_POOL_WORKERS, 'queue_limit': None}
+}
+_pools: Dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def configure_pools(io_workers: Optional[int] = None, cpu_workers: Optional[int] = None,
+                    turn_workers: Optional[int] = None,
+                    queue_limit: Optional[int] = WORKER_QUEUE_LIMIT,
+                    submit_timeout: Optional[float] = WORKER_SUBMIT_TIMEOUT):
+    """
+    Size the shared pools. Only affects pools that have not been used yet.
+
+    Args:
+        io_workers: Threads of the I/O pool (IO_POOL_WORKERS if None)
+        cpu_workers: Threads of the CPU pool (CPU_POOL_WORKERS if None)
+        turn_workers: Threads of the turn pool (TURN_POOL_WORKERS if None)
+        queue_limit: Waiting tasks per I/O and CPU pool before submitters block
+        submit_timeout: Seconds a submitter waits on a saturated pool
+    """
+    with _pools_lock:
+        for name, workers in ((IO, io_workers), (CPU, cpu_workers)):
+            _config[name] = {
+                'max_workers': workers or _config[name]['max_workers'],
+                'queue_limit': queue_limit,
+                'submit_timeout': submit_timeout
+            }
+        if turn_workers:
+            _config[TURN] = dict(_config[TURN], max_workers=turn_workers)
+
+
+def get_pool(name: str) -> WorkerPool:
+    """Shared pool by name, created on first use."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = WorkerPool(name, **_config.get(name, {}))
+                _pools[name] = pool
+    return pool
+
+
+def get_io_pool() -> WorkerPool:
+    """Pool for blocking audio, network and file work."""
+    return get_pool(IO)
+
+
+def get_cpu_pool() -> WorkerPool:
+    """Pool for synthesis and pause analysis."""
+    return get_pool(CPU)
+
+
+def get_turn_pool() -> WorkerPool:
+    """Pool draining the conversations' turn executors."""
+    return get_pool(TURN)
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Figures of every shared pool created so far."""
+    return {name: pool.stats() for name, pool in list(_pools.items())}
+
+
+def shutdown_pools(wait: bool = True):
+    """Shut down the shared pools; queued tasks that have not started are cancelled."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _stop_pools_at_exit():
+    """Set every pool's stop_event before concurrent.futures joins the pool threads."""
+    for pool in list(_pools.values()):
+        pool.stop_event.set()
+
+
+# Runs before the join registered when concurrent.futures was imported above
+if hasattr(threading, '_register_atexit'):
+    threading._register_atexit(_stop_pools_at_exit)
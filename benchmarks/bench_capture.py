@@ -0,0 +1,175 @@
+"""
+Benchmark of in-process audio capture against a capture process feeding a shared-memory ring.
+
+Both paths capture the same paced test signal (a sound card that buffers
+CAPTURE_DEVICE_CHUNKS chunks and loses audio a late reader has not picked
+up) while a DSP consumer computes the RMS of every chunk and, every
+--block-every chunks, runs a C call that holds the GIL for --block-ms (like a
+large NumPy preprocessing step); --threads busy threads stand in for other
+calls. In-process capture is a thread handing chunks over a queue; the
+shared-memory path is CaptureProcess and a RingReader reading the chunks in
+place. Reports chunks lost at the device, chunks dropped by the full queue
+or ring, and capture-to-consumer latency.
+
+Usage:
+    python benchmarks/bench_capture.py [--seconds 10] [--block-ms 500] [--block-every 16] [--threads 2]
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_agent.audio.shared_capture import (
+    CaptureProcess, PacedCapture, POLL_INTERVAL, rms, synthetic_chunk
+)
+from ai_agent.config.settings import (
+    CAPTURE_SAMPLE_RATE, CAPTURE_CHUNK_FRAMES, CAPTURE_RING_SECONDS, CAPTURE_DEVICE_CHUNKS
+)
+
+
+def calibrate_block(ms: float) -> int:
+    """Length of a range whose sum() holds the GIL for about ms milliseconds."""
+    n = 100000
+    while True:
+        started = time.perf_counter()
+        sum(range(n))
+        elapsed = time.perf_counter() - started
+        if elapsed > 0.02:
+            return max(1, int(n * ms / 1000 / elapsed))
+        n *= 4
+
+
+class Load:
+    """DSP work per chunk plus busy threads competing for the GIL."""
+
+    def __init__(self, block_n: int, block_every: int, threads: int):
+        self.block_n = block_n
+        self.block_every = block_every
+        self.threads = threads
+        self.chunks = 0
+        self._stop = threading.Event()
+        self._busy = []
+
+    def start(self):
+        for _ in range(self.threads):
+            thread = threading.Thread(target=self._spin, daemon=True)
+            thread.start()
+            self._busy.append(thread)
+
+    def _spin(self):
+        x = 0
+        while not self._stop.is_set():
+            for i in range(1000):
+                x += i * i
+
+    def process(self, pcm):
+        rms(pcm)
+        self.chunks += 1
+        if self.block_n and self.block_every and self.chunks % self.block_every == 0:
+            # A C call without a GIL release, like a big array operation
+            sum(range(self.block_n))
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._busy:
+            thread.join()
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000 if values else 0.0
+
+
+def run_in_process(seconds: float, load: Load, ring_chunks: int):
+    """Capture thread and consumer in this process, connected by a bounded queue."""
+    chunks = queue.Queue(maxsize=ring_chunks)
+    stop = threading.Event()
+    counts = {'device': 0, 'dropped': 0, 'written': 0}
+
+    def capture():
+        clock = PacedCapture(CAPTURE_SAMPLE_RATE, CAPTURE_CHUNK_FRAMES, CAPTURE_DEVICE_CHUNKS)
+        while not stop.is_set():
+            lost, index = clock.wait()
+            counts['device'] += lost
+            try:
+                chunks.put_nowait((time.perf_counter(), synthetic_chunk(
+                    index, CAPTURE_CHUNK_FRAMES, CAPTURE_SAMPLE_RATE)))
+                counts['written'] += 1
+            except queue.Full:
+                counts['dropped'] += 1
+
+    thread = threading.Thread(target=capture, name="capture", daemon=True)
+    latencies = []
+    load.start()
+    thread.start()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            captured, pcm = chunks.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        latencies.append(time.perf_counter() - captured)
+        load.process(memoryview(pcm))
+    stop.set()
+    thread.join()
+    load.stop()
+    return counts['written'], counts['device'], counts['dropped'], latencies
+
+
+def run_shared_memory(seconds: float, load: Load):
+    """Capture process writing to a shared-memory ring, read here in place."""
+    capture = CaptureProcess(synthetic=True).start()
+    reader = capture.ring.reader()
+    latencies = []
+    load.start()
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            chunk = reader.peek()
+            if chunk is None:
+                time.sleep(POLL_INTERVAL)
+                continue
+            captured, pcm = chunk
+            latencies.append(time.perf_counter() - captured)
+            load.process(pcm)
+            pcm.release()
+            reader.advance()
+        stats = capture.ring.stats()
+    finally:
+        load.stop()
+        reader.close()
+        capture.stop()
+    return stats['chunks'], stats['device_overruns'], stats['overruns'], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0, help='capture time per path')
+    parser.add_argument('--block-ms', type=float, default=500.0,
+                        help='GIL-holding DSP step length (0 = none)')
+    parser.add_argument('--block-every', type=int, default=16, help='chunks between DSP steps')
+    parser.add_argument('--threads', type=int, default=2, help='busy threads standing in for other calls')
+    args = parser.parse_args()
+
+    block_n = calibrate_block(args.block_ms) if args.block_ms > 0 else 0
+    ring_chunks = int(CAPTURE_RING_SECONDS * CAPTURE_SAMPLE_RATE / CAPTURE_CHUNK_FRAMES)
+    chunk_ms = CAPTURE_CHUNK_FRAMES / CAPTURE_SAMPLE_RATE * 1000
+    print(f"{args.seconds:.0f} s per path, {chunk_ms:.0f} ms chunks, device buffer "
+          f"{CAPTURE_DEVICE_CHUNKS} chunks, {args.block_ms:.0f} ms GIL hold every "
+          f"{args.block_every} chunks, {args.threads} busy threads, {os.cpu_count()} CPUs")
+    print(f"{'path':<14} {'chunks':>7} {'device lost':>12} {'dropped':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, run in (("in-process", lambda load: run_in_process(args.seconds, load, ring_chunks)),
+                      ("shared-memory", lambda load: run_shared_memory(args.seconds, load))):
+        written, lost, dropped, latencies = run(Load(block_n, args.block_every, args.threads))
+        print(f"{name:<14} {written:>7} {lost:>12} {dropped:>8} {pct(latencies, 50):>8.2f} "
+              f"{pct(latencies, 95):>8.2f} {max(latencies, default=0) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
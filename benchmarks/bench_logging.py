@@ -0,0 +1,134 @@
+"""
+Benchmark for production logging.
+
+Several threads log as the audio and conversation threads do, once through
+synchronous file and console handlers and once through the queue used in
+production mode. Reports the time each log call costs the calling thread
+and the time until every record is on disk. --slow-ms adds a delay to every
+write, imitating a busy disk or a blocked console.
+
+Usage:
+    python benchmarks/bench_logging.py [--threads 4] [--records 5000] [--slow-ms 0]
+"""
+
+import argparse
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_agent.logging_setup import setup_queue_logging, stop_queue_logging
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class SlowHandler(logging.Handler):
+    """Wraps a handler and delays every write."""
+
+    def __init__(self, handler: logging.Handler, delay: float):
+        super().__init__()
+        self.handler = handler
+        self.delay = delay
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.handler.emit(record)
+
+    def close(self):
+        self.handler.close()
+        super().close()
+
+
+def emit_records(threads: int, records: int):
+    """Log from several threads; returns per-call latencies in microseconds."""
+    latencies = [[] for _ in range(threads)]
+
+    def worker(index):
+        logger = logging.getLogger(f"bench.worker{index}")
+        out = latencies[index]
+        for i in range(records):
+            started = time.perf_counter()
+            logger.info("turn %d: 音声認識完了 (%s)", i, "はい、興味があります")
+            out.append((time.perf_counter() - started) * 1e6)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sorted(x for per_thread in latencies for x in per_thread)
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run_sync(log_file: str, threads: int, records: int, slow: float):
+    """FileHandler + StreamHandler called on the logging thread."""
+    reset_root()
+    console = logging.StreamHandler(open(os.devnull, 'w'))
+    handlers = [logging.FileHandler(log_file, encoding='utf-8'), console]
+    if slow:
+        handlers = [SlowHandler(h, slow) for h in handlers]
+    logging.basicConfig(level=logging.INFO, format=FORMAT, handlers=handlers)
+    started = time.perf_counter()
+    latencies = emit_records(threads, records)
+    total = time.perf_counter() - started
+    reset_root()
+    return latencies, total
+
+
+def run_queue(log_file: str, threads: int, records: int, slow: float):
+    """Production queue logging; total includes draining the queue."""
+    reset_root()
+    listener = setup_queue_logging(log_file, max_bytes=1 << 30, console=True)
+    # Send the console copy to /dev/null like the synchronous run
+    listener.handlers[1].setStream(open(os.devnull, 'w'))
+    if slow:
+        listener.handlers = tuple(SlowHandler(h, slow) for h in listener.handlers)
+    started = time.perf_counter()
+    latencies = emit_records(threads, records)
+    enqueued = time.perf_counter() - started
+    stop_queue_logging(listener)
+    total = time.perf_counter() - started
+    reset_root()
+    return latencies, total, enqueued
+
+
+def pct(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--records', type=int, default=5000, help="records per thread")
+    parser.add_argument('--slow-ms', type=float, default=0.0,
+                        help="extra delay per write in milliseconds")
+    args = parser.parse_args()
+    slow = args.slow_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_lat, sync_total = run_sync(os.path.join(tmp, "sync.log"), args.threads, args.records, slow)
+        queue_lat, queue_total, enqueued = run_queue(
+            os.path.join(tmp, "queue.log"), args.threads, args.records, slow
+        )
+
+    print(f"{args.threads} threads x {args.records} records, slow write {args.slow_ms} ms")
+    print(f"{'mode':<8} {'p50 us':>9} {'p99 us':>9} {'max us':>10} {'callers s':>10} {'flushed s':>10}")
+    print(f"{'sync':<8} {pct(sync_lat, 50):>9.1f} {pct(sync_lat, 99):>9.1f} "
+          f"{sync_lat[-1]:>10.1f} {sync_total:>10.3f} {sync_total:>10.3f}")
+    print(f"{'queue':<8} {pct(queue_lat, 50):>9.1f} {pct(queue_lat, 99):>9.1f} "
+          f"{queue_lat[-1]:>10.1f} {enqueued:>10.3f} {queue_total:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
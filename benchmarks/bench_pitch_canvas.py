@@ -0,0 +1,81 @@
+"""
+Benchmark for the pitch visualization canvas.
+
+Compares the previous delete-and-recreate drawing with the retained-mode bars
+used by MainWindow and reports per-frame cost and the frame rate each could
+sustain. Needs a display (use xvfb-run on headless machines).
+
+Usage:
+    python benchmarks/bench_pitch_canvas.py [--frames 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk
+
+
+def make_frames(count: int, bars: int = 10):
+    """Pre-generate random pitch frames in the TTSEngine format."""
+    frames = []
+    for _ in range(count):
+        frames.append([
+            (i * 10, random.randint(20, 120),
+             f"#{random.randint(100, 255):02x}{random.randint(100, 255):02x}{random.randint(100, 255):02x}")
+            for i in range(bars)
+        ])
+    return frames
+
+
+def draw_recreate(canvas, pitch_data):
+    """Drawing as done before retained mode."""
+    canvas.delete("all")
+    for x, height, color in pitch_data:
+        canvas.create_rectangle(x, 150-height, x+8, 150, fill=color, outline="")
+
+
+def run(root, draw, frames):
+    """Draw all frames and return seconds per frame including redraw."""
+    started = time.perf_counter()
+    for pitch_data in frames:
+        draw(pitch_data)
+        root.update_idletasks()
+    return (time.perf_counter() - started) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=2000, help='frames to draw per mode')
+    args = parser.parse_args()
+
+    try:
+        from ai_agent.ui.main_window import MainWindow
+        window = MainWindow()
+    except tk.TclError as e:
+        print(f"No display available ({e}); run under xvfb-run.")
+        return 1
+
+    window.dispatcher.stop()
+    frames = make_frames(args.frames)
+
+    results = {
+        'recreate': run(window.root, lambda d: draw_recreate(window.pitch_canvas, d), frames),
+    }
+    window.pitch_canvas.delete("all")
+    results['retained'] = run(window.root, window._draw_visualization, frames)
+    window.destroy()
+
+    print(f"{'mode':>10} {'us/frame':>10} {'max fps':>10} {'30Hz budget':>12}")
+    for mode, per_frame in results.items():
+        print(f"{mode:>10} {per_frame * 1e6:>10.1f} {1 / per_frame:>10.0f} "
+              f"{per_frame / (1 / 30):>11.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark for the multi-session conversation engine.
+
+Creates a growing number of concurrent sessions on one shared script, runs a
+few turns in each and reports the memory held per session and turns/sec.
+
+Usage:
+    python benchmarks/bench_sessions.py [--counts 1000,10000,50000] [--turns 8]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_agent.conversation.engine import ConversationEngine
+
+CUSTOMER_TURNS = [
+    "はい、どうぞ",
+    "今ちょっと忙しいんですが",
+    "値段はいくらですか",
+    "お米の味はどうですか",
+    "サンプルに興味があります",
+    "そうですか",
+]
+
+
+def run(count: int, turns: int, record_history: bool):
+    """Run count sessions with turns customer messages each."""
+    gc.collect()
+    tracemalloc.start()
+    engine = ConversationEngine(record_history=record_history)
+    base, _ = tracemalloc.get_traced_memory()
+
+    sessions = [engine.create_session() for _ in range(count)]
+    for session in sessions:
+        engine.start_session(session)
+
+    started = time.perf_counter()
+    for turn in range(turns):
+        text = CUSTOMER_TURNS[turn % len(CUSTOMER_TURNS)]
+        for session in sessions:
+            engine.process(session, text)
+    elapsed = time.perf_counter() - started
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_session = (current - base) / count
+    turns_per_sec = count * turns / elapsed if elapsed else float('inf')
+    return per_session, (peak - base) / 1024 / 1024, turns_per_sec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', default='1000,5000,10000,50000',
+                        help='comma-separated session counts')
+    parser.add_argument('--turns', type=int, default=8, help='customer turns per session')
+    parser.add_argument('--no-history', action='store_true',
+                        help='do not record per-session history')
+    args = parser.parse_args()
+
+    print(f"{'sessions':>10} {'bytes/session':>14} {'peak MiB':>10} {'turns/sec':>12}")
+    for count in (int(c) for c in args.counts.split(',')):
+        per_session, peak_mib, tps = run(count, args.turns, not args.no_history)
+        print(f"{count:>10} {per_session:>14.0f} {peak_mib:>10.1f} {tps:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Cold start benchmark: headless mode versus GUI mode, plus startup regression.
+
+Each sample runs in a fresh interpreter, imports the application and builds
+its front end (HeadlessSink or MainWindow), and reports the wall time from
+interpreter start. Speech devices are not opened, so the numbers compare
+the import and front-end costs that differ between the two modes.
+
+With --profile, `main.py --profile-startup` is run instead and the median of
+every phase is reported; --save-baseline/--baseline store and compare the
+total so startup regressions can be tracked.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+    python benchmarks/bench_startup.py --profile [--headless] [--baseline startup.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+if {headless!r}:
+    from ai_agent.headless import HeadlessSink
+    ui = HeadlessSink()
+else:
+    from ai_agent.ui.main_window import MainWindow
+    ui = MainWindow()
+    ui.root.update_idletasks()
+elapsed = time.perf_counter() - started
+print(json.dumps({{'elapsed': elapsed, 'tkinter': 'tkinter' in sys.modules}}))
+"""
+
+
+def sample(headless: bool):
+    """Run one fresh-interpreter startup and return its measurements."""
+    started = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(root=ROOT, headless=headless)],
+        capture_output=True, text=True, cwd=ROOT
+    )
+    if started.returncode != 0:
+        error = started.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else "startup failed")
+    return json.loads(started.stdout.strip().splitlines()[-1])
+
+
+def profile_sample(headless: bool):
+    """Run main.py --profile-startup once and return its report."""
+    command = [sys.executable, os.path.join(ROOT, "main.py"), "--profile-startup",
+               "--profile-format", "json"]
+    if headless:
+        command.append("--headless")
+    finished = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    start = finished.stdout.find("{")
+    if start < 0:
+        raise RuntimeError(finished.stderr.strip() or "no profile output")
+    return json.loads(finished.stdout[start:])
+
+
+def run_profile(args) -> int:
+    """Report median phase times and compare the total with a baseline."""
+    reports = [profile_sample(args.headless) for _ in range(args.runs)]
+
+    durations = {}
+    for report in reports:
+        for phase in report['phases']:
+            durations.setdefault(phase['name'], []).append(phase['duration_ms'])
+    total = statistics.median(r['total_ms'] for r in reports)
+
+    print(f"{'phase':<34} {'median ms':>10}")
+    for name, values in durations.items():
+        print(f"{name:<34} {statistics.median(values):>10.1f}")
+    print(f"{'total':<34} {total:>10.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'total_ms': total, 'headless': args.headless}, f, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['total_ms']
+        change = (total - baseline) / baseline if baseline else 0.0
+        print(f"baseline {baseline:.1f} ms, change {change:+.1%}")
+        if change > args.threshold:
+            print("REGRESSION: startup is slower than the baseline allows")
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per mode')
+    parser.add_argument('--profile', action='store_true',
+                        help='report per-phase times from main.py --profile-startup')
+    parser.add_argument('--headless', action='store_true', help='profile headless mode')
+    parser.add_argument('--baseline', help='baseline JSON to compare the total with')
+    parser.add_argument('--save-baseline', help='write the measured total to this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown against the baseline (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    if args.profile:
+        return run_profile(args)
+
+    print(f"{'mode':>10} {'median ms':>10} {'min ms':>8} {'tkinter':>8}")
+    for mode, headless in (('headless', True), ('gui', False)):
+        try:
+            samples = [sample(headless) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{mode:>10} unavailable: {e}")
+            continue
+        times = [s['elapsed'] * 1000 for s in samples]
+        print(f"{mode:>10} {statistics.median(times):>10.1f} {min(times):>8.1f} "
+              f"{str(samples[0]['tkinter']):>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Microbenchmarks for audio frame processing: loading WAV clips, reading them
+in playback-sized chunks, and one recognition turn through SourceRecognizer
+with the transcript backend. Run with benchmarks/microbench.py.
+"""
+
+import math
+import os
+import struct
+import tempfile
+import wave
+
+from microbench import parametrize, SkipBenchmark
+
+from ai_agent.audio.sources import AudioClip, ScriptedSource
+from ai_agent.speech.backends import TranscriptBackend
+from ai_agent.speech.source_recognizer import SourceRecognizer
+
+CLIP_SECONDS = (1, 5, 20)
+SAMPLE_RATE = 16000
+CHUNK_FRAMES = 1024  # as in TTSEngine.play_audio_file
+
+
+class _LoopingSource(ScriptedSource):
+    """Scripted source that starts over instead of running out."""
+
+    def read_utterance(self, timeout=None, phrase_time_limit=None):
+        if self._position >= len(self._clips):
+            self._position = 0
+        return super().read_utterance(timeout, phrase_time_limit)
+
+
+def write_tone(seconds: int) -> str:
+    """Write a 440 Hz mono 16-bit WAV file and return its path."""
+    fd, filename = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    frames = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE)))
+        for i in range(SAMPLE_RATE)
+    )
+    with wave.open(filename, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for _ in range(seconds):
+            wav.writeframes(frames)
+    return filename
+
+
+@parametrize("seconds", CLIP_SECONDS)
+def bench_load_wav_clip(benchmark, seconds):
+    filename = write_tone(seconds)
+    try:
+        benchmark(AudioClip.from_wav, filename, "")
+    finally:
+        os.remove(filename)
+
+
+@parametrize("seconds", CLIP_SECONDS)
+def bench_read_playback_chunks(benchmark, seconds):
+    filename = write_tone(seconds)
+
+    def read_chunks():
+        with wave.open(filename, 'rb') as wav:
+            chunks = 0
+            chunk = wav.readframes(CHUNK_FRAMES)
+            while chunk:
+                chunks += 1
+                chunk = wav.readframes(CHUNK_FRAMES)
+            return chunks
+
+    try:
+        benchmark(read_chunks)
+    finally:
+        os.remove(filename)
+
+
+def bench_recognize_turn(benchmark):
+    clips = [AudioClip.from_text(text) for text in ("値段はいくらですか", "興味があります")]
+    recognizer = SourceRecognizer(_LoopingSource(clips), TranscriptBackend())
+    benchmark(recognizer.listen_for_speech)
+    recognizer.close()
+
+
+def bench_voice_animation_frame(benchmark):
+    try:
+        from ai_agent.speech.tts_engine import TTSEngine
+    except ImportError as e:
+        raise SkipBenchmark(f"TTS engine unavailable: {e}")
+    # Only the frame generation is timed; the speech engine is not started
+    engine = TTSEngine.__new__(TTSEngine)
+    engine.event_bus = None
+    engine.voice_callback = lambda pitch_data: None
+    benchmark(engine._animate_voice)
@@ -0,0 +1,111 @@
+"""
+Microbenchmarks for ConversationManager: categorization and response
+generation across keyword dictionary sizes, and history append and export
+across history sizes. Run with benchmarks/microbench.py.
+"""
+
+import os
+import random
+import tempfile
+
+from microbench import parametrize
+
+from ai_agent.config.settings import PREDEFINED_QUESTIONS, RESPONSE_TEMPLATES, KEYWORD_MAPPINGS
+from ai_agent.conversation.conversation_manager import ConversationManager
+from ai_agent.conversation.engine import ConversationEngine, ConversationScript, BOT_SPEAKER, USER_SPEAKER
+
+DICTIONARY_SIZES = (20, 200, 2000)  # total keywords
+HISTORY_SIZES = (100, 1000, 10000)  # entries
+
+_UTTERANCES = (
+    "今ちょっと忙しいので手短にお願いします",
+    "値段はいくらですか",
+    "お米の味はどうですか",
+    "そうですね、考えておきます",
+    "サンプルを送ってもらえますか"
+)
+
+
+def scaled_keywords(total: int):
+    """Keyword mappings padded with synthetic keywords to about total entries."""
+    mappings = {category: list(keywords) for category, keywords in KEYWORD_MAPPINGS.items()}
+    categories = list(mappings)
+    existing = sum(len(keywords) for keywords in mappings.values())
+    for i in range(max(0, total - existing)):
+        mappings[categories[i % len(categories)]].append(f"キーワード{i:05d}")
+    return mappings
+
+
+def make_manager(keywords: int = 0) -> ConversationManager:
+    """Manager over a private engine, with a started session."""
+    script = ConversationScript(PREDEFINED_QUESTIONS, RESPONSE_TEMPLATES,
+                                scaled_keywords(keywords) if keywords else KEYWORD_MAPPINGS)
+    manager = ConversationManager(ConversationEngine(script, record_history=False))
+    manager.engine.start_session(manager.session)
+    return manager
+
+
+def fill_history(manager: ConversationManager, entries: int):
+    """Append entries directly, bypassing the executor."""
+    for i in range(entries):
+        speaker = USER_SPEAKER if i % 2 else BOT_SPEAKER
+        manager._add_to_history(speaker, _UTTERANCES[i % len(_UTTERANCES)])
+
+
+@parametrize("keywords", DICTIONARY_SIZES)
+def bench_categorize_response(benchmark, keywords):
+    manager = make_manager(keywords)
+    utterances = iter(_UTTERANCES * 1000)
+
+    def categorize():
+        nonlocal utterances
+        try:
+            return manager._categorize_response(next(utterances))
+        except StopIteration:
+            utterances = iter(_UTTERANCES * 1000)
+            return manager._categorize_response(next(utterances))
+
+    benchmark(categorize)
+    manager.close()
+
+
+@parametrize("keywords", DICTIONARY_SIZES)
+def bench_generate_response(benchmark, keywords):
+    manager = make_manager(keywords)
+    rng = random.Random(0)
+
+    def generate():
+        return manager._generate_response(rng.choice(_UTTERANCES))
+
+    benchmark(generate)
+    manager.close()
+
+
+@parametrize("entries", HISTORY_SIZES)
+def bench_add_to_history(benchmark, entries):
+    manager = make_manager()
+    fill_history(manager, entries)
+    benchmark(manager._add_to_history, USER_SPEAKER, _UTTERANCES[0])
+    manager.close()
+
+
+@parametrize("entries", HISTORY_SIZES)
+def bench_export_text(benchmark, entries):
+    _bench_export(benchmark, entries, 'text')
+
+
+@parametrize("entries", HISTORY_SIZES)
+def bench_export_jsonl(benchmark, entries):
+    _bench_export(benchmark, entries, 'jsonl')
+
+
+def _bench_export(benchmark, entries, export_format):
+    manager = make_manager()
+    fill_history(manager, entries)
+    fd, filename = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        benchmark(manager.export_conversation, filename, export_format)
+    finally:
+        os.remove(filename)
+        manager.close()
@@ -0,0 +1,155 @@
+"""
+Microbenchmarks for MainWindow updates: add_to_history and
+update_voice_visualization followed by the dispatcher drain that applies
+them on the Tk thread. Uses the real Tk window when a display is available
+(e.g. under xvfb-run) and otherwise a window whose Tk root and widgets are
+replaced by lightweight fakes, which measures the Python side of an update.
+Run with benchmarks/microbench.py.
+"""
+
+import random
+import tkinter as tk
+from unittest import mock
+
+from microbench import parametrize
+
+from ai_agent.ui import main_window
+from ai_agent.ui.main_window import MainWindow
+
+HISTORY_BATCHES = (1, 10, 50)  # entries posted per drain
+
+
+class FakeRoot:
+    """Tk root stand-in; after() callbacks are never run, drains are explicit."""
+
+    def title(self, *args): pass
+    def geometry(self, *args): pass
+    def configure(self, **kwargs): pass
+    def after(self, delay, callback): return None
+    def after_cancel(self, after_id): pass
+    def mainloop(self): pass
+    def destroy(self): pass
+
+
+class FakeText:
+    """ScrolledText stand-in keeping the text as a list of lines."""
+
+    def __init__(self):
+        self.lines = [""]
+
+    def yview(self):
+        return (0.0, 1.0)
+
+    def insert(self, index, text):
+        parts = text.split("\n")
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+
+    def delete(self, start, end=None):
+        if end == tk.END or end is None:
+            self.lines = [""]
+        else:
+            del self.lines[:int(float(end)) - 1]
+
+    def see(self, index):
+        pass
+
+
+class FakeCanvas:
+    """Canvas stand-in storing item coordinates and options."""
+
+    def __init__(self):
+        self.items = {}
+
+    def create_rectangle(self, *coords, **options):
+        item = len(self.items) + 1
+        self.items[item] = [coords, options]
+        return item
+
+    def coords(self, item, *coords):
+        self.items[item][0] = coords
+
+    def itemconfigure(self, item, **options):
+        self.items[item][1].update(options)
+
+
+class FakeLabel:
+    """Label stand-in."""
+
+    def config(self, **options):
+        self.options = options
+
+
+class HeadlessMainWindow(MainWindow):
+    """MainWindow whose widgets are fakes, for machines without a display."""
+
+    def __init__(self):
+        with mock.patch.object(main_window.tk, 'Tk', FakeRoot):
+            super().__init__()
+
+    def _setup_ui(self):
+        self.history_text = FakeText()
+        self.pitch_canvas = FakeCanvas()
+        self.status_label = FakeLabel()
+        self._pitch_bars = []
+        self._pitch_colors = []
+
+    def _configure_styles(self):
+        pass
+
+
+def make_window() -> MainWindow:
+    """Real window if Tk can open a display, otherwise the headless one."""
+    try:
+        return MainWindow()
+    except tk.TclError:
+        return HeadlessMainWindow()
+
+
+def make_entries(count: int):
+    return [
+        {'timestamp': "12:00:00", 'speaker': "ユーザー", 'message': f"値段はいくらですか {i}", 'seq': i}
+        for i in range(count)
+    ]
+
+
+def make_frames(count: int, bars: int = 10):
+    rng = random.Random(0)
+    return [
+        [(i * 10, rng.randint(20, 120), f"#{rng.randint(100, 255):02x}{rng.randint(100, 255):02x}ff")
+         for i in range(bars)]
+        for _ in range(count)
+    ]
+
+
+@parametrize("batch", HISTORY_BATCHES)
+def bench_add_to_history(benchmark, batch):
+    window = make_window()
+    entries = make_entries(batch)
+
+    def add_and_drain():
+        for entry in entries:
+            window.add_to_history(entry)
+        window.dispatcher.drain()
+
+    try:
+        benchmark(add_and_drain)
+    finally:
+        window.destroy()
+
+
+def bench_update_voice_visualization(benchmark):
+    window = make_window()
+    frames = make_frames(64)
+    position = 0
+
+    def update_and_drain():
+        nonlocal position
+        window.update_voice_visualization(frames[position])
+        window.dispatcher.drain()
+        position = (position + 1) % len(frames)
+
+    try:
+        benchmark(update_and_drain)
+    finally:
+        window.destroy()
@@ -0,0 +1,285 @@
+"""
+Microbenchmark runner for the AI Agent hot paths.
+
+Benchmarks live in benchmarks/micro_*.py as functions named bench_* that
+take a `benchmark` fixture (and optionally one parameter from @parametrize),
+do their setup and then call benchmark(fn, *args), in the style of
+pytest-benchmark. Each case is calibrated so a round lasts at least
+--min-time, timed for several rounds, and reported as min/median/mean/stddev
+per call.
+
+Results can be saved as numbered JSON files under benchmarks/.microbench/
+(local, not committed) and compared with the previous saved run, with the
+reference baseline committed as benchmarks/baseline.json (--compare
+reference) or with any file; cases whose median got slower than --threshold
+are flagged and the exit status is 1. A comparison that finds no baseline,
+or no case in common with it, exits with status 2. Timings depend on the
+machine, so the reference is only meaningful on comparable hardware;
+regenerate it there with --save-reference and commit it.
+
+Usage:
+    python benchmarks/microbench.py [-k categorize] [--save] [--save-reference]
+                                    [--compare [last|reference|FILE]]
+"""
+
+import argparse
+import gc
+import glob
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+STORAGE = os.path.join(BENCH_DIR, ".microbench")
+REFERENCE = os.path.join(BENCH_DIR, "baseline.json")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+
+def parametrize(name: str, values: Sequence[Any]):
+    """Run a benchmark once per value; the value is passed as keyword name."""
+    def decorate(fn):
+        fn.bench_param = (name, list(values))
+        return fn
+    return decorate
+
+
+class Benchmark:
+    """Fixture passed to bench_* functions; call it with the code to time."""
+
+    def __init__(self, min_time: float, rounds: int, max_time: float):
+        self.min_time = min_time
+        self.rounds = rounds
+        self.max_time = max_time
+        self.result: Optional[Dict[str, Any]] = None
+
+    def __call__(self, fn: Callable, *args, **kwargs) -> Any:
+        """Time fn(*args, **kwargs) and return its last result."""
+        value = fn(*args, **kwargs)
+
+        # Calibrate: double the iterations until a round takes min_time
+        iterations = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                fn(*args, **kwargs)
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.min_time or iterations >= 1 << 24:
+                break
+            iterations *= 2
+
+        samples: List[float] = []
+        budget_end = time.perf_counter() + self.max_time
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            while len(samples) < self.rounds or (len(samples) < 3 and time.perf_counter() < budget_end):
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    value = fn(*args, **kwargs)
+                samples.append((time.perf_counter() - started) / iterations)
+                if time.perf_counter() > budget_end and len(samples) >= 3:
+                    break
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        self.result = {
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'mean': statistics.fmean(samples),
+            'stddev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            'rounds': len(samples),
+            'iterations': iterations
+        }
+        return value
+
+
+def discover(pattern: Optional[str]) -> List[tuple]:
+    """Collect (case name, function, parameter) from benchmarks/micro_*.py."""
+    cases = []
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, "micro_*.py"))):
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        for attr in sorted(vars(module)):
+            fn = getattr(module, attr)
+            if not attr.startswith("bench_") or not callable(fn):
+                continue
+            param = getattr(fn, 'bench_param', None)
+            values = param[1] if param else [None]
+            for value in values:
+                name = f"{module_name}::{attr}" + (f"[{value}]" if param else "")
+                if pattern and pattern not in name:
+                    continue
+                cases.append((name, fn, (param[0], value) if param else None))
+    return cases
+
+
+def run_cases(cases: List[tuple], min_time: float, rounds: int, max_time: float) -> Dict[str, Any]:
+    """Run every case; skipped cases are reported with their reason."""
+    results: Dict[str, Any] = {}
+    for name, fn, param in cases:
+        benchmark = Benchmark(min_time, rounds, max_time)
+        try:
+            if param:
+                fn(benchmark, **{param[0]: param[1]})
+            else:
+                fn(benchmark)
+        except SkipBenchmark as e:
+            results[name] = {'skipped': str(e)}
+        else:
+            if benchmark.result is None:
+                results[name] = {'skipped': "benchmark fixture was not called"}
+            else:
+                results[name] = benchmark.result
+        print(format_line(name, results[name]), flush=True)
+    return results
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark whose requirements are not available."""
+
+
+def format_time(seconds: float) -> str:
+    """Seconds in a readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def format_line(name: str, result: Dict[str, Any]) -> str:
+    """One report line."""
+    if 'skipped' in result:
+        return f"{name:<64} SKIPPED ({result['skipped']})"
+    return (f"{name:<64} median {format_time(result['median']):>11}  "
+            f"min {format_time(result['min']):>11}  ±{format_time(result['stddev']):>11}  "
+            f"({result['rounds']}x{result['iterations']})")
+
+
+def saved_runs() -> List[str]:
+    """Saved result files, oldest first."""
+    return sorted(glob.glob(os.path.join(STORAGE, "[0-9][0-9][0-9][0-9]_*.json")))
+
+
+def machine() -> Dict[str, str]:
+    """Description of the machine the results were measured on."""
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor()}
+
+
+def save(results: Dict[str, Any], filename: Optional[str] = None) -> str:
+    """Store results in filename, or as the next numbered run if None."""
+    if filename is None:
+        os.makedirs(STORAGE, exist_ok=True)
+        runs = saved_runs()
+        number = int(os.path.basename(runs[-1])[:4]) + 1 if runs else 1
+        filename = os.path.join(STORAGE, f"{number:04d}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'machine': machine(), 'benchmarks': results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return filename
+
+
+def resolve_baseline(name: str) -> Optional[str]:
+    """File to compare with for a --compare value; None after reporting why there is none."""
+    if name == 'last':
+        runs = saved_runs()
+        if not runs:
+            print("no saved run to compare with; use --save first, or --compare reference "
+                  "for the committed baseline")
+            return None
+        return runs[-1]
+    filename = REFERENCE if name == 'reference' else name
+    if not os.path.isfile(filename):
+        hint = "--save-reference" if name == 'reference' else "--save or --save-reference"
+        print(f"baseline {filename} not found; generate one with {hint}")
+        return None
+    return filename
+
+
+def compare(results: Dict[str, Any], baseline_file: str, threshold: float) -> Optional[List[str]]:
+    """
+    Cases whose median regressed by more than threshold against a saved run.
+
+    Returns:
+        Regressed case names, or None if no case could be compared
+    """
+    with open(baseline_file, encoding='utf-8') as f:
+        saved = json.load(f)
+    baseline = saved['benchmarks']
+    print(f"\nCompared with {os.path.relpath(baseline_file, ROOT)}:")
+    if saved.get('machine') != machine():
+        print(f"note: baseline measured on {saved.get('machine')}; timings may not be comparable")
+    regressions = []
+    compared = 0
+    for name, result in results.items():
+        old = baseline.get(name)
+        if 'skipped' in result or not old or 'skipped' in old:
+            continue
+        compared += 1
+        change = result['median'] / old['median'] - 1 if old['median'] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<64} {format_time(old['median']):>11} -> {format_time(result['median']):>11} "
+              f"{change:+7.1%}{flag}")
+    if not compared:
+        print("no benchmark case in common with the baseline")
+        return None
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-k', dest='pattern', help='only cases whose name contains this')
+    parser.add_argument('--min-time', type=float, default=0.01, help='minimum seconds per round')
+    parser.add_argument('--rounds', type=int, default=7, help='timed rounds per case')
+    parser.add_argument('--max-time', type=float, default=1.0, help='time budget per case')
+    parser.add_argument('--save', action='store_true', help='store results under benchmarks/.microbench')
+    parser.add_argument('--save-reference', action='store_true',
+                        help='store results as the committed reference baseline benchmarks/baseline.json')
+    parser.add_argument('--compare', nargs='?', const='last',
+                        help="compare with 'last' saved run (default), the committed 'reference' "
+                             "baseline or a results file")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed median slowdown (0.1 = 10%%)')
+    args = parser.parse_args()
+
+    # Pick the previous run before this one is saved
+    baseline_file = None
+    if args.compare:
+        baseline_file = resolve_baseline(args.compare)
+        if baseline_file is None:
+            return 2
+
+    results = run_cases(discover(args.pattern), args.min_time, args.rounds, args.max_time)
+
+    if args.save:
+        print(f"\nsaved {os.path.relpath(save(results), ROOT)}")
+    if args.save_reference:
+        print(f"\nsaved {os.path.relpath(save(results, REFERENCE), ROOT)}")
+    if baseline_file:
+        regressions = compare(results, baseline_file, args.threshold)
+        if regressions is None:
+            return 2
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # Case modules import this file as "microbench"; share one module object
+    sys.modules.setdefault("microbench", sys.modules[__name__])
+    sys.exit(main())
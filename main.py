@@ -2,16 +2,31 @@
 Main application entry point for the AI Agent.
 """
 
-import threading
 import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
 import os
+import signal
 import sys
 import logging
-from ai_agent.ui.main_window import MainWindow
-from ai_agent.speech.tts_engine import TTSEngine
-from ai_agent.speech.speech_recognizer import SpeechRecognizer
 from ai_agent.conversation.conversation_manager import ConversationManager
-from ai_agent.config.settings import DEFAULT_VOLUME, DEFAULT_VOICE_RATE
+from ai_agent.conversation.speculation import ResponseSpeculator
+from ai_agent.orchestrator import CallPipeline, ConversationOrchestrator
+from ai_agent.events import EventBus, StatusEvent, ConversationStateEvent
+from ai_agent.startup import StartupProfiler
+from ai_agent.tracing import get_tracer
+from ai_agent.workers import configure_pools, get_io_pool, shutdown_pools
+from ai_agent.config.settings import (
+    DEFAULT_VOLUME, DEFAULT_VOICE_RATE, ENABLE_SPECULATION, METRICS_HOST, METRICS_TEXTFILE_INTERVAL,
+    SCRIPT_FILE, RECORDING_DIR, CAPTURE_PROCESS, VOICE_LANGUAGE, SPEECH_TIMEOUT, PHRASE_TIME_LIMIT,
+    ADAPTIVE_ENDPOINTING
+)
+
+# pyttsx3, speech_recognition and tkinter are imported lazily by the
+# component factories below so that they can load in parallel
+_IMPORT_FINISHED = time.perf_counter()
 
 # Production configuration
 PRODUCTION_MODE = os.getenv('PRODUCTION_MODE', 'False').lower() == 'true'
@@ -20,35 +35,143 @@ PRODUCTION_MODE = os.getenv('PRODUCTION_MODE', 'False').lower() == 'true'
 class AIAgentApplication:
     """Main application class that coordinates all components."""
     
-    def __init__(self):
-        """Initialize the AI Agent application."""
+    def __init__(self, headless: bool = False, profiler: StartupProfiler = None,
+                 script_file: str = None, record_dir: str = None, capture_process: bool = False):
+        """
+        Initialize the AI Agent application.
+        
+        Args:
+            headless: Use a logging sink instead of the Tk window; tkinter
+                      is never imported in this mode
+            profiler: Records import/initialization time per component
+            script_file: JSON conversation script, reloaded when it changes;
+                         the script in settings.py is used if None
+            record_dir: Directory of the audio segment store; no audio is
+                        recorded if None
+            capture_process: Capture the microphone in a separate process
+                             feeding a shared-memory ring buffer
+        """
+        self.profiler = profiler or StartupProfiler(enabled=False)
+        
         # Setup logging for production
-        self._setup_logging()
+        with self.profiler.phase("setup logging"):
+            self._setup_logging()
+        self._setup_workers()
+        self.headless = headless
+        self.capture_process = capture_process
+        
+        # Components communicate through the event bus
+        self.event_bus = EventBus()
         
-        # Initialize components
-        self.ui = MainWindow()
-        self.tts_engine = TTSEngine(volume=DEFAULT_VOLUME, rate=DEFAULT_VOICE_RATE)
-        self.speech_recognizer = SpeechRecognizer()
-        self.conversation_manager = ConversationManager()
+        # TTS and microphone calibration are independent of each other and of
+        # the UI, so they load on the I/O pool while the UI is built here
+        # (Tk must stay on the main thread).
+        pool = get_io_pool()
+        tts_future = pool.submit(self._create_tts_engine)
+        recognizer_future = pool.submit(self._create_speech_recognizer)
         
-        # Threading
-        self.conversation_thread = None
-        self.stop_event = threading.Event()
+        self.ui = self._create_ui(headless)
+        with self.profiler.phase("init ConversationManager"):
+            self.conversation_manager = ConversationManager(self._create_engine(script_file))
+        
+        self.tts_engine = tts_future.result()
+        self.speech_recognizer = recognizer_future.result()
+        
+        self.speculator = ResponseSpeculator(
+            self.conversation_manager,
+            self.tts_engine if ENABLE_SPECULATION else None
+        )
+        
+        # Calls run as tasks on the orchestrator's event loop
+        self.orchestrator = ConversationOrchestrator()
+        self.call_future = None
+        
+        self.recorder = self._create_recorder(record_dir)
         
         # Setup component connections
         self._setup_callbacks()
+        self._setup_metrics()
+    
+    def _create_engine(self, script_file: str = None):
+        """Build the conversation engine, watching the script file if one is given."""
+        self.script_watcher = None
+        if not script_file:
+            return None
+        from ai_agent.conversation.engine import ConversationEngine
+        from ai_agent.conversation.script_file import ScriptWatcher, load_script
+        engine = ConversationEngine(load_script(script_file), record_history=False)
+        self.script_watcher = ScriptWatcher(script_file, [engine])
+        self.script_watcher.start()
+        return engine
+    
+    def _create_recorder(self, record_dir: str = None):
+        """Record caller and agent audio to the segment store if a directory is given."""
+        if not record_dir:
+            return None
+        from ai_agent.audio.recording import SegmentRecorder
+        recorder = SegmentRecorder(record_dir)
+        self.tts_engine.set_recorder(recorder)
+        self.speech_recognizer.set_recorder(recorder)
+        return recorder
+    
+    def _create_ui(self, headless: bool):
+        """Import and build the front end."""
+        if headless:
+            with self.profiler.phase("import headless"):
+                from ai_agent.headless import HeadlessSink
+            with self.profiler.phase("init HeadlessSink"):
+                return HeadlessSink()
+        
+        with self.profiler.phase("import ui (tkinter)"):
+            from ai_agent.ui.main_window import MainWindow
+        with self.profiler.phase("init MainWindow"):
+            return MainWindow()
+    
+    def _create_tts_engine(self):
+        """Import and initialize the TTS engine."""
+        with self.profiler.phase("import tts_engine (pyttsx3)"):
+            from ai_agent.speech.tts_engine import TTSEngine
+        with self.profiler.phase("init TTSEngine"):
+            return TTSEngine(volume=DEFAULT_VOLUME, rate=DEFAULT_VOICE_RATE)
+    
+    def _create_speech_recognizer(self):
+        """Import the recognizer and open/calibrate the microphone."""
+        if self.capture_process:
+            return self._create_shared_memory_recognizer()
+        with self.profiler.phase("import speech_recognizer"):
+            from ai_agent.speech.speech_recognizer import SpeechRecognizer
+        with self.profiler.phase("init SpeechRecognizer (mic)"):
+            return SpeechRecognizer()
+    
+    def _create_shared_memory_recognizer(self):
+        """Recognize audio captured by a separate process through shared memory."""
+        with self.profiler.phase("import shared_capture"):
+            from ai_agent.audio.shared_capture import CaptureProcess, SharedMemorySource
+            from ai_agent.speech.backends import GoogleBackend
+            from ai_agent.speech.source_recognizer import SourceRecognizer
+            from ai_agent.speech.endpointing import AdaptiveEndpointer
+        with self.profiler.phase("start capture process"):
+            capture = CaptureProcess().start()
+            source = SharedMemorySource(capture.ring, on_close=capture.stop)
+            return SourceRecognizer(source, GoogleBackend(VOICE_LANGUAGE),
+                                    SPEECH_TIMEOUT, PHRASE_TIME_LIMIT,
+                                    endpointer=AdaptiveEndpointer() if ADAPTIVE_ENDPOINTING else None)
     
     def _setup_logging(self):
         """Setup logging configuration."""
         if PRODUCTION_MODE:
-            # Production logging
-            logging.basicConfig(
+            # Production logging: callers only enqueue, a listener thread
+            # writes the rotated log file and the console
+            from ai_agent.config.production import (
+                LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, ensure_log_directories
+            )
+            from ai_agent.logging_setup import setup_queue_logging
+            ensure_log_directories()
+            setup_queue_logging(
+                LOG_FILE,
                 level=logging.INFO,
-                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                handlers=[
-                    logging.FileHandler('ai_agent.log'),
-                    logging.StreamHandler()
-                ]
+                max_bytes=LOG_MAX_BYTES,
+                backup_count=LOG_BACKUP_COUNT
             )
         else:
             # Development logging
@@ -57,6 +180,19 @@ class AIAgentApplication:
                 format='%(levelname)s - %(message)s'
             )
     
+    def _setup_workers(self):
+        """Size the shared worker pools."""
+        if PRODUCTION_MODE:
+            from ai_agent.config.production import IO_POOL_WORKERS
+            configure_pools(io_workers=IO_POOL_WORKERS)
+    
+    def _setup_metrics(self):
+        """Report queue depths at scrape time."""
+        from ai_agent.metrics import QUEUE_DEPTH, EVENTS_DROPPED
+        QUEUE_DEPTH.labels("event_bus").set_function(self.event_bus.pending)
+        QUEUE_DEPTH.labels("turn_executor").set_function(self.conversation_manager.pending_turns)
+        EVENTS_DROPPED.set_function(self.event_bus.dropped)
+    
     def _setup_callbacks(self):
         """Setup callbacks between components."""
         # UI callbacks
@@ -66,35 +202,33 @@ class AIAgentApplication:
         self.ui.set_clear_log_callback(self.clear_log)
         self.ui.set_init_conversation_callback(self.initialize_conversation)
         self.ui.set_volume_change_callback(self.update_volume)
+        self.ui.set_history_loader_callback(self.conversation_manager.get_history_before)
         
-        # Speech engine callbacks
-        self.tts_engine.set_voice_callback(self.ui.update_voice_visualization)
-        
-        # Speech recognizer callbacks
-        self.speech_recognizer.set_status_callback(self.ui.update_status)
-        
-        # Conversation manager callbacks
-        self.conversation_manager.set_history_callback(self.ui.add_to_history)
-        self.conversation_manager.set_status_callback(self.ui.update_status)
+        # Producers publish on the bus; the UI consumes at its own pace
+        self.tts_engine.set_event_bus(self.event_bus)
+        self.speech_recognizer.set_event_bus(self.event_bus)
+        self.conversation_manager.set_event_bus(self.event_bus)
+        self.ui.attach_event_bus(self.event_bus)
     
     def start_conversation(self):
         """Start the conversation."""
         try:
             # Start conversation in manager
             initial_message = self.conversation_manager.start_conversation()
+            self.speech_recognizer.reset_endpointing()
             
             # Update UI state
             self.ui.set_conversation_state(True)
             
-            # Speak initial message
-            if initial_message:
-                self.tts_engine.speak(initial_message)
-            
-            # Start conversation loop in separate thread
-            self.stop_event.clear()
-            self.conversation_thread = threading.Thread(target=self._conversation_loop)
-            self.conversation_thread.daemon = True
-            self.conversation_thread.start()
+            # Speak the initial message and run the call on the event loop
+            pipeline = CallPipeline(
+                self.conversation_manager,
+                self.speech_recognizer,
+                self.tts_engine,
+                self.speculator
+            )
+            self.call_future = self.orchestrator.start_call(pipeline, opening=initial_message)
+            self.call_future.add_done_callback(self._on_call_finished)
             
         except Exception as e:
             self.ui.show_error("エラー", f"会話開始エラー: {str(e)}")
@@ -106,42 +240,29 @@ class AIAgentApplication:
             # Stop conversation manager
             self.conversation_manager.stop_conversation()
             
-            # Signal stop event
-            self.stop_event.set()
+            # Cancel the running call
+            if self.call_future:
+                self.call_future.cancel()
             
             # Stop TTS engine
             self.tts_engine.stop()
             
+            if self.speculator.turns:
+                logging.info(self.speculator.format_report())
+            if get_tracer().summary():
+                logging.info("Turn latency:\n%s", get_tracer().format_report())
+            
             # Update UI state
             self.ui.set_conversation_state(False)
             
         except Exception as e:
             self.ui.show_error("エラー", f"会話停止エラー: {str(e)}")
     
-    def _conversation_loop(self):
-        """Main conversation loop running in separate thread."""
-        try:
-            while not self.stop_event.is_set() and self.conversation_manager.is_conversation_active():
-                # Listen for user speech
-                user_response = self.speech_recognizer.listen_for_speech()
-                
-                if user_response and not self.stop_event.is_set():
-                    # Process user response and get bot reply
-                    bot_response = self.conversation_manager.process_user_response(user_response)
-                    
-                    # Speak bot response
-                    if bot_response:
-                        self.tts_engine.speak(bot_response)
-                
-                # Small delay to prevent busy waiting
-                if self.stop_event.wait(0.5):
-                    break
-                    
-        except Exception as e:
-            self.ui.update_status(f"会話ループエラー: {str(e)}")
-        finally:
-            # Ensure UI is updated even if thread ends unexpectedly
-            self.ui.set_conversation_state(False)
+    def _on_call_finished(self, future):
+        """Update the UI when a call ends, however it ended."""
+        if not future.cancelled() and future.exception():
+            self.event_bus.publish(StatusEvent(f"会話ループエラー: {str(future.exception())}", source="app"))
+        self.event_bus.publish(ConversationStateEvent(False))
     
     def send_text_message(self, text: str):
         """Send manual text message."""
@@ -206,9 +327,20 @@ class AIAgentApplication:
         try:
             # Stop conversation
             self.stop_conversation()
+            self.orchestrator.shutdown()
+            self.speculator.close()
+            # Queued turns run on the turn pool, so close before shutting it down
+            self.conversation_manager.close()
+            if self.script_watcher:
+                self.script_watcher.stop()
+            shutdown_pools(wait=False)
             
             # Cleanup components
             self.tts_engine.cleanup()
+            if self.capture_process:
+                self.speech_recognizer.close()
+            if self.recorder:
+                self.recorder.close()
             
         except Exception as e:
             print(f"Cleanup error: {str(e)}")
@@ -222,21 +354,115 @@ def handle_exception(exc_type, exc_value, exc_traceback):
     
     logging.critical("Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback))
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="AI Agent - 電話営業ボット")
+    parser.add_argument('--headless', action='store_true',
+                        default=os.getenv('AI_AGENT_HEADLESS', 'False').lower() == 'true',
+                        help='run one conversation without the GUI, logging to the console/log file')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print per-component import/initialization times and exit')
+    parser.add_argument('--profile-format', choices=('text', 'json'), default='text',
+                        help='output format of --profile-startup')
+    parser.add_argument('--metrics-port', type=int,
+                        default=int(os.getenv('AI_AGENT_METRICS_PORT', '0')),
+                        help=f'serve Prometheus metrics on {METRICS_HOST}:PORT/metrics (0 = off)')
+    parser.add_argument('--metrics-textfile', metavar='FILE',
+                        default=os.getenv('AI_AGENT_METRICS_TEXTFILE'),
+                        help='periodically write Prometheus metrics to FILE')
+    parser.add_argument('--script', metavar='FILE',
+                        default=os.getenv('AI_AGENT_SCRIPT_FILE', SCRIPT_FILE),
+                        help='load the conversation script from a JSON file and reload it on change')
+    parser.add_argument('--capture-process', action='store_true',
+                        default=os.getenv('AI_AGENT_CAPTURE_PROCESS', str(CAPTURE_PROCESS)).lower() == 'true',
+                        help='capture the microphone in a separate process through shared memory')
+    parser.add_argument('--record-dir', metavar='DIR',
+                        default=os.getenv('AI_AGENT_RECORD_DIR', RECORDING_DIR),
+                        help='append caller and agent audio to per-day segment files in DIR')
+    parser.add_argument('--memory-diagnostics', metavar='SECONDS', type=float,
+                        default=float(os.getenv('AI_AGENT_MEMORY_DIAGNOSTICS', '0')),
+                        help='trace allocations and log memory growth by module/line every SECONDS (0 = off)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write per-turn latency spans as Chrome trace-event JSON on exit')
+    return parser.parse_args(argv)
+
+
+def profile_startup(headless: bool, output_format: str = 'text') -> int:
+    """Build the application, print the startup profile and exit."""
+    profiler = StartupProfiler(started=_IMPORT_STARTED)
+    profiler.add("import core", _IMPORT_STARTED, _IMPORT_FINISHED)
+    
+    app = None
+    status = 0
+    try:
+        app = AIAgentApplication(headless=headless, profiler=profiler)
+    except Exception as e:
+        logging.error(f"Startup failed: {str(e)}")
+        status = 1
+    
+    print(profiler.to_json() if output_format == 'json' else profiler.format_report())
+    
+    if app:
+        app._cleanup()
+        app.ui.destroy()
+    return status
+
+
+def start_metrics_exporters(port: int, textfile=None) -> list:
+    """Start the metrics HTTP listener and/or textfile writer that were requested."""
+    from ai_agent.metrics import MetricsServer, TextfileWriter
+    exporters = []
+    if port:
+        server = MetricsServer(host=METRICS_HOST, port=port)
+        server.start()
+        logging.info(f"Metrics served on http://{METRICS_HOST}:{server.port}/metrics")
+        exporters.append(server)
+    if textfile:
+        writer = TextfileWriter(textfile, interval=METRICS_TEXTFILE_INTERVAL)
+        writer.start()
+        exporters.append(writer)
+    return exporters
+
+
+def main(argv=None):
     """Main entry point."""
+    args = parse_args(argv)
+    
+    if args.profile_startup:
+        return profile_startup(args.headless, args.profile_format)
+    
     # Setup global exception handler
     sys.excepthook = handle_exception
     
+    exporters = []
+    memory_monitor = None
     try:
         logging.info("Starting AI Agent application...")
-        app = AIAgentApplication()
+        app = AIAgentApplication(headless=args.headless, script_file=args.script,
+                                 record_dir=args.record_dir, capture_process=args.capture_process)
+        exporters = start_metrics_exporters(args.metrics_port, args.metrics_textfile)
+        if args.memory_diagnostics > 0:
+            from ai_agent.memory import MemoryMonitor
+            memory_monitor = MemoryMonitor(interval=args.memory_diagnostics)
+            memory_monitor.start()
+        if args.headless:
+            # Let service managers stop a headless worker cleanly
+            signal.signal(signal.SIGTERM, lambda signum, frame: app.ui.stop())
         app.run()
     except Exception as e:
         logging.critical(f"Failed to start application: {str(e)}")
         print(f"Failed to start application: {str(e)}")
     finally:
+        for exporter in exporters:
+            exporter.stop()
+        if memory_monitor:
+            logging.info("Memory at exit\n%s", memory_monitor.format_report())
+            memory_monitor.stop()
+        if args.trace:
+            get_tracer().export_chrome_trace(args.trace)
+            logging.info(f"Trace written to {args.trace}")
         logging.info("AI Agent application stopped.")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Tests for the adaptive endpoint silence threshold."""
+
+import struct
+
+import pytest
+
+from ai_agent.speech.endpointing import AdaptiveEndpointer, pause_durations, speech_extent
+
+
+def endpointer(**kwargs):
+    options = dict(initial=0.8, minimum=0.3, maximum=1.2, quantile=1.0, margin=2.0,
+                   min_samples=3, window=5)
+    options.update(kwargs)
+    return AdaptiveEndpointer(**options)
+
+
+def test_initial_threshold_until_enough_pauses():
+    ep = endpointer()
+    ep.observe_pauses([0.2, 0.25])
+    assert ep.threshold == 0.8
+    ep.observe_pauses([0.3])
+    assert ep.threshold == pytest.approx(0.6)
+
+
+def test_threshold_is_quantile_times_margin_within_bounds():
+    ep = endpointer(quantile=0.5)
+    ep.observe_pauses([0.1, 0.2, 0.3, 0.4])
+    assert ep.threshold == pytest.approx(0.4)
+    ep.observe_pauses([0.05] * 5)
+    assert ep.threshold == 0.3
+    ep = endpointer()
+    ep.observe_pauses([0.2, 0.3, 0.9])
+    assert ep.threshold == 1.2
+
+
+def test_only_the_window_of_recent_pauses_counts():
+    ep = endpointer()
+    ep.observe_pauses([0.5, 0.2, 0.2, 0.2, 0.2])
+    assert ep.threshold == pytest.approx(1.0)
+    ep.observe_pauses([0.2])
+    assert ep.threshold == pytest.approx(0.4)
+
+
+def test_truncation_raises_the_threshold():
+    ep = endpointer()
+    ep.observe_pauses([0.2, 0.2, 0.2])
+    ep.observe_truncation(0.45)
+    assert ep.truncations == 1
+    assert ep.threshold == pytest.approx(0.9)
+
+
+def test_reset_drops_observations_of_the_previous_call():
+    ep = endpointer()
+    generation = ep.generation
+    ep.observe_pauses([0.2, 0.2, 0.2])
+    ep.reset()
+    assert ep.threshold == 0.8
+    assert ep.truncations == 0
+    # Late observations captured during the previous call are ignored
+    ep.observe_pauses([0.1, 0.1, 0.1], generation)
+    ep.observe_truncation(0.1, generation)
+    assert ep.threshold == 0.8
+    assert ep.truncations == 0
+    ep.observe_pauses([0.2, 0.2, 0.2], ep.generation)
+    assert ep.threshold == pytest.approx(0.4)
+
+
+def tone(seconds, amplitude, rate=1000):
+    frames = int(seconds * rate)
+    return struct.pack(f"<{frames}h", *([amplitude, -amplitude] * (frames // 2 + 1))[:frames])
+
+
+def test_pause_durations_measures_silence_between_speech():
+    rate = 1000
+    pcm = (tone(0.2, 0, rate) + tone(0.3, 2000, rate) + tone(0.3, 0, rate)
+           + tone(0.3, 2000, rate) + tone(0.06, 0, rate) + tone(0.3, 2000, rate)
+           + tone(0.5, 0, rate))
+    pauses = pause_durations(pcm, rate, frame_seconds=0.03)
+    # Leading and trailing silence and gaps under 0.1 s are not pauses
+    assert len(pauses) == 1
+    assert pauses[0] == pytest.approx(0.3, abs=0.061)
+    assert pause_durations(pcm, rate, sample_width=1) == []
+
+
+def test_speech_extent_spans_first_to_last_speech():
+    rate = 1000
+    pcm = (tone(0.3, 0, rate) + tone(0.3, 2000, rate) + tone(0.3, 0, rate)
+           + tone(0.3, 2000, rate) + tone(0.6, 0, rate))
+    assert speech_extent(pcm, rate, frame_seconds=0.03) == pytest.approx(0.9, abs=0.061)
+    assert speech_extent(tone(0.5, 0, rate), rate) is None
+
+
+def test_speech_resumed_after_an_endpoint_is_a_truncation():
+    ep = endpointer()
+    ep.observe_pauses([0.2, 0.2, 0.2])
+    ep.observe_endpoint(10.0, 12.0, 0.4)
+    # Resumed 0.45 s after speech ended, 0.05 s after the 0.4 s endpoint
+    ep.observe_endpoint(12.45, 14.0, 0.4)
+    assert ep.truncations == 1
+    assert ep.threshold == pytest.approx(0.9)
+    # A reply in between: the next turn starts well after the resume window
+    ep.observe_endpoint(14.0 + 0.9 + 2.0, 18.0, 0.9)
+    assert ep.truncations == 1
+
+
+def test_observe_audio_detects_truncation_from_end_of_speech():
+    rate = 1000
+    ep = endpointer(resume_window=0.5)
+    utterance = tone(0.3, 2000, rate) + tone(0.8, 0, rate)
+    ep.observe_audio(utterance, rate, end_of_speech=100.0, threshold=0.8)
+    ep.observe_audio(utterance, rate, end_of_speech=101.3, threshold=0.8)
+    assert ep.truncations == 1
+    ep.reset()
+    # Without timing, or after a reset, nothing is compared
+    ep.observe_audio(utterance, rate, end_of_speech=101.3, threshold=0.8)
+    ep.observe_audio(utterance, rate)
+    assert ep.truncations == 0
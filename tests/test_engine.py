@@ -0,0 +1,92 @@
+"""Tests for swapping the conversation engine's script under running sessions."""
+
+from ai_agent.conversation.engine import NOT_STARTED, ConversationEngine
+from ai_agent.conversation.script_file import script_from_data
+
+
+def make_script(flow, questions=("Q-greeting", "Q-product", "Q-feature"),
+                start_state="greeting"):
+    return script_from_data({
+        'questions': list(questions),
+        'templates': {'price': ["T-price"], 'default': ["T-default"]},
+        'keywords': {'price': ["値段"]},
+        'flow': flow,
+        'start_state': start_state
+    })
+
+
+OLD_FLOW = {
+    "greeting": {"question": 0, "on": {"default": "product"}},
+    "product": {"question": 1, "on": {"price": "price", "default": "feature"}},
+    "price": {"template": "price", "on": {"default": "feature"}},
+    "feature": {"question": 2, "on": {"default": "feature"}}
+}
+
+# Same state names in another order, without "price", with new questions
+NEW_FLOW = {
+    "feature": {"question": 2, "on": {"default": "greeting"}},
+    "greeting": {"question": 0, "on": {"default": "product"}},
+    "product": {"question": 1, "on": {"default": "feature"}}
+}
+NEW_QUESTIONS = ("N-greeting", "N-product", "N-feature")
+
+
+def state_name(session):
+    return session.script.graph.state_names[session.state]
+
+
+def started_engine():
+    engine = ConversationEngine(make_script(OLD_FLOW), record_history=False)
+    session = engine.create_session()
+    assert engine.start_session(session) == "Q-greeting"
+    return engine, session
+
+
+def test_session_keeps_its_state_by_name_across_a_swap():
+    engine, session = started_engine()
+    assert engine.process(session, "はい") == "Q-product"
+    new_script = make_script(NEW_FLOW, NEW_QUESTIONS)
+    engine.swap_script(new_script)
+    # "product" has a different id in the new graph; the next turn follows
+    # the new script's transition from it
+    assert engine.process(session, "はい") == "N-feature"
+    assert session.script is new_script
+    assert state_name(session) == "feature"
+
+
+def test_session_in_a_removed_state_continues_from_the_new_start():
+    engine, session = started_engine()
+    engine.process(session, "はい")
+    assert engine.process(session, "値段は?") == "T-price"
+    engine.swap_script(make_script(NEW_FLOW, NEW_QUESTIONS))
+    # "price" no longer exists: the session is mapped to "greeting" first
+    assert engine.process(session, "はい") == "N-product"
+
+
+def test_new_and_unstarted_sessions_use_the_new_script():
+    engine = ConversationEngine(make_script(OLD_FLOW), record_history=False)
+    idle = engine.create_session()
+    engine.swap_script(make_script(NEW_FLOW, NEW_QUESTIONS))
+    assert idle.state == NOT_STARTED
+    assert engine.start_session(idle) == "N-greeting"
+    assert engine.start_session(engine.create_session()) == "N-greeting"
+
+
+def test_prepared_replies_of_the_old_script_are_ignored():
+    engine, session = started_engine()
+    new_script = make_script(NEW_FLOW, NEW_QUESTIONS)
+    # Replies prepared before the swap are keyed by old state ids, which
+    # may collide with ids of the new graph
+    prepared = {new_script.graph.state_ids["product"]: "stale"}
+    engine.swap_script(new_script)
+    assert engine.process(session, "はい", prepared) == "N-product"
+
+
+def test_candidates_look_ahead_in_the_new_script():
+    engine, session = started_engine()
+    new_script = make_script(NEW_FLOW, NEW_QUESTIONS)
+    engine.swap_script(new_script)
+    candidates = engine.candidates(session)
+    assert list(candidates.values()) == ["N-product"]
+    # Looking ahead does not move the session
+    assert session.script is not new_script
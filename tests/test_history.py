@@ -0,0 +1,139 @@
+"""Tests for the conversation history's snapshots and sequence-number cursors."""
+
+import threading
+from ai_agent.conversation.history import ConversationHistory
+
+
+def fill(history, count, start=0):
+    for i in range(start, start + count):
+        history.append({'message': f"m{i}"})
+
+
+def messages(entries):
+    return [entry['message'] for entry in entries]
+
+
+def test_append_assigns_increasing_seq():
+    history = ConversationHistory()
+    assert [history.append({'message': m}) for m in "abc"] == [0, 1, 2]
+    assert history.cursor == 3
+    assert len(history) == 3
+
+
+def test_snapshot_is_not_affected_by_later_appends():
+    history = ConversationHistory()
+    fill(history, 3)
+    snapshot = history.snapshot()
+    fill(history, 2, start=3)
+    assert len(snapshot) == 3
+    assert messages(snapshot) == ["m0", "m1", "m2"]
+    assert snapshot[-1]['message'] == "m2"
+
+
+def test_since_returns_new_entries_and_next_cursor():
+    history = ConversationHistory()
+    fill(history, 5)
+    entries, cursor = history.since(0, limit=2)
+    assert messages(entries) == ["m0", "m1"]
+    assert cursor == 2
+    entries, cursor = history.since(cursor)
+    assert messages(entries) == ["m2", "m3", "m4"]
+    assert cursor == 5
+    assert history.since(cursor) == ([], 5)
+
+
+def test_since_skips_entries_removed_by_clear():
+    history = ConversationHistory()
+    fill(history, 3)
+    snapshot = history.snapshot()
+    history.clear()
+    fill(history, 2, start=3)
+    # Sequence numbers keep increasing across the clear
+    entries, cursor = history.since(1)
+    assert messages(entries) == ["m3", "m4"]
+    assert [entry['seq'] for entry in entries] == [3, 4]
+    assert cursor == 5
+    assert len(history) == 2
+    assert messages(snapshot) == ["m0", "m1", "m2"]
+
+
+def test_before_returns_preceding_entries_in_order():
+    history = ConversationHistory()
+    fill(history, 10)
+    assert messages(history.before(6, 3)) == ["m3", "m4", "m5"]
+    assert messages(history.before(2, 5)) == ["m0", "m1"]
+    assert history.before(0, 5) == []
+
+
+def test_subscribe_yields_from_cursor_until_stopped():
+    history = ConversationHistory()
+    fill(history, 3)
+    stop = threading.Event()
+    received = []
+    for entry in history.subscribe(1, stop, poll_interval=0.01):
+        received.append(entry['message'])
+        if len(received) == 2:
+            stop.set()
+    assert received == ["m1", "m2"]
+
+
+def test_wait_for_times_out_without_new_entries():
+    history = ConversationHistory()
+    fill(history, 1)
+    assert history.wait_for(0, timeout=0)
+    assert not history.wait_for(1, timeout=0.01)
+
+
+def test_bounded_history_keeps_newest_entries_in_memory(tmp_path):
+    history = ConversationHistory(max_entries=10, spill_dir=str(tmp_path))
+    fill(history, 25)
+    assert history.total == 25
+    assert 10 <= history.in_memory < 20
+
+
+def test_spilled_entries_stay_readable(tmp_path, monkeypatch):
+    from ai_agent.conversation import history as history_module
+
+    # Small index and read batches so reads cross their boundaries
+    monkeypatch.setattr(history_module, 'SPILL_INDEX_INTERVAL', 4)
+    monkeypatch.setattr(history_module, 'SPILL_READ_BATCH', 3)
+    history = ConversationHistory(max_entries=5, spill_dir=str(tmp_path))
+    fill(history, 37)
+    expected = [f"m{i}" for i in range(37)]
+
+    snapshot = history.snapshot()
+    assert messages(snapshot) == expected
+    assert messages(snapshot[6:19]) == expected[6:19]
+    assert snapshot[9]['message'] == "m9"
+    assert messages(snapshot[::10]) == expected[::10]
+    entries, cursor = history.since(2, limit=20)
+    assert messages(entries) == expected[2:22]
+    assert cursor == 22
+    assert messages(history.before(30, 8)) == expected[22:30]
+
+
+def test_snapshot_survives_later_spills(tmp_path):
+    history = ConversationHistory(max_entries=4, spill_dir=str(tmp_path))
+    fill(history, 6)
+    snapshot = history.snapshot()
+    fill(history, 20, start=6)
+    assert messages(snapshot) == [f"m{i}" for i in range(6)]
+
+
+def test_clear_starts_a_new_spill(tmp_path):
+    history = ConversationHistory(max_entries=3, spill_dir=str(tmp_path))
+    fill(history, 10)
+    history.clear()
+    fill(history, 8, start=10)
+    assert history.total == 8
+    assert messages(history.snapshot()) == [f"m{i}" for i in range(10, 18)]
+    entries, _ = history.since(0)
+    assert entries[0]['seq'] == 10
+
+
+def test_export_reads_spilled_entries(tmp_path):
+    from ai_agent.conversation.exporter import iter_entries
+
+    history = ConversationHistory(max_entries=5, spill_dir=str(tmp_path))
+    fill(history, 23)
+    assert messages(iter_entries(history.snapshot())) == [f"m{i}" for i in range(23)]
@@ -0,0 +1,33 @@
+"""Tests for the memory soak test's verdict."""
+
+import pytest
+
+from ai_agent.memory import _median_growth, growth_per_session, soak_too_short
+
+
+def test_median_growth_ignores_a_one_off_step():
+    sessions = [0, 100, 200, 300, 400, 500]
+    rss_kb = [1000, 1010, 6010, 6020, 6030, 6040]
+    assert _median_growth(sessions, rss_kb) == pytest.approx(0.1)
+
+
+def test_median_growth_sees_a_steady_leak():
+    sessions = [0, 100, 200, 300, 400]
+    rss_kb = [1000, 2000, 8000, 9000, 10000]
+    assert _median_growth(sessions, rss_kb) == pytest.approx(10.0)
+
+
+def test_median_growth_of_too_few_samples_is_zero():
+    assert _median_growth([0], [1000]) == 0.0
+
+
+def test_short_runs_are_rejected():
+    assert soak_too_short(8, 500, 3) is None
+    assert "warmup" in soak_too_short(8, 500, 1)
+    assert "rounds" in soak_too_short(3, 1000, 3)
+    assert "sessions" in soak_too_short(8, 100, 3)
+
+
+def test_traced_runs_are_judged_on_the_heap():
+    assert growth_per_session({'rss_kb_per_session': 20.0, 'heap_kb_per_session': 0.1}) == 0.1
+    assert growth_per_session({'rss_kb_per_session': 2.0}) == 2.0
@@ -0,0 +1,67 @@
+"""Tests for the metrics registry's Prometheus text exposition."""
+
+import pytest
+
+from ai_agent.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_buckets_are_cumulative_with_inf(registry):
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.5, 0.1, 1.0), registry=registry)
+    # Bounds are inclusive upper limits
+    for value in (0.05, 0.1, 0.3, 0.7, 1.0, 4.0):
+        histogram.observe(value)
+    assert histogram.expose() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="0.5"} 3',
+        'latency_seconds_bucket{le="1"} 5',
+        'latency_seconds_bucket{le="+Inf"} 6',
+        "latency_seconds_sum 6.15",
+        "latency_seconds_count 6"
+    ]
+
+
+def test_labelled_histogram_series_are_rendered_separately(registry):
+    histogram = Histogram("stage_seconds", "Stage", ("stage",), buckets=(1.0,), registry=registry)
+    histogram.labels("listen").observe(2.0)
+    histogram.labels('say "hi"').observe(0.5)
+    lines = histogram.expose()[2:]
+    assert lines == [
+        'stage_seconds_bucket{stage="listen",le="1"} 0',
+        'stage_seconds_bucket{stage="listen",le="+Inf"} 1',
+        'stage_seconds_sum{stage="listen"} 2',
+        'stage_seconds_count{stage="listen"} 1',
+        'stage_seconds_bucket{stage="say \\"hi\\"",le="1"} 1',
+        'stage_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 1',
+        'stage_seconds_sum{stage="say \\"hi\\""} 0.5',
+        'stage_seconds_count{stage="say \\"hi\\""} 1'
+    ]
+
+
+def test_empty_labelled_family_has_no_samples(registry):
+    histogram = Histogram("unused_seconds", "Unused", ("stage",), registry=registry)
+    assert histogram.expose() == ["# HELP unused_seconds Unused", "# TYPE unused_seconds histogram"]
+
+
+def test_registry_renders_all_families_and_rejects_duplicates(registry):
+    Counter("turns_total", "Turns", registry=registry).inc(3)
+    gauge = Gauge("depth", "Depth", ("queue",), registry=registry)
+    gauge.labels("events").set_function(lambda: 7)
+    assert registry.render() == (
+        "# HELP turns_total Turns\n# TYPE turns_total counter\nturns_total 3\n"
+        '# HELP depth Depth\n# TYPE depth gauge\ndepth{queue="events"} 7\n'
+    )
+    with pytest.raises(ValueError):
+        Counter("turns_total", "Again", registry=registry)
+
+
+def test_label_count_must_match(registry):
+    histogram = Histogram("h_seconds", "H", ("a", "b"), registry=registry)
+    with pytest.raises(ValueError):
+        histogram.labels("only-one")
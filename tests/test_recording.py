@@ -0,0 +1,80 @@
+"""Tests for the audio segment store."""
+
+import os
+
+import pytest
+
+from ai_agent.audio.recording import (
+    AGENT, CALLER, CODEC_PCM, CODEC_ZLIB, INDEX_RECORD, INDEX_SUFFIX, SegmentReader,
+    SegmentRecorder, decode, encode, segment_stems
+)
+
+PCM = bytes(range(256)) * 40
+
+
+@pytest.mark.parametrize('codec', [CODEC_PCM, CODEC_ZLIB])
+def test_encode_decode_round_trip(codec):
+    used, data = encode(PCM, codec, 16000, 2, 1)
+    assert used == codec
+    assert decode(data, used) == PCM
+
+
+def record(root, segments, codec='zlib'):
+    recorder = SegmentRecorder(str(root), codec=codec, tag="test")
+    for pcm, source, session, turn in segments:
+        assert recorder.record(pcm, 8000, source=source, session=session, turn=turn)
+    recorder.close()
+    return recorder
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'pcm'])
+def test_recorded_segments_read_back(tmp_path, codec):
+    second = b"\x01\x02" * 4000
+    recorder = record(tmp_path, [(PCM, CALLER, "call-1", 0), (second, AGENT, "call-1", 1)], codec)
+    assert recorder.segments == 2
+    assert recorder.pcm_bytes == len(PCM) + len(second)
+
+    stems = segment_stems(str(tmp_path))
+    assert len(stems) == 1 and stems[0].endswith("-test")
+    with SegmentReader(str(tmp_path), stems[0]) as reader:
+        assert len(reader) == 2
+        first, last = list(reader)
+        assert (first.session, first.turn, first.source, first.codec) == ("call-1", 0, "caller", codec)
+        assert (last.source, last.turn) == ("agent", 1)
+        assert last.duration == pytest.approx(len(second) / 2 / 8000)
+        assert reader.read(first).pcm == PCM
+        assert reader[-1] == last
+        clip = reader.read(last)
+        assert (clip.pcm, clip.sample_rate, clip.sample_width) == (second, 8000, 2)
+
+
+def test_find_filters_by_every_given_field(tmp_path):
+    record(tmp_path, [
+        (PCM, CALLER, "call-1", 0), (PCM, AGENT, "call-1", 0),
+        (PCM, CALLER, "call-2", 0), (PCM, CALLER, "call-1", 1)
+    ])
+    with SegmentReader(str(tmp_path), segment_stems(str(tmp_path))[0]) as reader:
+        assert len(reader.find(session="call-1")) == 3
+        assert len(reader.find(session="call-1", source="caller")) == 2
+        assert [e.turn for e in reader.find(session="call-1", source="caller", turn=1)] == [1]
+
+
+def test_torn_index_record_is_dropped_on_reopen(tmp_path):
+    record(tmp_path, [(PCM, CALLER, "call-1", 0)])
+    stem = segment_stems(str(tmp_path))[0]
+    index = os.path.join(str(tmp_path), stem + INDEX_SUFFIX)
+    with open(index, 'ab') as f:
+        f.write(b"\0" * (INDEX_RECORD.size // 2))
+    with SegmentReader(str(tmp_path), stem) as reader:
+        # A partly written record is ignored by readers
+        assert len(reader) == 1
+    # The next writer truncates it before appending
+    record(tmp_path, [(PCM, AGENT, "call-1", 1)])
+    with SegmentReader(str(tmp_path), stem) as reader:
+        assert [e.source for e in reader] == ["caller", "agent"]
+        assert reader.read(reader[1]).pcm == PCM
+
+
+def test_unknown_codec_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SegmentRecorder(str(tmp_path), codec="mp3")
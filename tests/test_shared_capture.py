@@ -0,0 +1,114 @@
+"""Tests for the shared-memory ring buffer of the capture process."""
+
+import pytest
+
+from ai_agent.audio.shared_capture import SharedRingBuffer
+
+# Record header (length, timestamp) plus a 16-byte payload
+RECORD = 32
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRingBuffer(4 * RECORD)
+    yield ring
+    ring.close()
+
+
+def read(reader):
+    chunk = reader.peek()
+    if chunk is None:
+        return None
+    timestamp, view = chunk
+    try:
+        return timestamp, bytes(view)
+    finally:
+        view.release()
+        reader.advance()
+
+
+def payload(i):
+    return bytes([i]) * 16
+
+
+def test_chunks_are_read_in_order_with_timestamps(ring):
+    reader = ring.reader()
+    for i in range(3):
+        assert ring.write(payload(i), timestamp=float(i))
+    assert reader.behind == 3 * RECORD
+    assert [read(reader) for _ in range(3)] == [(float(i), payload(i)) for i in range(3)]
+    assert read(reader) is None
+    assert ring.written == 3
+
+
+def test_full_ring_drops_new_chunks_and_counts_overruns(ring):
+    reader = ring.reader()
+    results = [ring.write(payload(i)) for i in range(6)]
+    assert results == [True] * 4 + [False] * 2
+    assert ring.overruns == 2
+    assert [read(reader)[1] for _ in range(4)] == [payload(i) for i in range(4)]
+    # Reading frees space for the writer
+    assert ring.write(payload(9))
+    assert read(reader)[1] == payload(9)
+
+
+def test_records_wrap_without_splitting(ring):
+    reader = ring.reader()
+    for i in range(3):
+        ring.write(payload(i))
+    for _ in range(3):
+        read(reader)
+    # 32 bytes are left before the end; a 48-byte record must skip them
+    big = b"x" * 32
+    assert ring.write(big)
+    assert read(reader)[1] == big
+    assert ring.write(payload(5))
+    assert read(reader)[1] == payload(5)
+
+
+def test_wrap_counts_skipped_tail_for_overruns():
+    ring = SharedRingBuffer(4 * RECORD)
+    try:
+        reader = ring.reader()
+        for i in range(3):
+            ring.write(payload(i))
+        read(reader)
+        # 32 bytes free at the end and 32 at the start, but no room for 48
+        # contiguous bytes while the reader still holds records 1 and 2
+        assert not ring.write(b"x" * 32)
+        assert ring.overruns == 1
+    finally:
+        ring.close()
+
+
+def test_detached_readers_do_not_hold_back_the_writer():
+    ring = SharedRingBuffer(4 * RECORD, readers=2)
+    try:
+        slow = ring.reader(1)
+        fast = ring.reader(0)
+        for i in range(4):
+            ring.write(payload(i))
+        assert not ring.write(payload(4))
+        slow.close()
+        for _ in range(4):
+            read(fast)
+        assert ring.write(payload(5))
+        assert read(fast)[1] == payload(5)
+    finally:
+        ring.close()
+
+
+def test_attach_by_name_shares_the_data(ring):
+    other = SharedRingBuffer(name=ring.name)
+    try:
+        reader = other.reader()
+        ring.write(payload(7), timestamp=1.5)
+        assert other.capacity == ring.capacity
+        assert read(reader) == (1.5, payload(7))
+    finally:
+        other.close()
+
+
+def test_chunk_larger_than_ring_is_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.write(b"x" * (4 * RECORD))
@@ -0,0 +1,113 @@
+"""Tests for stopping microphone capture, with a fake speech_recognition."""
+
+import importlib
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+CHUNK_SECONDS = 0.02
+
+
+class FakeStream:
+    """Silent microphone stream delivering one chunk per CHUNK_SECONDS."""
+
+    def read(self, size):
+        time.sleep(CHUNK_SECONDS)
+        return b"\0" * size
+
+    def close(self):
+        pass
+
+
+class FakeMicrophone:
+    """Context manager that, like speech_recognition's, can only be entered once."""
+
+    CHUNK = 1024
+
+    def __init__(self, device_index=None):
+        self.stream = None
+
+    def __enter__(self):
+        assert self.stream is None, "This audio source is already inside a context manager"
+        self.stream = FakeStream()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.stream.close()
+        finally:
+            self.stream = None
+
+
+class FakeRecognizer:
+    """Listens to silence until the timeout, reading the stream chunk by chunk."""
+
+    def __init__(self):
+        self.pause_threshold = 0.8
+        self.non_speaking_duration = 0.5
+        self.energy_threshold = 300
+
+    def adjust_for_ambient_noise(self, source, duration=1):
+        source.stream.read(source.CHUNK)
+
+    def listen(self, source, timeout=None, phrase_time_limit=None):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            source.stream.read(source.CHUNK)
+        raise WaitTimeoutError()
+
+
+class WaitTimeoutError(Exception):
+    pass
+
+
+@pytest.fixture
+def recognizer_module(monkeypatch):
+    fake = types.ModuleType('speech_recognition')
+    fake.Recognizer = FakeRecognizer
+    fake.Microphone = FakeMicrophone
+    fake.WaitTimeoutError = WaitTimeoutError
+    fake.UnknownValueError = type('UnknownValueError', (Exception,), {})
+    fake.RequestError = type('RequestError', (Exception,), {})
+    monkeypatch.setitem(sys.modules, 'speech_recognition', fake)
+    module = importlib.import_module('ai_agent.speech.speech_recognizer')
+    monkeypatch.setattr(module, 'sr', fake)
+    return module
+
+
+def listen_in_background(recognizer):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(recognizer.listen_for_speech()))
+    thread.start()
+    return thread, results
+
+
+def test_stop_listening_interrupts_capture(recognizer_module):
+    recognizer = recognizer_module.SpeechRecognizer(timeout=5)
+    thread, results = listen_in_background(recognizer)
+    time.sleep(0.1)
+    started = time.perf_counter()
+    recognizer.stop_listening()
+    thread.join(1.0)
+    assert not thread.is_alive()
+    assert time.perf_counter() - started < 0.5
+    assert results == [None]
+    assert recognizer.microphone.stream is None
+
+
+def test_restarted_listen_waits_for_the_microphone(recognizer_module):
+    recognizer = recognizer_module.SpeechRecognizer(timeout=5)
+    statuses = []
+    recognizer.set_status_callback(statuses.append)
+    first, _ = listen_in_background(recognizer)
+    time.sleep(0.1)
+    recognizer.stop_listening()
+    # A new call listens right away; it must not find the microphone still open
+    recognizer.timeout = 0.1
+    assert recognizer.listen_for_speech() is None
+    first.join(1.0)
+    assert not any("context manager" in status for status in statuses)
+    assert statuses[-1] == "音声入力タイムアウト"
@@ -0,0 +1,158 @@
+"""Tests for the TTS engine with a fake pyttsx3: tracing and speculation preemption."""
+
+import contextlib
+import importlib
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+class FakeEngine:
+    """
+    pyttsx3 engine stand-in that reports every utterance it runs.
+
+    Rendering to a file takes save_seconds unless stop() cuts it short.
+    """
+
+    save_seconds = 0.0
+
+    def __init__(self):
+        self.callbacks = {}
+        self.queue = []
+        self.properties = {'voices': []}
+        self.rendering = threading.Event()
+        self._stopped = threading.Event()
+
+    def connect(self, topic, callback):
+        self.callbacks.setdefault(topic, []).append(callback)
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def say(self, text):
+        self.queue.append(('say', text, None))
+
+    def save_to_file(self, text, filename):
+        self.queue.append(('save', text, filename))
+
+    def runAndWait(self):
+        queue, self.queue = self.queue, []
+        self._stopped.clear()
+        for kind, text, filename in queue:
+            for callback in self.callbacks.get('started-utterance', []):
+                callback(None)
+            if kind == 'save':
+                self.rendering.set()
+                try:
+                    if self._stopped.wait(self.save_seconds):
+                        return
+                finally:
+                    self.rendering.clear()
+                with open(filename, 'wb') as f:
+                    f.write(b"RIFF")
+
+    def stop(self):
+        self.queue = []
+        self._stopped.set()
+
+
+class FakeTracer:
+    """Records the marks the engine reports."""
+
+    def __init__(self):
+        self.marks = []
+
+    def record(self, stage, start, end):
+        self.marks.append(stage)
+
+    def first_audio(self, when):
+        self.marks.append('first_audio')
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        yield
+
+
+@pytest.fixture
+def tts_module(monkeypatch):
+    fake = types.ModuleType('pyttsx3')
+    fake.init = FakeEngine
+    monkeypatch.setitem(sys.modules, 'pyttsx3', fake)
+    module = importlib.import_module('ai_agent.speech.tts_engine')
+    monkeypatch.setattr(module, 'pyttsx3', fake)
+    tracer = FakeTracer()
+    monkeypatch.setattr(module, 'get_tracer', lambda: tracer)
+    module.tracer = tracer
+    return module
+
+
+def test_live_speech_marks_synthesis_and_first_audio(tts_module):
+    engine = tts_module.TTSEngine()
+    engine.speak("こんにちは")
+    assert tts_module.tracer.marks == [tts_module.SYNTHESIS, tts_module.PLAYBACK_START, 'first_audio']
+
+
+def test_synthesis_to_file_marks_nothing_as_played(tts_module, tmp_path):
+    engine = tts_module.TTSEngine()
+    assert engine.synthesize_to_file("こんにちは", str(tmp_path / "reply.wav"))
+    assert tts_module.tracer.marks == []
+
+
+# Long enough that waiting for it would fail the timing assertions
+SLOW_SYNTHESIS = 3.0
+
+
+def test_live_speech_cancels_speculative_synthesis(tts_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(FakeEngine, 'save_seconds', SLOW_SYNTHESIS)
+    engine = tts_module.TTSEngine()
+    results = []
+    worker = threading.Thread(target=lambda: results.append(
+        engine.synthesize_to_file("候補", str(tmp_path / "candidate.wav"), preemptible=True)))
+    worker.start()
+    assert engine.engine.rendering.wait(1.0)
+
+    started = time.perf_counter()
+    engine.speak("実際の返答")
+    assert time.perf_counter() - started < 1.0
+    worker.join(1.0)
+    assert results == [False]
+
+
+def test_live_synthesis_is_not_preempted(tts_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(FakeEngine, 'save_seconds', 0.05)
+    engine = tts_module.TTSEngine()
+    assert engine.synthesize_to_file("返答", str(tmp_path / "reply.wav"))
+
+
+def test_speculation_miss_does_not_wait_for_candidates(tts_module, monkeypatch):
+    from ai_agent.conversation.conversation_manager import ConversationManager
+    from ai_agent.conversation.speculation import ResponseSpeculator
+
+    monkeypatch.setattr(FakeEngine, 'save_seconds', SLOW_SYNTHESIS)
+    engine = tts_module.TTSEngine()
+    manager = ConversationManager()
+    speculator = ResponseSpeculator(manager, engine)
+    try:
+        manager.start_conversation()
+        speculator.prepare()
+        assert engine.engine.rendering.wait(1.0)
+
+        started = time.perf_counter()
+        reply, audio_file = speculator.commit("はい")
+        assert reply and audio_file is None
+        engine.speak(reply)
+        assert time.perf_counter() - started < 1.0
+    finally:
+        started = time.perf_counter()
+        speculator.close()
+        manager.close()
+    # The cancelled candidate neither finished nor started the next one
+    assert time.perf_counter() - started < 1.0
+    assert speculator.get_stats()['misses'] == 1
+    assert speculator.get_stats()['synthesized'] == 0